@@ -38,9 +38,18 @@ def get_current_user(
         def get_me(current_user: User = Depends(get_current_user)):
             return current_user
     """
-    # Extraer token
-    token = credentials.credentials
+    return usuario_desde_token(db, credentials.credentials)
 
+
+def usuario_desde_token(db: Session, token: str) -> User:
+    """
+    Valida el token JWT y devuelve el usuario activo al que pertenece.
+    Lo usa get_current_user y las rutas que reciben el token por otro medio
+    (ej: el stream de notificaciones, porque EventSource no envia headers).
+
+    Raises:
+        HTTPException: Si el token es inválido o el usuario no existe
+    """
     # Decodificar token
     payload = decode_access_token(token)
     if payload is None:
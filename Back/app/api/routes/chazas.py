@@ -2,13 +2,18 @@
 Rutas de chazas.
 Endpoints para crear, leer, actualizar y eliminar chazas.
 """
-from fastapi import APIRouter, Depends, Query
+from fastapi import APIRouter, Depends, HTTPException, Query, Request, Response, status
 from sqlalchemy.orm import Session
-from typing import List, Optional
+from typing import List, Optional, Literal, Union
 
 from app.database.session import get_db
-from app.schemas.chaza import ChazaCreate, ChazaUpdate, ChazaResponse, HorarioTrabajoCreate, HorarioTrabajoResponse
+from app.database.busqueda import palabras_busqueda
+from app.schemas.chaza import (
+    ChazaCreate, ChazaUpdate, ChazaResponse, HorarioTrabajoCreate, HorarioTrabajoResponse,
+    ChazasCompatiblesResponse, ChazaSummary, ChazasLoteResponse
+)
 from app.services.chaza_service import ChazaService
+from app.core.validacion_http import generar_etag, responder_condicional
 from app.api.deps import get_current_user, get_current_chazero, get_verified_chazero
 from app.models.user import User
 
@@ -32,13 +37,18 @@ def create_chaza(
     return ChazaService.create_chaza(db, chaza_data, current_user.id)
 
 
-@router.get("/", response_model=List[ChazaResponse])
+@router.get("/", response_model=Union[List[ChazaResponse], List[ChazaSummary]])
 def get_all_chazas(
+    request: Request,
+    response: Response,
     skip: int = Query(0, ge=0, description="Número de chazas a saltar (paginación)"),
     limit: int = Query(100, ge=1, le=100, description="Número máximo de chazas a devolver"),
     categoria: Optional[str] = Query(None, description="Filtrar por categoría"),
     activas_solo: bool = Query(True, description="Solo mostrar chazas activas"),
     universidad_id: Optional[int] = Query(None, description="Filtrar por universidad"),
+    cursor: Optional[str] = Query(None, description="Cursor de la página anterior (header X-Next-Cursor)"),
+    q: Optional[str] = Query(None, max_length=100, description="Buscar en título, descripción y ubicación"),
+    view: Literal["full", "summary"] = Query("full", description="summary: solo los campos de la tarjeta"),
     db: Session = Depends(get_db)
 ):
     """
@@ -49,10 +59,46 @@ def get_all_chazas(
     - **categoria**: Filtrar por categoría (opcional)
     - **activas_solo**: Solo chazas activas (default: true)
     - **universidad_id**: Filtrar por universidad (opcional)
+    - **cursor**: Paginación por cursor (opcional, reemplaza a skip)
+    - **q**: Búsqueda de texto, sin importar tildes (opcional). Ordena por
+      relevancia y se pagina con skip
+    - **view**: `summary` devuelve solo los campos de la tarjeta del grid,
+      sin descripción, teléfono, universidad ni horarios
+
+    Si hay más resultados, el header **X-Next-Cursor** trae el cursor
+    para pedir la siguiente página.
+
+    Soporta If-None-Match / If-Modified-Since: responde 304 si nada cambió.
 
     No requiere autenticación.
     """
-    return ChazaService.get_all_chazas(db, skip, limit, categoria, activas_solo, universidad_id)
+    if q is not None and not palabras_busqueda(q):
+        # Sin palabras para buscar: mismo listado (y cursor) que sin q
+        q = None
+
+    total, ultima_modificacion = ChazaService.version_listado(db, categoria, activas_solo, universidad_id)
+    no_modificado = responder_condicional(
+        request, response,
+        generar_etag(
+            "chazas", view, categoria, activas_solo, universidad_id, skip, limit, cursor, q,
+            total, ultima_modificacion
+        ),
+        ultima_modificacion
+    )
+    if no_modificado:
+        return no_modificado
+
+    chazas = ChazaService.get_all_chazas(
+        db, skip, limit, categoria, activas_solo, universidad_id, cursor, q, resumen=(view == "summary"),
+        version=(total, ultima_modificacion)
+    )
+
+    # El cursor sigue el orden por fecha, no aplica al orden por relevancia
+    next_cursor = ChazaService.siguiente_cursor(chazas, limit) if q is None else None
+    if next_cursor:
+        response.headers["X-Next-Cursor"] = next_cursor
+
+    return chazas
 
 
 @router.get("/mis-chazas", response_model=List[ChazaResponse])
@@ -70,9 +116,72 @@ def get_my_chazas(
     return ChazaService.get_chazas_by_owner(db, current_user.id)
 
 
+@router.get("/compatibles", response_model=ChazasCompatiblesResponse)
+def buscar_chazas_compatibles(
+    horarios: List[str] = Query(..., description="Horarios del estudiante 'dia-hora', ej: 0-8,0-9,1-10"),
+    skip: int = Query(0, ge=0, description="Número de chazas a saltar (paginación)"),
+    limit: int = Query(20, ge=1, le=100, description="Número máximo de chazas a devolver"),
+    universidad_id: Optional[int] = Query(None, description="Filtrar por universidad"),
+    categoria: Optional[str] = Query(None, description="Filtrar por categoría"),
+    db: Session = Depends(get_db)
+):
+    """
+    Busca chazas compatibles con los horarios del estudiante.
+
+    - **horarios**: Franjas 'dia-hora' (0=Lunes), repetidas o separadas por coma
+    - **skip** / **limit**: Paginación (max 100)
+
+    Ordena por número de coincidencias y devuelve el porcentaje de
+    compatibilidad de cada chaza. Solo incluye chazas con al menos una coincidencia.
+
+    No requiere autenticación.
+    """
+    franjas = [f for valor in horarios for f in valor.split(",") if f.strip()]
+    return ChazaService.buscar_compatibles(db, franjas, skip, limit, universidad_id, categoria)
+
+
+@router.get("/batch", response_model=ChazasLoteResponse)
+def get_chazas_lote(
+    ids: Optional[str] = Query(None, description="IDs separados por coma, ej: 1,2,3"),
+    slugs: Optional[str] = Query(None, description="Slugs separados por coma (si no se usan ids)"),
+    db: Session = Depends(get_db)
+):
+    """
+    Obtiene varias chazas en una sola petición, por ID o por slug.
+
+    - **ids**: IDs separados por coma
+    - **slugs**: Slugs separados por coma
+
+    Devuelve las chazas en el orden pedido y en **no_encontradas** los
+    IDs o slugs que no existen. Máximo 50 por petición.
+
+    No requiere autenticación.
+    """
+    if not ids and not slugs:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="Debes enviar ids o slugs"
+        )
+
+    if ids:
+        try:
+            lista_ids = [int(i) for i in ids.split(",") if i.strip()]
+        except ValueError:
+            raise HTTPException(
+                status_code=status.HTTP_400_BAD_REQUEST,
+                detail="Los ids deben ser números separados por coma"
+            )
+        return ChazaService.get_chazas_lote(db, ids=lista_ids)
+
+    lista_slugs = [s.strip() for s in slugs.split(",") if s.strip()]
+    return ChazaService.get_chazas_lote(db, slugs=lista_slugs)
+
+
 @router.get("/slug/{slug}", response_model=ChazaResponse)
 def get_chaza_by_slug(
     slug: str,
+    request: Request,
+    response: Response,
     db: Session = Depends(get_db)
 ):
     """
@@ -80,22 +189,40 @@ def get_chaza_by_slug(
 
     Ejemplo: /chazas/slug/chaza-don-carlos
 
+    Soporta If-None-Match / If-Modified-Since: responde 304 si nada cambió.
+
     No requiere autenticacion.
     """
-    return ChazaService.get_chaza_by_slug(db, slug)
+    version = ChazaService.version_chaza(db, slug=slug)
+    if version:
+        no_modificado = responder_condicional(request, response, generar_etag("chaza", *version), version[1])
+        if no_modificado:
+            return no_modificado
+
+    return ChazaService.get_chaza_by_slug(db, slug, version)
 
 
 @router.get("/{chaza_id}", response_model=ChazaResponse)
 def get_chaza(
     chaza_id: int,
+    request: Request,
+    response: Response,
     db: Session = Depends(get_db)
 ):
     """
     Obtiene una chaza específica por su ID.
 
+    Soporta If-None-Match / If-Modified-Since: responde 304 si nada cambió.
+
     No requiere autenticación.
     """
-    return ChazaService.get_chaza_by_id(db, chaza_id)
+    version = ChazaService.version_chaza(db, chaza_id=chaza_id)
+    if version:
+        no_modificado = responder_condicional(request, response, generar_etag("chaza", *version), version[1])
+        if no_modificado:
+            return no_modificado
+
+    return ChazaService.get_chaza_by_id(db, chaza_id, version)
 
 
 @router.put("/{chaza_id}", response_model=ChazaResponse)
@@ -152,14 +279,26 @@ def agregar_horario(
 @router.get("/{chaza_id}/horarios", response_model=List[HorarioTrabajoResponse])
 def obtener_horarios(
     chaza_id: int,
+    request: Request,
+    response: Response,
     db: Session = Depends(get_db)
 ):
     """
     Obtiene todos los horarios de trabajo de una chaza.
 
+    Soporta If-None-Match / If-Modified-Since: responde 304 si nada cambió.
+
     No requiere autenticacion.
     """
-    return ChazaService.obtener_horarios(db, chaza_id)
+    version = ChazaService.version_horarios(db, chaza_id)
+    if version:
+        no_modificado = responder_condicional(
+            request, response, generar_etag("horarios", chaza_id, *version), version[1]
+        )
+        if no_modificado:
+            return no_modificado
+
+    return ChazaService.obtener_horarios(db, chaza_id, version)
 
 
 @router.put("/{chaza_id}/horarios", response_model=List[HorarioTrabajoResponse])
@@ -1,10 +1,16 @@
-from fastapi import APIRouter, Depends, HTTPException, status
+from fastapi import APIRouter, Depends, Header, HTTPException, Query, Request, Response, status
+from fastapi.concurrency import run_in_threadpool
+from fastapi.responses import StreamingResponse
 from sqlalchemy.orm import Session
-from typing import List
-
-from app.database.session import get_db
-from app.services.notificacion_service import NotificacionService
-from app.api.deps import get_current_user
+from typing import List, Optional, Tuple
+import asyncio
+
+from app.config import settings
+from app.database.session import get_db, SessionLocal
+from app.services.notificacion_service import NotificacionService, MAX_NOTIFICACIONES_POR_PAGINA
+from app.services.notificaciones_en_vivo import canal_notificaciones, formatear_evento
+from app.api.deps import get_current_user, usuario_desde_token
+from app.core.validacion_http import generar_etag, responder_condicional
 from app.schemas.notificacion import (
     NotificacionResponse,
     NotificacionResumen,
@@ -17,26 +23,63 @@ router = APIRouter(prefix="/notificaciones", tags=["Notificaciones"])
 
 @router.get("/", response_model=List[NotificacionResponse])
 def obtener_notificaciones(
+    response: Response,
     solo_sin_leer: bool = False,
-    limite: int = 50,
+    limite: int = Query(50, ge=1, le=MAX_NOTIFICACIONES_POR_PAGINA, description="Máximo de notificaciones por página"),
+    cursor: Optional[str] = Query(None, description="X-Next-Cursor de la página anterior"),
     current_user: User = Depends(get_current_user),
     db: Session = Depends(get_db)
 ):
-    """Obtiene las notificaciones del usuario autenticado"""
-    return NotificacionService.obtener_notificaciones_usuario(
-        db=db,
-        usuario_id=current_user.id,
-        solo_sin_leer=solo_sin_leer,
-        limite=limite
-    )
+    """
+    Obtiene las notificaciones del usuario autenticado, de la más reciente a la más antigua.
+
+    Si hay más resultados, el header **X-Next-Cursor** trae el cursor
+    para pedir la siguiente página.
+    """
+    try:
+        notificaciones = NotificacionService.obtener_notificaciones_usuario(
+            db=db,
+            usuario_id=current_user.id,
+            solo_sin_leer=solo_sin_leer,
+            limite=limite,
+            cursor=cursor
+        )
+    except ValueError as e:
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=str(e))
+
+    next_cursor = NotificacionService.siguiente_cursor(notificaciones, limite)
+    if next_cursor:
+        response.headers["X-Next-Cursor"] = next_cursor
+
+    return notificaciones
 
 
 @router.get("/resumen", response_model=NotificacionResumen)
 def obtener_resumen(
+    request: Request,
+    response: Response,
+    since: Optional[int] = Query(None, ge=0, description="Id de la notificacion mas nueva que ya tiene el cliente"),
     current_user: User = Depends(get_current_user),
     db: Session = Depends(get_db)
 ):
-    """Obtiene el resumen de notificaciones (para el badge del header)"""
+    """
+    Obtiene el resumen de notificaciones (para el badge del header)
+
+    - **since**: modo delta. Solo devuelve las notificaciones con id mayor
+      (max 5, las mas nuevas primero) y el conteo actual de no leidas, con una
+      sola consulta. Trae ETag: si no hay notificaciones nuevas y el conteo no
+      cambio, If-None-Match responde 304 sin cuerpo.
+    """
+    if since is not None:
+        total_sin_leer, nuevas = NotificacionService.obtener_novedades(db, current_user.id, since, limite=5)
+        ultimo_id = nuevas[0].id if nuevas else since
+        no_modificado = responder_condicional(
+            request, response, generar_etag("notificaciones", current_user.id, ultimo_id, total_sin_leer)
+        )
+        if no_modificado:
+            return no_modificado
+        return NotificacionResumen(total_sin_leer=total_sin_leer, notificaciones_recientes=nuevas)
+
     total_sin_leer = NotificacionService.contar_sin_leer(db, current_user.id)
     recientes = NotificacionService.obtener_notificaciones_usuario(
         db=db,
@@ -61,6 +104,82 @@ def contar_sin_leer(
     return {"count": count}
 
 
+def _autenticar_stream(token: str, contar: bool) -> Tuple[int, Optional[int]]:
+    """
+    (usuario_id, no leidas o None) del dueño del token, con una sesion corta:
+    la conexion del stream puede durar horas. Es sincrono; la ruta lo corre
+    en el threadpool para no bloquear el event loop.
+    """
+    db = SessionLocal()
+    try:
+        usuario_id = usuario_desde_token(db, token).id
+        return usuario_id, NotificacionService.contar_sin_leer(db, usuario_id) if contar else None
+    finally:
+        db.close()
+
+
+@router.get("/stream")
+async def stream_notificaciones(
+    request: Request,
+    token: Optional[str] = Query(None, description="JWT (EventSource no puede enviar el header Authorization)"),
+    authorization: Optional[str] = Header(None),
+    last_event_id: Optional[str] = Header(None)
+):
+    """
+    Stream Server-Sent Events con las notificaciones nuevas y los cambios del
+    conteo de no leidas del usuario. Reemplaza el polling de /sin-leer/count.
+
+    Eventos:
+    - **sin_leer**: {"sin_leer": n} al conectar y cuando cambia el conteo
+    - **notificacion**: {"notificacion": {...}, "sin_leer": n} por cada notificacion nueva
+    - **sincronizar**: el cliente debe recargar /resumen (no se pudo reanudar desde Last-Event-ID)
+
+    Cada SSE_HEARTBEAT_SEGUNDOS se envia un comentario para mantener viva la conexion.
+    Maximo SSE_MAX_CONEXIONES_POR_USUARIO conexiones por usuario (429 si se excede).
+    """
+    if token is None and authorization and authorization.lower().startswith("bearer "):
+        token = authorization[7:]
+    if not token:
+        raise HTTPException(
+            status_code=status.HTTP_401_UNAUTHORIZED,
+            detail="Token requerido",
+            headers={"WWW-Authenticate": "Bearer"},
+        )
+
+    usuario_id, sin_leer = await run_in_threadpool(_autenticar_stream, token, not last_event_id)
+
+    try:
+        suscripcion, perdidos, sincronizar = canal_notificaciones.suscribir(usuario_id, last_event_id)
+    except ValueError as e:
+        raise HTTPException(status_code=status.HTTP_429_TOO_MANY_REQUESTS, detail=str(e))
+
+    async def eventos():
+        try:
+            yield "retry: 5000\n\n"
+            if sincronizar:
+                yield formatear_evento("sincronizar", {})
+            for texto in perdidos:
+                yield texto
+            if sin_leer is not None:
+                yield formatear_evento("sin_leer", {"sin_leer": sin_leer})
+
+            while not await request.is_disconnected():
+                try:
+                    yield await asyncio.wait_for(
+                        suscripcion.cola.get(), timeout=settings.SSE_HEARTBEAT_SEGUNDOS
+                    )
+                except asyncio.TimeoutError:
+                    yield ": ping\n\n"
+        finally:
+            canal_notificaciones.cancelar(suscripcion)
+
+    return StreamingResponse(
+        eventos(),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"}
+    )
+
+
 @router.put("/{notificacion_id}/leer", response_model=NotificacionResponse)
 def marcar_como_leida(
     notificacion_id: int,
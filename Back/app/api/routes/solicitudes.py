@@ -1,9 +1,9 @@
 """
 Endpoints para solicitudes de trabajo.
 """
-from fastapi import APIRouter, Depends, HTTPException, status
+from fastapi import APIRouter, Depends, HTTPException, Query, status
 from sqlalchemy.orm import Session
-from typing import List, Optional
+from typing import List, Literal, Optional
 
 from app.database.session import get_db
 from app.services.solicitud_service import SolicitudService
@@ -11,10 +11,14 @@ from app.api.deps import get_current_user, get_verified_estudiante
 from app.schemas.solicitud import (
     SolicitudCreate,
     ResponderSolicitudRequest,
+    ResponderSolicitudesLoteRequest,
+    ResponderSolicitudesLoteResponse,
+    ContadoresChazaResponse,
     EstadoSolicitudEnum
 )
 from app.models.user import User
 from app.models.solicitud import EstadoSolicitud
+from app.core.cursor import decodificar_cursor
 
 router = APIRouter(prefix="/solicitudes", tags=["Solicitudes"])
 
@@ -38,10 +42,13 @@ def crear_solicitud(
             horarios_seleccionados=solicitud_data.horarios_seleccionados,
             mensaje=solicitud_data.mensaje
         )
-        return {
+        resultado = {
             "mensaje": "Solicitud enviada exitosamente",
             "solicitud_id": solicitud.id
         }
+        # Un solo commit: solicitud y notificacion juntas
+        db.commit()
+        return resultado
     except ValueError as e:
         raise HTTPException(
             status_code=status.HTTP_400_BAD_REQUEST,
@@ -51,30 +58,66 @@ def crear_solicitud(
 
 @router.get("/mis-solicitudes")
 def obtener_mis_solicitudes(
+    limite: int = Query(50, ge=1, le=100, description="Máximo de solicitudes por página"),
+    cursor: Optional[str] = Query(None, description="next_cursor de la página anterior"),
     current_user: User = Depends(get_current_user),
     db: Session = Depends(get_db)
 ):
     """
-    Obtiene las solicitudes enviadas por el estudiante actual.
+    Obtiene las solicitudes enviadas por el estudiante actual, de la más reciente a la más antigua.
+
+    Devuelve la página en **solicitudes** (con título, slug e imagen de la chaza)
+    y el cursor de la siguiente en **next_cursor**.
     """
-    solicitudes = SolicitudService.obtener_mis_solicitudes(
-        db=db,
-        estudiante_id=current_user.id
-    )
+    try:
+        solicitudes = SolicitudService.obtener_mis_solicitudes(
+            db=db,
+            estudiante_id=current_user.id,
+            limite=limite,
+            cursor=cursor
+        )
+    except ValueError as e:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=str(e)
+        )
     return solicitudes
 
 
+@router.get("/mis-chazas/contadores", response_model=List[ContadoresChazaResponse])
+def obtener_contadores_mis_chazas(
+    current_user: User = Depends(get_current_user),
+    db: Session = Depends(get_db)
+):
+    """
+    Totales de solicitudes pendientes, aceptadas y rechazadas de cada chaza
+    del usuario actual, para el panel del chazero.
+    """
+    return SolicitudService.obtener_contadores_dueno(db=db, dueno_id=current_user.id)
+
+
 @router.get("/chaza/{chaza_id}")
 def obtener_solicitudes_chaza(
     chaza_id: int,
     estado: Optional[str] = None,
+    limite: int = Query(50, ge=1, le=100, description="Máximo de solicitudes por página"),
+    cursor: Optional[str] = Query(None, description="next_cursor de la página anterior"),
     current_user: User = Depends(get_current_user),
     db: Session = Depends(get_db)
 ):
     """
-    Obtiene las solicitudes recibidas para una chaza.
+    Obtiene las solicitudes recibidas para una chaza, de la más reciente a la más antigua.
     Solo el dueño de la chaza puede ver estas solicitudes.
+
+    Devuelve la página en **solicitudes**, el cursor de la siguiente en
+    **next_cursor** y los totales por estado en **conteos**.
     """
+    if cursor:
+        try:
+            decodificar_cursor(cursor)
+        except ValueError as e:
+            raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=str(e))
+
     try:
         estado_enum = None
         if estado:
@@ -90,7 +133,9 @@ def obtener_solicitudes_chaza(
             db=db,
             chaza_id=chaza_id,
             dueno_id=current_user.id,
-            estado=estado_enum
+            estado=estado_enum,
+            limite=limite,
+            cursor=cursor
         )
         return solicitudes
     except ValueError as e:
@@ -100,6 +145,38 @@ def obtener_solicitudes_chaza(
         )
 
 
+@router.get("/chaza/{chaza_id}/ranking")
+def ranking_solicitudes_chaza(
+    chaza_id: int,
+    orden: Literal["ajuste", "fecha"] = Query("ajuste", description="'ajuste' (mejor primero) o 'fecha'"),
+    limite: int = Query(50, ge=1, le=1000, description="Máximo de solicitudes en la lista"),
+    current_user: User = Depends(get_current_user),
+    db: Session = Depends(get_db)
+):
+    """
+    Solicitudes pendientes de una chaza con qué tan bien encajan sus horarios
+    con los horarios publicados. Solo el dueño de la chaza puede verlas.
+
+    Cada solicitud trae **ajuste** (horas coincidentes, % de las horas de la chaza
+    que cubre y % de sus horas que caen en horario de la chaza).
+    **cobertura_sugerida** propone pocas solicitudes que juntas cubren
+    todas las horas que los postulantes pueden cubrir.
+    """
+    try:
+        return SolicitudService.ranking_solicitudes_chaza(
+            db=db,
+            chaza_id=chaza_id,
+            dueno_id=current_user.id,
+            orden=orden,
+            limite=limite
+        )
+    except ValueError as e:
+        raise HTTPException(
+            status_code=status.HTTP_403_FORBIDDEN,
+            detail=str(e)
+        )
+
+
 @router.get("/{solicitud_id}")
 def obtener_solicitud(
     solicitud_id: int,
@@ -157,11 +234,13 @@ def responder_solicitud(
             respuesta=respuesta_data.respuesta
         )
 
-        return {
+        resultado = {
             "mensaje": f"Solicitud {estado_modelo.value}",
             "solicitud_id": solicitud.id,
             "estado": solicitud.estado.value
         }
+        db.commit()
+        return resultado
     except ValueError as e:
         raise HTTPException(
             status_code=status.HTTP_400_BAD_REQUEST,
@@ -169,6 +248,41 @@ def responder_solicitud(
         )
 
 
+@router.put("/responder-lote", response_model=ResponderSolicitudesLoteResponse)
+def responder_solicitudes_lote(
+    datos: ResponderSolicitudesLoteRequest,
+    current_user: User = Depends(get_current_user),
+    db: Session = Depends(get_db)
+):
+    """
+    El dueño responde varias solicitudes a la vez (aceptar/rechazar).
+    Devuelve el resultado de cada id; las que no se pueden responder
+    no impiden que se actualicen las demas.
+    """
+    estado_modelo = EstadoSolicitud(datos.estado.value)
+
+    if estado_modelo not in [EstadoSolicitud.ACEPTADA, EstadoSolicitud.RECHAZADA]:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="Solo puedes aceptar o rechazar solicitudes"
+        )
+
+    resultados = SolicitudService.responder_solicitudes_lote(
+        db=db,
+        solicitud_ids=datos.solicitud_ids,
+        dueno_id=current_user.id,
+        nuevo_estado=estado_modelo,
+        respuesta=datos.respuesta
+    )
+    db.commit()
+
+    return {
+        "estado": estado_modelo.value,
+        "actualizadas": sum(1 for r in resultados if r["resultado"] == "actualizada"),
+        "resultados": resultados
+    }
+
+
 @router.put("/{solicitud_id}/cancelar")
 def cancelar_solicitud(
     solicitud_id: int,
@@ -184,10 +298,12 @@ def cancelar_solicitud(
             solicitud_id=solicitud_id,
             estudiante_id=current_user.id
         )
-        return {
+        resultado = {
             "mensaje": "Solicitud cancelada",
             "solicitud_id": solicitud.id
         }
+        db.commit()
+        return resultado
     except ValueError as e:
         raise HTTPException(
             status_code=status.HTTP_400_BAD_REQUEST,
@@ -47,6 +47,18 @@ class Settings(BaseSettings):
     RESEND_API_KEY: str = ""
     ADMIN_EMAIL: str = "craguerrerosa@gmail.com"
 
+    # Archivo de solicitudes terminadas (rechazadas/canceladas)
+    ARCHIVO_SOLICITUDES_DIAS: int = 180  # Antiguedad minima (desde la ultima modificacion)
+    ARCHIVO_SOLICITUDES_LOTE: int = 500  # Filas movidas por transaccion
+
+    # Stream de notificaciones (Server-Sent Events)
+    SSE_MAX_CONEXIONES_POR_USUARIO: int = 5  # Pestañas abiertas a la vez
+    SSE_HEARTBEAT_SEGUNDOS: int = 15  # Comentario vacio para mantener viva la conexion
+
+    # Bus de eventos entre workers (invalidacion de caches y stream de notificaciones)
+    EVENTOS_TRANSPORTE: str = "memoria"  # memoria | postgres | redis | redis-local
+    REDIS_URL: str = ""  # Solo con EVENTOS_TRANSPORTE=redis
+
     class Config:
         env_file = ".env"
         case_sensitive = True
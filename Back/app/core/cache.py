@@ -0,0 +1,63 @@
+"""
+Cache en memoria con expiracion y contadores de aciertos/fallos.
+Envuelve un TTLCache de cachetools, protegido con un lock porque las rutas
+sincronas de FastAPI se ejecutan en varios threads.
+"""
+from typing import Any, Callable, Hashable, Tuple
+import threading
+from cachetools import TTLCache
+
+
+class CacheConContadores:
+    """TTLCache acotado que cuenta hits y misses."""
+
+    def __init__(self, maxsize: int, ttl: int):
+        self._cache = TTLCache(maxsize=maxsize, ttl=ttl)
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    def obtener(self, clave: Hashable) -> Tuple[bool, Any]:
+        """
+        Busca una clave en el cache.
+
+        Returns:
+            (True, valor) si estaba, (False, None) si no
+        """
+        with self._lock:
+            if clave in self._cache:
+                self.hits += 1
+                return True, self._cache[clave]
+            self.misses += 1
+            return False, None
+
+    def guardar(self, clave: Hashable, valor: Any) -> None:
+        with self._lock:
+            self._cache[clave] = valor
+
+    def invalidar(self, condicion: Callable[[Hashable], bool]) -> int:
+        """
+        Elimina las claves que cumplen la condicion.
+
+        Returns:
+            Numero de entradas eliminadas
+        """
+        with self._lock:
+            claves = [clave for clave in list(self._cache.keys()) if condicion(clave)]
+            for clave in claves:
+                self._cache.pop(clave, None)
+            return len(claves)
+
+    def limpiar(self) -> None:
+        with self._lock:
+            self._cache.clear()
+
+    def estadisticas(self) -> dict:
+        """Tamano actual y contadores del cache."""
+        with self._lock:
+            return {
+                "entradas": len(self._cache),
+                "maximo": self._cache.maxsize,
+                "hits": self.hits,
+                "misses": self.misses
+            }
@@ -0,0 +1,30 @@
+"""
+Cursores opacos para paginacion por llave (keyset) sobre (created_at, id).
+El cliente recibe el cursor de la ultima fila y lo envia para pedir la
+pagina siguiente; la consulta continua con WHERE (created_at, id) < cursor.
+"""
+from datetime import datetime
+from typing import Tuple
+import base64
+import binascii
+
+
+def codificar_cursor(created_at: datetime, fila_id: int) -> str:
+    """Codifica la posicion (created_at, id) como un cursor opaco."""
+    crudo = f"{created_at.isoformat()}|{fila_id}"
+    return base64.urlsafe_b64encode(crudo.encode("utf-8")).decode("ascii")
+
+
+def decodificar_cursor(cursor: str) -> Tuple[datetime, int]:
+    """
+    Decodifica un cursor generado por codificar_cursor.
+
+    Raises:
+        ValueError: Si el cursor esta mal formado
+    """
+    try:
+        crudo = base64.urlsafe_b64decode(cursor.encode("ascii")).decode("utf-8")
+        fecha, fila_id = crudo.rsplit("|", 1)
+        return datetime.fromisoformat(fecha), int(fila_id)
+    except (ValueError, UnicodeError, binascii.Error):
+        raise ValueError("Cursor invalido")
@@ -0,0 +1,151 @@
+"""
+Bus de eventos de dominio.
+
+Los servicios publican eventos (app.schemas.eventos) despues de cada commit y
+los modulos con estado en memoria (caches, indice de disponibilidad, stream
+de notificaciones) se suscriben para actualizarse. Con un solo worker basta
+la entrega local; con varios workers el transporte configurado
+(app.core.transportes_eventos) lleva el evento a los demas procesos.
+
+El evento se entrega primero en el proceso que lo publica, de forma sincrona,
+asi quien hizo el cambio ve su propio cambio en la siguiente peticion. Los
+mensajes que vuelven por el transporte con el mismo origen se ignoran.
+
+Cuando el transporte se reconecta se entrega localmente EventosPerdidos: los
+suscriptores descartan su estado en memoria (caches, indice de disponibilidad)
+porque los eventos de la desconexion no se recuperan.
+"""
+from typing import Callable, Dict, List, Optional, Type
+import json
+import threading
+import uuid
+
+from sqlalchemy import event
+from sqlalchemy.orm import Session
+
+from app.schemas.eventos import EventoDominio, EventosPerdidos
+
+
+Manejador = Callable[[EventoDominio], None]
+
+
+class BusEventos:
+    """Suscriptores por tipo de evento y transporte entre procesos."""
+
+    def __init__(self):
+        self._manejadores: Dict[Type[EventoDominio], List[Manejador]] = {}
+        self._transporte = None
+        self._lock = threading.Lock()
+        # Identifica a este proceso en los mensajes del transporte
+        self.origen = uuid.uuid4().hex
+
+    def suscribir(self, tipo_evento: Type[EventoDominio]) -> Callable[[Manejador], Manejador]:
+        """Decorador: registra la funcion como manejador del tipo de evento."""
+        def registrar(manejador: Manejador) -> Manejador:
+            with self._lock:
+                self._manejadores.setdefault(tipo_evento, []).append(manejador)
+            return manejador
+        return registrar
+
+    def configurar(self, transporte) -> None:
+        """Cambia el transporte (cerrando el anterior) y empieza a escuchar."""
+        self.detener()
+        self._transporte = transporte
+        if transporte is not None:
+            transporte.iniciar(self._recibir, self._reconectado)
+
+    def detener(self) -> None:
+        transporte, self._transporte = self._transporte, None
+        if transporte is not None:
+            transporte.detener()
+
+    def publicar(self, evento: EventoDominio) -> None:
+        """
+        Entrega el evento en este proceso y lo envia a los demas.
+        Llamar solo despues del commit del cambio.
+        """
+        self._entregar(evento)
+        if self._transporte is not None:
+            mensaje = json.dumps({
+                "origen": self.origen,
+                "tipo": evento.tipo,
+                "datos": evento.model_dump(mode="json")
+            })
+            try:
+                self._transporte.enviar(mensaje)
+            except Exception as e:
+                # El cambio ya esta confirmado; los demas workers se corrigen por TTL
+                print(f">> Error enviando evento {evento.tipo}: {e}")
+
+    def publicar_al_confirmar(self, db: Session, evento: EventoDominio) -> None:
+        """Publica el evento cuando la transaccion de la sesion haga commit (nada si hay rollback)."""
+        db.info.setdefault("eventos_dominio", []).append(evento)
+
+    def estadisticas(self) -> dict:
+        return {
+            "transporte": getattr(self._transporte, "nombre", "memoria"),
+            "origen": self.origen
+        }
+
+    def _recibir(self, mensaje: str) -> None:
+        """Llamado por el transporte (desde su thread) con cada mensaje recibido."""
+        try:
+            crudo = json.loads(mensaje)
+            if crudo.get("origen") == self.origen:
+                return
+            evento = EventoDominio.desde_dict(crudo["tipo"], crudo["datos"])
+        except (ValueError, KeyError, TypeError) as e:
+            print(f">> Evento invalido ignorado: {e}")
+            return
+        self._entregar(evento)
+
+    def _reconectado(self) -> None:
+        """Llamado por el transporte (desde su thread) al recuperar la conexion."""
+        print(">> Bus de eventos: reconectado, descartando el estado en memoria")
+        self._entregar(EventosPerdidos())
+
+    def _entregar(self, evento: EventoDominio) -> None:
+        with self._lock:
+            manejadores = list(self._manejadores.get(type(evento), ()))
+        for manejador in manejadores:
+            try:
+                manejador(evento)
+            except Exception as e:
+                # Un suscriptor con error no debe afectar a los demas ni a la peticion
+                print(f">> Error en suscriptor de {evento.tipo}: {e}")
+
+
+# Instancia global: los servicios publican y se suscriben aqui
+bus_eventos = BusEventos()
+
+
+@event.listens_for(Session, "after_commit")
+def _publicar_eventos_confirmados(db: Session) -> None:
+    for evento in db.info.pop("eventos_dominio", ()):
+        bus_eventos.publicar(evento)
+
+
+@event.listens_for(Session, "after_rollback")
+def _descartar_eventos(db: Session) -> None:
+    db.info.pop("eventos_dominio", None)
+
+
+def crear_transporte(nombre: str, database_url: Optional[str] = None, redis_url: Optional[str] = None):
+    """
+    Transporte segun la configuracion EVENTOS_TRANSPORTE.
+
+    Args:
+        nombre: "memoria" (un solo proceso), "postgres" (LISTEN/NOTIFY sobre
+            la misma BD) o "redis" (pub/sub; "redis-local" usa el sustituto en memoria)
+    """
+    from app.core import transportes_eventos
+
+    if nombre == "memoria":
+        return None
+    if nombre == "postgres":
+        return transportes_eventos.TransportePostgres(database_url)
+    if nombre == "redis":
+        return transportes_eventos.TransporteRedis(transportes_eventos.cliente_redis(redis_url))
+    if nombre == "redis-local":
+        return transportes_eventos.TransporteRedis(transportes_eventos.RedisLocal())
+    raise ValueError(f"EVENTOS_TRANSPORTE desconocido: {nombre}")
@@ -0,0 +1,107 @@
+"""
+Utilidades para franjas horarias semanales.
+Una franja es una hora completa de un dia: "dia-hora", ej: "0-8" = Lunes 8:00.
+Es el mismo formato que usan las solicitudes y el filtro de horarios del frontend.
+"""
+from typing import Iterable, List, Tuple
+
+
+DIAS_POR_SEMANA = 7
+HORAS_POR_DIA = 24
+
+
+def parsear_franja(franja: str) -> Tuple[int, int]:
+    """
+    Convierte "dia-hora" en la tupla (dia, hora).
+
+    Raises:
+        ValueError: Si el formato o los rangos no son validos
+    """
+    try:
+        dia, hora = franja.strip().split('-')
+        dia = int(dia)
+        hora = int(hora)
+    except (ValueError, AttributeError):
+        raise ValueError(f"Horario invalido: '{franja}'. Formato esperado 'dia-hora', ej: '0-8'")
+
+    if not (0 <= dia < DIAS_POR_SEMANA and 0 <= hora < HORAS_POR_DIA):
+        raise ValueError(f"Horario fuera de rango: '{franja}'. Dia 0-6, hora 0-23")
+
+    return dia, hora
+
+
+def parsear_franjas(franjas: Iterable[str]) -> List[Tuple[int, int]]:
+    """
+    Convierte una lista de "dia-hora" en tuplas (dia, hora) ordenadas y sin repetidos.
+
+    Raises:
+        ValueError: Si alguna franja no es valida
+    """
+    return sorted({parsear_franja(f) for f in franjas})
+
+
+def formatear_franja(dia: int, hora: int) -> str:
+    """Convierte (dia, hora) en "dia-hora"."""
+    return f"{dia}-{hora}"
+
+
+# === MASCARA SEMANAL DE DISPONIBILIDAD ===
+# La semana se representa como un entero de 168 bits (7 dias x 24 horas).
+# El bit dia * 24 + hora vale 1 si esa hora esta disponible.
+# Se guarda en la BD como texto hexadecimal de ancho fijo.
+
+FRANJAS_POR_SEMANA = DIAS_POR_SEMANA * HORAS_POR_DIA
+_ANCHO_HEX = FRANJAS_POR_SEMANA // 4
+
+
+def bit_franja(dia: int, hora: int) -> int:
+    """Posicion del bit de la franja (dia, hora) en la mascara."""
+    return dia * HORAS_POR_DIA + hora
+
+
+def mascara_desde_franjas(franjas: Iterable[Tuple[int, int]]) -> int:
+    """Construye la mascara a partir de tuplas (dia, hora)."""
+    mascara = 0
+    for dia, hora in franjas:
+        mascara |= 1 << bit_franja(dia, hora)
+    return mascara
+
+
+def mascara_desde_rangos(rangos: Iterable[Tuple[int, int, int]]) -> int:
+    """
+    Construye la mascara a partir de rangos (dia, hora_inicio, hora_fin),
+    el formato de HorarioTrabajo. La hora_fin no se incluye.
+    """
+    mascara = 0
+    for dia, hora_inicio, hora_fin in rangos:
+        if hora_fin <= hora_inicio:
+            continue
+        ancho = hora_fin - hora_inicio
+        mascara |= ((1 << ancho) - 1) << bit_franja(dia, hora_inicio)
+    return mascara
+
+
+def franjas_de_mascara(mascara: int) -> List[Tuple[int, int]]:
+    """Devuelve las tuplas (dia, hora) encendidas en la mascara, en orden."""
+    franjas = []
+    while mascara:
+        bajo = mascara & -mascara
+        bit = bajo.bit_length() - 1
+        franjas.append(divmod(bit, HORAS_POR_DIA))
+        mascara ^= bajo
+    return franjas
+
+
+def contar_coincidencias(mascara_a: int, mascara_b: int) -> int:
+    """Numero de franjas presentes en ambas mascaras."""
+    return (mascara_a & mascara_b).bit_count()
+
+
+def mascara_a_texto(mascara: int) -> str:
+    """Serializa la mascara como hexadecimal de ancho fijo para la BD."""
+    return format(mascara, f"0{_ANCHO_HEX}x")
+
+
+def mascara_desde_texto(texto) -> int:
+    """Lee la mascara guardada en la BD (None se toma como semana vacia)."""
+    return int(texto, 16) if texto else 0
@@ -0,0 +1,286 @@
+"""
+Transportes del bus de eventos entre procesos (workers de uvicorn/gunicorn,
+comandos de mantenimiento).
+
+Todos tienen la misma interfaz:
+    iniciar(entregar, reconectado)  empieza a escuchar en un thread y llama
+                                    entregar(mensaje) con cada mensaje
+    enviar(mensaje)                 publica el mensaje (texto JSON) a todos los procesos
+    detener()
+
+Si la conexion se pierde se reintenta. Los eventos de ese intervalo no se
+recuperan: al volver a escuchar se llama reconectado() y el bus entrega
+localmente EventosPerdidos para que cada modulo descarte su estado en memoria
+(no todo tiene TTL, p. ej. el indice de disponibilidad).
+"""
+from typing import Callable, Dict, List, Optional
+import abc
+import queue
+import select
+import threading
+
+# Canal compartido por todos los procesos
+CANAL = "chazas_eventos"
+# Segundos de espera antes de reconectar
+_ESPERA_RECONEXION = 5.0
+# NOTIFY de Postgres acepta payloads de menos de 8000 bytes
+_MAX_PAYLOAD_POSTGRES = 7999
+
+
+class _TransporteConThread(abc.ABC):
+    """Manejo comun del thread que escucha."""
+
+    nombre = ""
+
+    def __init__(self):
+        self._entregar: Optional[Callable[[str], None]] = None
+        self._reconectado: Optional[Callable[[], None]] = None
+        self._detenido = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+
+    def iniciar(
+        self,
+        entregar: Callable[[str], None],
+        reconectado: Optional[Callable[[], None]] = None
+    ) -> None:
+        self._entregar = entregar
+        self._reconectado = reconectado
+        self._detenido.clear()
+        self._thread = threading.Thread(
+            target=self._escuchar, name=f"eventos-{self.nombre}", daemon=True
+        )
+        self._thread.start()
+
+    def detener(self) -> None:
+        self._detenido.set()
+        if self._thread is not None:
+            self._thread.join(timeout=_ESPERA_RECONEXION + 1)
+            self._thread = None
+
+    def _avisar_reconexion(self) -> None:
+        """Llamar desde _escuchar cuando vuelve a escuchar despues de perder la conexion."""
+        if self._reconectado is None:
+            return
+        try:
+            self._reconectado()
+        except Exception as e:
+            print(f">> Bus de eventos: error al resincronizar ({e})")
+
+    @abc.abstractmethod
+    def enviar(self, mensaje: str) -> None:
+        """Publica el mensaje a todos los procesos."""
+
+    @abc.abstractmethod
+    def _escuchar(self) -> None:
+        """Cuerpo del thread: entrega cada mensaje recibido hasta que se detenga."""
+
+
+class TransportePostgres(_TransporteConThread):
+    """
+    LISTEN/NOTIFY sobre la misma base de datos de la app: no necesita
+    infraestructura adicional. Usa dos conexiones propias fuera del pool,
+    una que escucha y otra que envia.
+    """
+
+    nombre = "postgres"
+
+    def __init__(self, database_url: str, canal: str = CANAL):
+        super().__init__()
+        from sqlalchemy.engine import make_url
+
+        # La URL de SQLAlchemy puede traer el driver (postgresql+psycopg2://)
+        self._dsn = make_url(database_url).set(drivername="postgresql").render_as_string(
+            hide_password=False
+        )
+        self.canal = canal
+        self._conexion_envio = None
+        self._lock_envio = threading.Lock()
+
+    def _conectar(self):
+        import psycopg2
+
+        conexion = psycopg2.connect(self._dsn)
+        conexion.autocommit = True
+        return conexion
+
+    def enviar(self, mensaje: str) -> None:
+        if len(mensaje.encode("utf-8")) > _MAX_PAYLOAD_POSTGRES:
+            raise ValueError(f"Evento de {len(mensaje)} caracteres, NOTIFY admite menos de 8000 bytes")
+
+        import psycopg2
+
+        with self._lock_envio:
+            for intento in range(2):
+                try:
+                    if self._conexion_envio is None or self._conexion_envio.closed:
+                        self._conexion_envio = self._conectar()
+                    with self._conexion_envio.cursor() as cursor:
+                        cursor.execute("SELECT pg_notify(%s, %s)", (self.canal, mensaje))
+                    return
+                except psycopg2.OperationalError:
+                    # Conexion caida (reinicio de la BD, timeout): reconectar una vez
+                    self._cerrar_envio()
+                    if intento == 1:
+                        raise
+
+    def detener(self) -> None:
+        super().detener()
+        with self._lock_envio:
+            self._cerrar_envio()
+
+    def _cerrar_envio(self) -> None:
+        if self._conexion_envio is not None:
+            try:
+                self._conexion_envio.close()
+            except Exception:
+                pass
+            self._conexion_envio = None
+
+    def _escuchar(self) -> None:
+        import psycopg2
+
+        perdida = False
+        while not self._detenido.is_set():
+            conexion = None
+            try:
+                conexion = self._conectar()
+                with conexion.cursor() as cursor:
+                    cursor.execute(f"LISTEN {self.canal}")
+                if perdida:
+                    # Ya escucha de nuevo: lo que se perdio se descarta localmente
+                    perdida = False
+                    self._avisar_reconexion()
+                while not self._detenido.is_set():
+                    # Espera con timeout para poder revisar si hay que detenerse
+                    if select.select([conexion], [], [], 1.0) == ([], [], []):
+                        continue
+                    conexion.poll()
+                    while conexion.notifies:
+                        self._entregar(conexion.notifies.pop(0).payload)
+            except psycopg2.Error as e:
+                print(f">> Bus de eventos: conexion LISTEN perdida ({e}), reintentando")
+                perdida = True
+                self._detenido.wait(_ESPERA_RECONEXION)
+            finally:
+                if conexion is not None:
+                    conexion.close()
+
+
+class TransporteRedis(_TransporteConThread):
+    """
+    Pub/sub de Redis. Recibe el cliente ya creado: un redis.Redis
+    (ver cliente_redis) o un RedisLocal.
+    """
+
+    nombre = "redis"
+
+    def __init__(self, cliente, canal: str = CANAL):
+        super().__init__()
+        self.cliente = cliente
+        self.canal = canal
+        self._pubsub = None
+
+    def iniciar(
+        self,
+        entregar: Callable[[str], None],
+        reconectado: Optional[Callable[[], None]] = None
+    ) -> None:
+        self._pubsub = self.cliente.pubsub(ignore_subscribe_messages=True)
+        self._pubsub.subscribe(self.canal)
+        super().iniciar(entregar, reconectado)
+
+    def enviar(self, mensaje: str) -> None:
+        self.cliente.publish(self.canal, mensaje)
+
+    def detener(self) -> None:
+        super().detener()
+        if self._pubsub is not None:
+            self._pubsub.close()
+            self._pubsub = None
+
+    def _escuchar(self) -> None:
+        perdida = False
+        while not self._detenido.is_set():
+            try:
+                mensaje = self._pubsub.get_message(timeout=1.0)
+            except Exception as e:
+                # redis-py vuelve a suscribirse solo al reconectar
+                print(f">> Bus de eventos: error leyendo de Redis ({e}), reintentando")
+                perdida = True
+                self._detenido.wait(_ESPERA_RECONEXION)
+                continue
+            if perdida:
+                # La primera lectura sin error ya es con la suscripcion restablecida
+                perdida = False
+                self._avisar_reconexion()
+            if mensaje and mensaje["type"] == "message":
+                datos = mensaje["data"]
+                self._entregar(datos.decode("utf-8") if isinstance(datos, bytes) else datos)
+
+
+def cliente_redis(redis_url: Optional[str]):
+    """Cliente de redis-py para REDIS_URL (dependencia opcional)."""
+    try:
+        import redis
+    except ImportError:
+        raise RuntimeError("EVENTOS_TRANSPORTE=redis requiere el paquete redis (pip install redis)")
+    if not redis_url:
+        raise RuntimeError("EVENTOS_TRANSPORTE=redis requiere REDIS_URL")
+    return redis.Redis.from_url(redis_url)
+
+
+class RedisLocal:
+    """
+    Sustituto en memoria del pub/sub de Redis (publish y pubsub() con
+    subscribe / get_message / close), para pruebas y desarrollo sin servidor.
+    Varios BusEventos que comparten una instancia se comportan como workers
+    distintos conectados al mismo Redis.
+    """
+
+    def __init__(self):
+        self._suscripciones: Dict[str, List["_PubSubLocal"]] = {}
+        self._lock = threading.Lock()
+
+    def publish(self, canal: str, mensaje: str) -> int:
+        """Returns: numero de suscriptores que recibieron el mensaje, como Redis."""
+        with self._lock:
+            destinos = list(self._suscripciones.get(canal, ()))
+        for pubsub in destinos:
+            pubsub._cola.put({"type": "message", "channel": canal, "data": mensaje})
+        return len(destinos)
+
+    def pubsub(self, ignore_subscribe_messages: bool = False) -> "_PubSubLocal":
+        return _PubSubLocal(self, ignore_subscribe_messages)
+
+
+class _PubSubLocal:
+    def __init__(self, servidor: RedisLocal, ignore_subscribe_messages: bool):
+        self._servidor = servidor
+        self._ignorar_suscripcion = ignore_subscribe_messages
+        self._cola: queue.Queue = queue.Queue()
+        self._canales: List[str] = []
+
+    def subscribe(self, *canales: str) -> None:
+        with self._servidor._lock:
+            for canal in canales:
+                self._servidor._suscripciones.setdefault(canal, []).append(self)
+                self._canales.append(canal)
+                if not self._ignorar_suscripcion:
+                    self._cola.put({"type": "subscribe", "channel": canal, "data": len(self._canales)})
+
+    def get_message(self, ignore_subscribe_messages: bool = False, timeout: float = 0.0) -> Optional[dict]:
+        try:
+            mensaje = self._cola.get(timeout=timeout) if timeout else self._cola.get_nowait()
+        except queue.Empty:
+            return None
+        if ignore_subscribe_messages and mensaje["type"] == "subscribe":
+            return None
+        return mensaje
+
+    def close(self) -> None:
+        with self._servidor._lock:
+            for canal in self._canales:
+                suscritos = self._servidor._suscripciones.get(canal, [])
+                if self in suscritos:
+                    suscritos.remove(self)
+            self._canales = []
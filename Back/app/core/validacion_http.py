@@ -0,0 +1,72 @@
+"""
+Peticiones condicionales HTTP (ETag / Last-Modified / 304 Not Modified).
+El validador se calcula con una consulta agregada barata (conteo y ultima
+modificacion) antes de construir la respuesta completa.
+"""
+from datetime import datetime, timezone
+from email.utils import format_datetime, parsedate_to_datetime
+from typing import Optional
+import hashlib
+
+from fastapi import Request, Response, status
+
+
+def generar_etag(*partes) -> str:
+    """ETag fuerte a partir de los valores que identifican la version del recurso."""
+    crudo = "|".join(str(p) for p in partes)
+    return '"' + hashlib.sha1(crudo.encode("utf-8")).hexdigest() + '"'
+
+
+def _a_utc(fecha: datetime) -> datetime:
+    """Las fechas sin zona de la BD estan en UTC."""
+    if fecha.tzinfo is None:
+        return fecha.replace(tzinfo=timezone.utc)
+    return fecha.astimezone(timezone.utc)
+
+
+def _coincide_etag(if_none_match: str, etag: str) -> bool:
+    if if_none_match.strip() == "*":
+        return True
+    # Comparacion debil (RFC 9110): se ignora el prefijo W/
+    candidatos = [e.strip().removeprefix("W/") for e in if_none_match.split(",")]
+    return etag in candidatos
+
+
+def responder_condicional(
+    request: Request,
+    response: Response,
+    etag: str,
+    ultima_modificacion: Optional[datetime] = None
+) -> Optional[Response]:
+    """
+    Agrega ETag y Last-Modified a la respuesta y evalua los headers
+    If-None-Match / If-Modified-Since de la peticion.
+
+    Returns:
+        Una respuesta 304 sin cuerpo si el cliente ya tiene esta version,
+        None si hay que responder normalmente
+    """
+    headers = {"ETag": etag, "Cache-Control": "no-cache"}
+    if ultima_modificacion is not None:
+        ultima_modificacion = _a_utc(ultima_modificacion).replace(microsecond=0)
+        headers["Last-Modified"] = format_datetime(ultima_modificacion, usegmt=True)
+
+    no_modificado = False
+    if_none_match = request.headers.get("if-none-match")
+    if_modified_since = request.headers.get("if-modified-since")
+
+    # If-None-Match tiene prioridad sobre If-Modified-Since
+    if if_none_match is not None:
+        no_modificado = _coincide_etag(if_none_match, etag)
+    elif if_modified_since and ultima_modificacion is not None:
+        try:
+            fecha_cliente = _a_utc(parsedate_to_datetime(if_modified_since))
+            no_modificado = ultima_modificacion <= fecha_cliente
+        except (TypeError, ValueError):
+            no_modificado = False
+
+    if no_modificado:
+        return Response(status_code=status.HTTP_304_NOT_MODIFIED, headers=headers)
+
+    response.headers.update(headers)
+    return None
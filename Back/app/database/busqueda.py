@@ -0,0 +1,145 @@
+"""
+Indice de texto completo para buscar chazas por titulo, descripcion y ubicacion.
+- SQLite: tabla virtual FTS5 'chazas_fts' (rowid = id de la chaza).
+- PostgreSQL: tabla 'chazas_busqueda' con un tsvector e indice GIN.
+
+El texto se guarda normalizado con normalizar_texto (sin tildes, minusculas),
+igual que los slugs, para que "café" encuentre "cafe" y viceversa.
+"""
+from sqlalchemy import text, Integer, Float
+from sqlalchemy.orm import Session
+from typing import List
+import re
+
+from app.models.chaza import Chaza, normalizar_texto
+
+# Maximo de palabras que se toman de la busqueda del usuario
+_MAX_PALABRAS = 8
+
+
+def _es_sqlite(bind) -> bool:
+    return bind.dialect.name == "sqlite"
+
+
+def _documento(chaza: Chaza) -> List[str]:
+    """Campos normalizados de la chaza que se indexan."""
+    return [
+        normalizar_texto(chaza.titulo or ""),
+        normalizar_texto(chaza.descripcion or ""),
+        normalizar_texto(chaza.ubicacion or "")
+    ]
+
+
+def palabras_busqueda(q: str) -> List[str]:
+    """Normaliza la busqueda del usuario y la parte en palabras alfanumericas."""
+    return re.findall(r"[a-z0-9]+", normalizar_texto(q))[:_MAX_PALABRAS]
+
+
+def crear_indice_busqueda(engine) -> bool:
+    """
+    Crea la tabla del indice si no existe.
+
+    Returns:
+        True si se creo (hay que llenarla con reindexar_chazas)
+    """
+    with engine.begin() as conn:
+        if _es_sqlite(conn):
+            existe = conn.execute(text(
+                "SELECT 1 FROM sqlite_master WHERE name = 'chazas_fts'"
+            )).first()
+            if existe:
+                return False
+            conn.execute(text(
+                "CREATE VIRTUAL TABLE chazas_fts USING fts5(titulo, descripcion, ubicacion)"
+            ))
+        else:
+            existe = conn.execute(text("SELECT to_regclass('chazas_busqueda')")).scalar()
+            if existe:
+                return False
+            conn.execute(text(
+                "CREATE TABLE chazas_busqueda ("
+                " chaza_id INTEGER PRIMARY KEY REFERENCES chazas(id) ON DELETE CASCADE,"
+                " documento TSVECTOR NOT NULL)"
+            ))
+            conn.execute(text(
+                "CREATE INDEX ix_chazas_busqueda_documento ON chazas_busqueda USING GIN (documento)"
+            ))
+    return True
+
+
+def indexar_chaza(db: Session, chaza: Chaza) -> None:
+    """
+    Inserta o reemplaza la chaza en el indice.
+    Se ejecuta en la misma transaccion que el cambio de la chaza (antes del commit).
+    """
+    db.flush()
+    titulo, descripcion, ubicacion = _documento(chaza)
+    parametros = {"id": chaza.id, "titulo": titulo, "descripcion": descripcion, "ubicacion": ubicacion}
+
+    if _es_sqlite(db.get_bind()):
+        db.execute(text("DELETE FROM chazas_fts WHERE rowid = :id"), {"id": chaza.id})
+        db.execute(text(
+            "INSERT INTO chazas_fts (rowid, titulo, descripcion, ubicacion)"
+            " VALUES (:id, :titulo, :descripcion, :ubicacion)"
+        ), parametros)
+    else:
+        # El titulo pesa mas que la ubicacion y esta mas que la descripcion
+        db.execute(text(
+            "INSERT INTO chazas_busqueda (chaza_id, documento) VALUES (:id,"
+            " setweight(to_tsvector('simple', :titulo), 'A') ||"
+            " setweight(to_tsvector('simple', :ubicacion), 'B') ||"
+            " setweight(to_tsvector('simple', :descripcion), 'C'))"
+            " ON CONFLICT (chaza_id) DO UPDATE SET documento = EXCLUDED.documento"
+        ), parametros)
+
+
+def reindexar_chazas(db: Session) -> int:
+    """
+    Reconstruye el indice completo desde la tabla chazas.
+
+    Returns:
+        Numero de chazas indexadas
+    """
+    if _es_sqlite(db.get_bind()):
+        db.execute(text("DELETE FROM chazas_fts"))
+    else:
+        db.execute(text("DELETE FROM chazas_busqueda"))
+
+    total = 0
+    for chaza in db.query(Chaza):
+        indexar_chaza(db, chaza)
+        total += 1
+
+    db.commit()
+    return total
+
+
+def consulta_busqueda(db: Session, q: str):
+    """
+    Subconsulta (chaza_id, rango) con las chazas que contienen todas las
+    palabras de q (la ultima palabra como prefijo). Menor rango = mas relevante.
+
+    Returns:
+        Subconsulta para hacer JOIN con chazas, o None si q no tiene palabras
+    """
+    palabras = palabras_busqueda(q)
+    if not palabras:
+        return None
+
+    if _es_sqlite(db.get_bind()):
+        # bm25 ya es "menor es mejor"; pesos: titulo, descripcion, ubicacion
+        expresion = " ".join(f'"{p}"' for p in palabras[:-1]) + f' "{palabras[-1]}"*'
+        consulta = text(
+            "SELECT rowid AS chaza_id, bm25(chazas_fts, 10.0, 1.0, 3.0) AS rango"
+            " FROM chazas_fts WHERE chazas_fts MATCH :expresion"
+        )
+    else:
+        expresion = " & ".join(palabras[:-1] + [f"{palabras[-1]}:*"])
+        consulta = text(
+            "SELECT chaza_id, -ts_rank(documento, to_tsquery('simple', :expresion)) AS rango"
+            " FROM chazas_busqueda WHERE documento @@ to_tsquery('simple', :expresion)"
+        )
+
+    return consulta.bindparams(expresion=expresion).columns(
+        chaza_id=Integer, rango=Float
+    ).subquery("busqueda")
@@ -2,7 +2,8 @@
 Configuración de la base de datos SQLAlchemy.
 Actualmente usa SQLite, pero es FÁCIL migrar a PostgreSQL.
 """
-from sqlalchemy import create_engine
+from sqlalchemy import create_engine, inspect, text
+from sqlalchemy.exc import IntegrityError
 from sqlalchemy.ext.declarative import declarative_base
 from sqlalchemy.orm import sessionmaker
 from app.config import settings
@@ -61,4 +62,56 @@ def init_db():
 
     # Crear todas las tablas
     Base.metadata.create_all(bind=engine)
-    print(">> Base de datos inicializada correctamente")
\ No newline at end of file
+
+    # create_all no toca tablas existentes: agregar columnas e indices nuevos a mano
+    agregar_columnas_faltantes()
+    crear_indices_faltantes()
+
+    # Indice de texto completo de chazas (FTS5 en SQLite, tsvector en PostgreSQL)
+    from app.database.busqueda import crear_indice_busqueda, reindexar_chazas
+    if crear_indice_busqueda(engine):
+        db = SessionLocal()
+        try:
+            print(f">> Indice de busqueda creado: {reindexar_chazas(db)} chazas indexadas")
+        finally:
+            db.close()
+    print(">> Base de datos inicializada correctamente")
+
+
+def agregar_columnas_faltantes():
+    """
+    Agrega a las tablas existentes las columnas nuevas de los modelos.
+    Solo sirve para columnas que aceptan NULL (ALTER TABLE ... ADD COLUMN).
+    """
+    inspector = inspect(engine)
+    tablas_existentes = set(inspector.get_table_names())
+
+    with engine.begin() as conn:
+        for tabla in Base.metadata.sorted_tables:
+            if tabla.name not in tablas_existentes:
+                continue
+            columnas_existentes = {c["name"] for c in inspector.get_columns(tabla.name)}
+            for columna in tabla.columns:
+                if columna.name in columnas_existentes:
+                    continue
+                tipo = columna.type.compile(dialect=engine.dialect)
+                conn.execute(text(f'ALTER TABLE {tabla.name} ADD COLUMN {columna.name} {tipo}'))
+                print(f">> Columna agregada: {tabla.name}.{columna.name}")
+
+
+def crear_indices_faltantes():
+    """
+    Crea los indices declarados en los modelos que aun no existen en la BD.
+    Necesario para bases de datos creadas antes de agregar un indice.
+    """
+    for tabla in Base.metadata.sorted_tables:
+        for indice in tabla.indexes:
+            try:
+                indice.create(bind=engine, checkfirst=True)
+            except IntegrityError:
+                # Indice unico sobre datos que ya tienen duplicados: la API
+                # arranca igual y el indice se crea despues de depurarlos
+                if not indice.unique:
+                    raise
+                print(f">> AVISO: no se pudo crear {indice.name}, hay filas duplicadas "
+                      f"(ver 'python mantenimiento.py --help')")
\ No newline at end of file
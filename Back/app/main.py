@@ -10,6 +10,9 @@ from app.config import settings
 from app.database.session import init_db, SessionLocal
 from app.api.routes import auth, chazas, uploads, universidades, notificaciones, solicitudes, contacto
 from app.services.universidad_service import UniversidadService
+from app.services.chaza_service import ChazaService
+from app.services.notificaciones_en_vivo import canal_notificaciones
+from app.core.eventos import bus_eventos, crear_transporte
 
 
 # Crear aplicación FastAPI
@@ -29,6 +32,7 @@ app.add_middleware(
     allow_credentials=True,
     allow_methods=["*"],  # Permitir todos los métodos (GET, POST, PUT, DELETE, etc.)
     allow_headers=["*"],  # Permitir todos los headers
+    expose_headers=["X-Next-Cursor", "ETag", "Last-Modified"],  # Headers que el frontend puede leer
 )
 
 
@@ -53,9 +57,21 @@ def on_startup():
     finally:
         db.close()
 
+    # Bus de eventos entre workers
+    bus_eventos.configurar(crear_transporte(
+        settings.EVENTOS_TRANSPORTE, settings.DATABASE_URL, settings.REDIS_URL
+    ))
+    print(f">> Bus de eventos: {settings.EVENTOS_TRANSPORTE}")
+
     print(">> API lista y funcionando")
 
 
+@app.on_event("shutdown")
+def on_shutdown():
+    """Cierra las conexiones del bus de eventos."""
+    bus_eventos.detener()
+
+
 # Incluir rutas
 app.include_router(auth.router, prefix="/api/v1")
 app.include_router(universidades.router, prefix="/api/v1")
@@ -85,11 +101,19 @@ def root():
 def health_check():
     """
     Health check endpoint para monitoreo.
+    Incluye los contadores de hits/misses de los caches en memoria,
+    las conexiones abiertas al stream de notificaciones y el transporte
+    del bus de eventos.
     """
     return {
         "status": "healthy",
         "app": settings.APP_NAME,
-        "version": settings.API_VERSION
+        "version": settings.API_VERSION,
+        "cache": {
+            "chazas": ChazaService.estadisticas_cache()
+        },
+        "notificaciones_en_vivo": canal_notificaciones.estadisticas(),
+        "eventos": bus_eventos.estadisticas()
     }
 
 
@@ -2,13 +2,14 @@
 from app.models.universidad import Universidad
 from app.models.user import User
 from app.models.chaza import Chaza, HorarioTrabajo
-from app.models.solicitud import Solicitud, EstadoSolicitud
-from app.models.notificacion import Notificacion, TipoNotificacion
+from app.models.solicitud import Solicitud, EstadoSolicitud, SolicitudArchivada, ContadorSolicitudes
+from app.models.notificacion import Notificacion, TipoNotificacion, ContadorNotificaciones
 from app.models.verification_code import VerificationCode
 from app.models.contacto import MensajeContacto
 
 __all__ = [
     "Universidad", "User", "Chaza", "HorarioTrabajo",
-    "Solicitud", "EstadoSolicitud", "Notificacion", "TipoNotificacion",
+    "Solicitud", "EstadoSolicitud", "SolicitudArchivada", "ContadorSolicitudes", "Notificacion", "TipoNotificacion",
+    "ContadorNotificaciones",
     "VerificationCode", "MensajeContacto"
 ]
\ No newline at end of file
@@ -2,7 +2,7 @@
 Modelo de Chaza para la base de datos.
 Define la tabla 'chazas' con SQLAlchemy.
 """
-from sqlalchemy import Column, Integer, String, Text, Float, Boolean, DateTime, ForeignKey, Time
+from sqlalchemy import Column, Integer, String, Text, Float, Boolean, DateTime, ForeignKey, Time, Index
 from sqlalchemy.orm import relationship
 from sqlalchemy.sql import func
 from app.database.session import Base
@@ -10,13 +10,18 @@ import re
 import unicodedata
 
 
-def generar_slug(titulo: str) -> str:
-    """Genera un slug a partir del titulo de la chaza."""
+def normalizar_texto(texto: str) -> str:
+    """Quita tildes y pasa a minusculas: "Café" -> "cafe"."""
     # Normalizar caracteres unicode (quitar tildes)
-    texto = unicodedata.normalize('NFKD', titulo)
+    texto = unicodedata.normalize('NFKD', texto)
     texto = texto.encode('ascii', 'ignore').decode('ascii')
+    return texto.lower()
+
+
+def generar_slug(titulo: str) -> str:
+    """Genera un slug a partir del titulo de la chaza."""
     # Convertir a minusculas y reemplazar espacios por guiones
-    texto = texto.lower().strip()
+    texto = normalizar_texto(titulo).strip()
     texto = re.sub(r'[^a-z0-9\s-]', '', texto)
     texto = re.sub(r'[\s_-]+', '-', texto)
     return texto
@@ -54,6 +59,11 @@ class Chaza(Base):
     is_active = Column(Boolean, default=True, index=True)  # Si la chaza está disponible
     is_completed = Column(Boolean, default=False)  # Si ya fue completada
 
+    # Disponibilidad semanal desnormalizada de los horarios activos:
+    # mascara de 168 bits (7 dias x 24 horas) en hexadecimal, ver app/core/horarios.py
+    # La mantiene ChazaService al modificar horarios
+    disponibilidad = Column(String(42), nullable=True)
+
     # Timestamps
     created_at = Column(DateTime(timezone=True), server_default=func.now())
     updated_at = Column(DateTime(timezone=True), onupdate=func.now())
@@ -62,6 +72,11 @@ class Chaza(Base):
     horarios = relationship("HorarioTrabajo", back_populates="chaza", cascade="all, delete-orphan")
     universidad = relationship("Universidad", back_populates="chazas")
 
+    __table_args__ = (
+        # Listado por universidad ordenado por fecha: sirve la paginacion por cursor
+        Index("ix_chazas_universidad_activa_fecha", "universidad_id", "is_active", "created_at", "id"),
+    )
+
     def __repr__(self):
         return f"<Chaza(id={self.id}, titulo='{self.titulo}', categoria='{self.categoria}')>"
 
@@ -90,6 +105,11 @@ class HorarioTrabajo(Base):
     # Relacion con chaza
     chaza = relationship("Chaza", back_populates="horarios")
 
+    __table_args__ = (
+        # Busqueda de chazas compatibles: horarios que cubren un (dia, hora)
+        Index("ix_horarios_trabajo_dia_hora", "dia_semana", "hora_inicio", "hora_fin"),
+    )
+
     def __repr__(self):
         dias = ["Lunes", "Martes", "Miercoles", "Jueves", "Viernes", "Sabado", "Domingo"]
         return f"<HorarioTrabajo({dias[self.dia_semana]} {self.hora_inicio}:00 - {self.hora_fin}:00)>"
\ No newline at end of file
@@ -1,4 +1,4 @@
-from sqlalchemy import Column, Integer, String, Text, Boolean, DateTime, ForeignKey, Enum
+from sqlalchemy import Column, Integer, String, Text, Boolean, DateTime, ForeignKey, Enum, Index
 from sqlalchemy.orm import relationship
 from datetime import datetime
 import enum
@@ -50,6 +50,27 @@ class Notificacion(Base):
     # Relaciones opcionales
     chaza = relationship("Chaza", backref="notificaciones_relacionadas")
 
+    __table_args__ = (
+        # Paginacion por cursor (created_at, id) sin ordenar en memoria,
+        # con el filtro de no leidas y sin filtrar
+        Index("ix_notificaciones_usuario_leida_fecha", "usuario_id", "leida", "created_at", "id"),
+        Index("ix_notificaciones_usuario_fecha", "usuario_id", "created_at", "id"),
+    )
+
     def marcar_como_leida(self):
         self.leida = True
-        self.read_at = datetime.utcnow()
\ No newline at end of file
+        self.read_at = datetime.utcnow()
+
+class ContadorNotificaciones(Base):
+    """
+    Notificaciones sin leer de cada usuario, para el badge del header sin
+    contar filas en cada consulta. Se actualiza en la misma transaccion que
+    cada cambio (ver NotificacionService) y se reconcilia con mantenimiento.py.
+    """
+    __tablename__ = "contadores_notificaciones"
+
+    usuario_id = Column(Integer, ForeignKey("users.id", ondelete="CASCADE"), primary_key=True)
+    sin_leer = Column(Integer, nullable=False, default=0)
+
+    def __repr__(self):
+        return f"<ContadorNotificaciones(usuario={self.usuario_id}, sin_leer={self.sin_leer})>"
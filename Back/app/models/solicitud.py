@@ -2,7 +2,7 @@
 Modelo de Solicitud de trabajo.
 Representa una solicitud de un estudiante para trabajar en una chaza.
 """
-from sqlalchemy import Column, Integer, String, Text, DateTime, ForeignKey, Enum, JSON
+from sqlalchemy import Column, Integer, String, Text, DateTime, ForeignKey, Enum, JSON, Index, text
 from sqlalchemy.orm import relationship
 from datetime import datetime
 import enum
@@ -38,6 +38,12 @@ class Solicitud(Base):
     # Donde el primer número es el día (0=Lunes) y el segundo es la hora
     horarios_seleccionados = Column(JSON, nullable=False)
 
+    # Forma normalizada de los horarios, calculada una sola vez al crear la solicitud:
+    # mascara semanal de 168 bits en hexadecimal (ver app/core/horarios.py)
+    # y el texto legible ya formateado para las respuestas
+    horarios_mascara = Column(String(42), nullable=True)
+    horarios_formateados = Column(Text, nullable=True)
+
     # Mensaje opcional del estudiante
     mensaje = Column(Text, nullable=True)
 
@@ -52,5 +58,82 @@ class Solicitud(Base):
     respuesta = Column(Text, nullable=True)
     respondido_at = Column(DateTime, nullable=True)
 
+    # Un estudiante solo puede tener una solicitud pendiente por chaza.
+    # Indice unico parcial (SQLite y PostgreSQL): la BD rechaza el duplicado
+    # aunque lleguen dos peticiones a la vez. El Enum guarda el nombre del miembro.
+    __table_args__ = (
+        Index(
+            "uq_solicitudes_pendiente_estudiante_chaza", "estudiante_id", "chaza_id",
+            unique=True,
+            sqlite_where=text("estado = 'PENDIENTE'"),
+            postgresql_where=text("estado = 'PENDIENTE'")
+        ),
+        # Paginacion por cursor (created_at, id) sin ordenar en memoria:
+        # bandeja de la chaza filtrada por estado y sin filtrar, y "mis solicitudes"
+        Index("ix_solicitudes_chaza_estado_fecha", "chaza_id", "estado", "created_at", "id"),
+        Index("ix_solicitudes_chaza_fecha", "chaza_id", "created_at", "id"),
+        Index("ix_solicitudes_estudiante_fecha", "estudiante_id", "created_at", "id"),
+        # Lotes de archivar_solicitudes: estado archivable y sin cambios desde una fecha
+        Index("ix_solicitudes_estado_actualizacion", "estado", "updated_at"),
+        # Los ids no se reutilizan: una solicitud nueva no puede chocar en
+        # solicitudes_archivadas con una archivada que tuvo el mismo id.
+        # create_all no cambia tablas existentes; en esas BD lo evita
+        # SolicitudService.archivar_solicitudes (nunca archiva el id maximo).
+        {"sqlite_autoincrement": True},
+    )
+
     def __repr__(self):
         return f"<Solicitud(id={self.id}, estudiante={self.estudiante_id}, chaza={self.chaza_id}, estado={self.estado})>"
+
+
+# Estados que ya no cambian y se pueden mover al archivo
+ESTADOS_ARCHIVABLES = (EstadoSolicitud.RECHAZADA, EstadoSolicitud.CANCELADA)
+
+
+class SolicitudArchivada(Base):
+    """
+    Solicitudes rechazadas o canceladas antiguas, movidas fuera de 'solicitudes'
+    para que las consultas del dia a dia no carguen con el historial.
+    Mismas columnas y mismo id que tenian en 'solicitudes'.
+    """
+    __tablename__ = "solicitudes_archivadas"
+
+    id = Column(Integer, primary_key=True, autoincrement=False)
+    estudiante_id = Column(Integer, ForeignKey("users.id"), nullable=False)
+    chaza_id = Column(Integer, ForeignKey("chazas.id"), nullable=False, index=True)
+    horarios_seleccionados = Column(JSON, nullable=False)
+    horarios_mascara = Column(String(42), nullable=True)
+    horarios_formateados = Column(Text, nullable=True)
+    mensaje = Column(Text, nullable=True)
+    estado = Column(Enum(EstadoSolicitud), nullable=False)
+    created_at = Column(DateTime)
+    updated_at = Column(DateTime)
+    respuesta = Column(Text, nullable=True)
+    respondido_at = Column(DateTime, nullable=True)
+    archivada_at = Column(DateTime, default=datetime.utcnow)
+
+    __table_args__ = (
+        # Historial del estudiante con el mismo orden que "mis solicitudes"
+        Index("ix_solicitudes_archivadas_estudiante_fecha", "estudiante_id", "created_at", "id"),
+    )
+
+    def __repr__(self):
+        return f"<SolicitudArchivada(id={self.id}, estudiante={self.estudiante_id}, chaza={self.chaza_id}, estado={self.estado})>"
+
+
+class ContadorSolicitudes(Base):
+    """
+    Totales de solicitudes por estado de cada chaza, para el panel del chazero.
+    Se actualizan en la misma transaccion que cada cambio de estado
+    (ver SolicitudService) y se pueden recalcular con mantenimiento.py.
+    """
+    __tablename__ = "contadores_solicitudes"
+
+    chaza_id = Column(Integer, ForeignKey("chazas.id", ondelete="CASCADE"), primary_key=True)
+    pendientes = Column(Integer, nullable=False, default=0)
+    aceptadas = Column(Integer, nullable=False, default=0)
+    rechazadas = Column(Integer, nullable=False, default=0)
+
+    def __repr__(self):
+        return (f"<ContadorSolicitudes(chaza={self.chaza_id}, pendientes={self.pendientes}, "
+                f"aceptadas={self.aceptadas}, rechazadas={self.rechazadas})>")
@@ -144,4 +144,45 @@ class ChazaResponse(BaseModel):
                 "updated_at": None,
                 "horarios": []
             }
-        }
\ No newline at end of file
+        }
+
+class ChazaSummary(BaseModel):
+    """
+    Schema resumido de chaza para listados (tarjetas del grid).
+    No incluye descripcion, telefono, universidad ni horarios.
+    """
+    id: int
+    titulo: str
+    slug: str
+    categoria: str
+    precio: Optional[float]
+    ubicacion: str
+    duracion_estimada: Optional[str]
+    imagen_url: Optional[str]
+    universidad_id: int
+    is_active: bool
+    created_at: datetime
+
+    class Config:
+        from_attributes = True
+
+
+class ChazasLoteResponse(BaseModel):
+    """Resultado de buscar varias chazas por id o slug en una sola peticion."""
+    chazas: List[ChazaResponse]  # En el orden pedido, solo las encontradas
+    no_encontradas: List[str] = []  # Ids o slugs pedidos que no existen
+
+
+# === SCHEMAS DE BUSQUEDA POR HORARIO ===
+
+class ChazaCompatibleResponse(ChazaResponse):
+    """Chaza con su compatibilidad frente a los horarios de un estudiante."""
+    horarios_comunes: List[str] = []  # Franjas "dia-hora" que coinciden
+    cantidad_coincidencias: int
+    porcentaje_compatibilidad: float  # Sobre el total de horas del estudiante
+
+
+class ChazasCompatiblesResponse(BaseModel):
+    """Pagina de chazas ordenadas por compatibilidad de horario."""
+    total: int  # Chazas con al menos una coincidencia
+    chazas: List[ChazaCompatibleResponse]
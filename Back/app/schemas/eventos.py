@@ -0,0 +1,79 @@
+"""
+Eventos de dominio que se publican en el bus de eventos (app.core.eventos)
+despues de cada commit. Viajan como JSON entre workers, asi que solo llevan
+ids y los valores que necesita quien los recibe para actualizar su estado
+en memoria sin consultar la BD.
+"""
+from pydantic import BaseModel
+from typing import ClassVar, Dict, Optional, Type
+
+
+class EventoDominio(BaseModel):
+    """Base de los eventos. Cada subclase declara un `tipo` unico."""
+
+    tipo: ClassVar[str]
+    _tipos: ClassVar[Dict[str, Type["EventoDominio"]]] = {}
+
+    def __init_subclass__(cls, **kwargs):
+        super().__init_subclass__(**kwargs)
+        EventoDominio._tipos[cls.tipo] = cls
+
+    @classmethod
+    def desde_dict(cls, tipo: str, datos: dict) -> "EventoDominio":
+        """Reconstruye un evento recibido por el transporte."""
+        if tipo not in EventoDominio._tipos:
+            raise ValueError(f"Tipo de evento desconocido: {tipo}")
+        return EventoDominio._tipos[tipo].model_validate(datos)
+
+
+class ChazaCambiada(EventoDominio):
+    """Se creo, edito, elimino o cambiaron los horarios de una chaza."""
+    tipo: ClassVar[str] = "chaza_cambiada"
+
+    chaza_id: int
+    universidad_id: Optional[int] = None
+    slug: str
+    is_active: bool
+    disponibilidad: Optional[str] = None  # Mascara de 168 bits en hexadecimal
+
+
+class ChazasRecalculadas(EventoDominio):
+    """Cambio masivo (backfill de disponibilidad): descartar todo lo de chazas."""
+    tipo: ClassVar[str] = "chazas_recalculadas"
+
+
+class EventosPerdidos(EventoDominio):
+    """
+    Solo local: el transporte se reconecto y los eventos de otros procesos
+    durante la desconexion se perdieron. Descartar el estado derivado en memoria.
+    """
+    tipo: ClassVar[str] = "eventos_perdidos"
+
+
+class UniversidadCambiada(EventoDominio):
+    """Se creo o edito una universidad."""
+    tipo: ClassVar[str] = "universidad_cambiada"
+
+    universidad_id: int
+
+
+class SolicitudCambiada(EventoDominio):
+    """Se creo una solicitud o cambio su estado."""
+    tipo: ClassVar[str] = "solicitud_cambiada"
+
+    solicitud_id: int
+    chaza_id: int
+    estudiante_id: int
+    estado: str
+
+
+class NotificacionesCambiadas(EventoDominio):
+    """
+    Cambiaron las notificaciones de un usuario: llego una nueva
+    (`notificacion` con la respuesta serializada) o cambio el conteo de no leidas.
+    """
+    tipo: ClassVar[str] = "notificaciones_cambiadas"
+
+    usuario_id: int
+    sin_leer: int
+    notificacion: Optional[dict] = None
@@ -2,7 +2,7 @@
 Schemas para Solicitudes de trabajo.
 """
 from pydantic import BaseModel, Field
-from typing import Optional, List
+from typing import Optional, List, Literal
 from datetime import datetime
 from enum import Enum
 
@@ -58,3 +58,37 @@ class ResponderSolicitudRequest(BaseModel):
         description="Nuevo estado: 'aceptada' o 'rechazada'"
     )
     respuesta: Optional[str] = Field(None, max_length=500)
+
+
+class ResponderSolicitudesLoteRequest(BaseModel):
+    """Schema para responder varias solicitudes a la vez"""
+    solicitud_ids: List[int] = Field(..., min_length=1, max_length=100)
+    estado: EstadoSolicitudEnum = Field(
+        ...,
+        description="Nuevo estado para todas: 'aceptada' o 'rechazada'"
+    )
+    respuesta: Optional[str] = Field(None, max_length=500)
+
+
+class ResultadoRespuestaLote(BaseModel):
+    """Resultado de responder una solicitud dentro de un lote"""
+    solicitud_id: int
+    resultado: Literal["actualizada", "no_encontrada", "sin_permiso", "ya_respondida"]
+    detalle: Optional[str] = None
+
+
+class ResponderSolicitudesLoteResponse(BaseModel):
+    """Respuesta de PUT /solicitudes/responder-lote"""
+    estado: EstadoSolicitudEnum
+    actualizadas: int
+    resultados: List[ResultadoRespuestaLote]
+
+
+class ContadoresChazaResponse(BaseModel):
+    """Totales de solicitudes por estado de una chaza (panel del chazero)"""
+    chaza_id: int
+    chaza_nombre: str
+    is_active: bool
+    pendientes: int
+    aceptadas: int
+    rechazadas: int
@@ -0,0 +1,87 @@
+"""
+Ajuste de horarios entre las solicitudes de una chaza y sus horarios publicados.
+Todas las solicitudes se procesan juntas como una matriz solicitudes x 168 franjas,
+asi el costo no depende de un ciclo en Python por solicitud.
+
+Se usa desde SolicitudService.ranking_solicitudes_chaza.
+"""
+from typing import List, Optional, Sequence
+import numpy as np
+
+from app.core.horarios import FRANJAS_POR_SEMANA
+
+
+def matriz_de_mascaras(mascaras: Sequence[Optional[str]]) -> np.ndarray:
+    """
+    Convierte mascaras en hexadecimal (formato de la BD) en una matriz booleana
+    n x 168 donde la columna i es el bit i (dia * 24 + hora). None = semana vacia.
+    """
+    ancho = FRANJAS_POR_SEMANA // 8
+    vacia = bytes(ancho)
+    crudo = b"".join(bytes.fromhex(m) if m else vacia for m in mascaras)
+    bits = np.unpackbits(
+        np.frombuffer(crudo, dtype=np.uint8).reshape(len(mascaras), ancho), axis=1
+    )
+    # El hexadecimal es big-endian: la primera columna desempacada es el bit 167
+    return bits[:, ::-1].astype(bool)
+
+
+def vector_de_mascara(mascara: int) -> np.ndarray:
+    """Mascara de 168 bits como vector booleano."""
+    bits = np.frombuffer(mascara.to_bytes(FRANJAS_POR_SEMANA // 8, "little"), dtype=np.uint8)
+    return np.unpackbits(bits, bitorder="little").astype(bool)
+
+
+def medir_ajuste(solicitudes: np.ndarray, chaza: np.ndarray) -> dict:
+    """
+    Coincidencias de cada solicitud con los horarios de la chaza.
+
+    Returns:
+        dict de arreglos de largo n: coincidencias, seleccionadas,
+        cobertura (fraccion de horas de la chaza) y precision
+        (fraccion de horas de la solicitud que caen en horario de la chaza)
+    """
+    coincidencias = (solicitudes & chaza).sum(axis=1)
+    seleccionadas = solicitudes.sum(axis=1)
+    horas_chaza = int(chaza.sum())
+    cobertura = coincidencias / horas_chaza if horas_chaza else np.zeros(len(solicitudes))
+    precision = np.divide(
+        coincidencias, seleccionadas,
+        out=np.zeros(len(solicitudes)), where=seleccionadas > 0
+    )
+    return {
+        "coincidencias": coincidencias,
+        "seleccionadas": seleccionadas,
+        "cobertura": cobertura,
+        "precision": precision,
+    }
+
+
+def ordenar_por_ajuste(ajuste: dict) -> np.ndarray:
+    """
+    Indices de las solicitudes de mejor a peor ajuste: mas coincidencias,
+    luego mayor precision; en empate se respeta el orden recibido.
+    """
+    orden_original = np.arange(len(ajuste["coincidencias"]))
+    return np.lexsort((orden_original, -ajuste["precision"], -ajuste["coincidencias"]))
+
+
+def cobertura_minima(solicitudes: np.ndarray, chaza: np.ndarray) -> List[int]:
+    """
+    Conjunto pequeño de solicitudes que cubre todas las horas de la chaza
+    que alguien puede cubrir (greedy de set cover: en cada paso la solicitud
+    que cubre mas horas aun sin cubrir).
+
+    Returns:
+        Indices de las solicitudes elegidas, en el orden en que se eligieron
+    """
+    utiles = (solicitudes & chaza).astype(np.float32)
+    faltantes = chaza.astype(np.float32)
+    elegidas = []
+    while True:
+        ganancias = utiles @ faltantes
+        mejor = int(np.argmax(ganancias)) if len(ganancias) else 0
+        if not len(ganancias) or ganancias[mejor] <= 0:
+            return elegidas
+        elegidas.append(mejor)
+        faltantes[utiles[mejor] > 0] = 0
@@ -2,14 +2,204 @@
 Servicio de Chazas.
 Contiene toda la lógica de negocio relacionada con chazas.
 """
-from sqlalchemy.orm import Session
+from sqlalchemy import tuple_, bindparam, select, literal, union_all, func, distinct, and_, case
+from sqlalchemy.dialects import sqlite
+from sqlalchemy.orm import Session, Query, selectinload, joinedload, load_only
 from fastapi import HTTPException, status
-from typing import List, Optional
+from typing import List, Optional, Tuple, Union
+from datetime import datetime
 import uuid
 
 from app.models.chaza import Chaza, HorarioTrabajo, generar_slug
 from app.models.user import User
-from app.schemas.chaza import ChazaCreate, ChazaUpdate, ChazaResponse, HorarioTrabajoCreate, HorarioTrabajoResponse
+from app.models.universidad import Universidad
+from app.schemas.chaza import (
+    ChazaCreate, ChazaUpdate, ChazaResponse, HorarioTrabajoCreate, HorarioTrabajoResponse,
+    ChazaCompatibleResponse, ChazasCompatiblesResponse, ChazaSummary, ChazasLoteResponse
+)
+from app.services.indice_disponibilidad import indice_disponibilidad
+from app.schemas.eventos import ChazaCambiada, ChazasRecalculadas, EventoDominio, EventosPerdidos
+from app.core.eventos import bus_eventos
+from app.database.busqueda import consulta_busqueda, indexar_chaza, palabras_busqueda
+from app.core.cache import CacheConContadores
+from app.core.cursor import codificar_cursor, decodificar_cursor
+from app.core.horarios import (
+    parsear_franjas, formatear_franja, HORAS_POR_DIA,
+    mascara_desde_franjas, mascara_desde_rangos, mascara_desde_texto, mascara_a_texto,
+    franjas_de_mascara
+)
+
+
+def _con_relaciones(query: Query) -> Query:
+    """
+    Carga horarios y universidad junto con las chazas.
+    Evita el N+1 de ChazaResponse.model_validate: un JOIN para la
+    universidad y un solo SELECT ... IN para los horarios de toda la pagina.
+    """
+    return query.options(
+        joinedload(Chaza.universidad),
+        selectinload(Chaza.horarios)
+    )
+
+
+# Maximo de chazas que se pueden pedir en un lote
+MAX_CHAZAS_POR_LOTE = 50
+
+# Cache de lecturas publicas: max 512 entradas, expira a los 5 minutos.
+# Claves: ("lista", universidad_id, ...), ("id", chaza_id), ("slug", slug), ("horarios", chaza_id)
+_chazas_cache = CacheConContadores(maxsize=512, ttl=300)
+
+
+# Columnas que necesita ChazaSummary (el resto no se lee de la BD)
+_COLUMNAS_RESUMEN = [getattr(Chaza, campo) for campo in ChazaSummary.model_fields]
+
+
+def _publicar_cambio_chaza(chaza: Chaza) -> None:
+    """
+    Avisa a todos los workers que la chaza cambio (ver _al_cambiar_chaza).
+    Llamar despues del commit de cualquier cambio de la chaza o sus horarios.
+    """
+    bus_eventos.publicar(ChazaCambiada(
+        chaza_id=chaza.id,
+        universidad_id=chaza.universidad_id,
+        slug=chaza.slug,
+        is_active=chaza.is_active,
+        disponibilidad=chaza.disponibilidad
+    ))
+
+
+@bus_eventos.suscribir(ChazaCambiada)
+def _al_cambiar_chaza(evento: ChazaCambiada) -> None:
+    """
+    Actualiza la fila de la chaza en el indice de disponibilidad y elimina del
+    cache todo lo que puede contenerla: su detalle, sus horarios y los
+    listados de su universidad (o sin filtro de universidad).
+    """
+    indice_disponibilidad.actualizar(
+        evento.universidad_id, evento.chaza_id, evento.is_active, evento.disponibilidad
+    )
+    propias = {("id", evento.chaza_id), ("slug", evento.slug), ("horarios", evento.chaza_id)}
+    _chazas_cache.invalidar(
+        lambda clave: clave[:2] in propias
+        or (clave[0] == "lista" and clave[1] in (None, evento.universidad_id))
+    )
+
+
+@bus_eventos.suscribir(ChazasRecalculadas)
+@bus_eventos.suscribir(EventosPerdidos)
+def _al_recalcular_chazas(evento: EventoDominio) -> None:
+    indice_disponibilidad.limpiar()
+    _chazas_cache.limpiar()
+
+
+def _decodificar_cursor(cursor: str) -> Tuple[datetime, int]:
+    """
+    Decodifica el cursor de paginacion del listado.
+
+    Raises:
+        HTTPException: Si el cursor esta mal formado
+    """
+    try:
+        return decodificar_cursor(cursor)
+    except ValueError as e:
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=str(e))
+
+
+def _parametro_fecha(db: Session, fecha: datetime):
+    """
+    Parametro de fecha comparable con created_at.
+    SQLite guarda CURRENT_TIMESTAMP como texto sin microsegundos, asi que el
+    parametro debe usar el mismo formato para que la igualdad funcione.
+    """
+    if db.get_bind().dialect.name == "sqlite" and fecha.microsecond == 0:
+        formato = "%(year)04d-%(month)02d-%(day)02d %(hour)02d:%(minute)02d:%(second)02d"
+        return bindparam(None, fecha, type_=sqlite.DATETIME(storage_format=formato))
+    return bindparam(None, fecha, type_=Chaza.created_at.type)
+
+
+def _actualizar_disponibilidad(db: Session, chaza: Chaza) -> None:
+    """
+    Recalcula la mascara de disponibilidad de la chaza desde sus horarios activos.
+    Se llama antes del commit en cada metodo que modifica horarios.
+    """
+    db.flush()
+    rangos = db.query(
+        HorarioTrabajo.dia_semana, HorarioTrabajo.hora_inicio, HorarioTrabajo.hora_fin
+    ).filter(
+        HorarioTrabajo.chaza_id == chaza.id,
+        HorarioTrabajo.activo == True
+    ).all()
+    chaza.disponibilidad = mascara_a_texto(mascara_desde_rangos(rangos))
+    # Cambiar horarios cuenta como modificacion de la chaza (ETag / Last-Modified)
+    chaza.updated_at = func.now()
+
+
+def _mascara_chaza(chaza: Chaza) -> int:
+    """Mascara de disponibilidad de una chaza ya cargada (con sus horarios)."""
+    if chaza.disponibilidad is not None:
+        return mascara_desde_texto(chaza.disponibilidad)
+    # Fila sin backfill: calcular desde los horarios cargados
+    return mascara_desde_rangos(
+        (h.dia_semana, h.hora_inicio, h.hora_fin) for h in chaza.horarios if h.activo
+    )
+
+
+def _ranking_compatibles_sql(
+    db: Session,
+    franjas_estudiante: List[Tuple[int, int]],
+    skip: int,
+    limit: int,
+    universidad_id: Optional[int],
+    categoria: Optional[str]
+) -> Tuple[int, List[Tuple[int, int]]]:
+    """
+    Cuenta coincidencias contra horarios_trabajo en la BD.
+
+    Returns:
+        Total de chazas compatibles y la pagina como (chaza_id, coincidencias)
+    """
+    # Tabla temporal con las franjas del estudiante: (dia, hora)
+    franjas = union_all(*[
+        select(literal(dia).label("dia"), literal(hora).label("hora"))
+        for dia, hora in franjas_estudiante
+    ]).subquery("franjas")
+
+    # Una franja coincide si cae dentro de [hora_inicio, hora_fin) de un horario activo
+    coincidencias = func.count(distinct(franjas.c.dia * HORAS_POR_DIA + franjas.c.hora))
+    ranking = select(
+        Chaza.id.label("chaza_id"),
+        coincidencias.label("coincidencias")
+    ).select_from(franjas).join(
+        HorarioTrabajo,
+        and_(
+            HorarioTrabajo.dia_semana == franjas.c.dia,
+            HorarioTrabajo.hora_inicio <= franjas.c.hora,
+            HorarioTrabajo.hora_fin > franjas.c.hora,
+            HorarioTrabajo.activo == True
+        )
+    ).join(Chaza, Chaza.id == HorarioTrabajo.chaza_id).where(
+        Chaza.is_active == True
+    ).group_by(Chaza.id)
+
+    if universidad_id:
+        ranking = ranking.where(Chaza.universidad_id == universidad_id)
+
+    if categoria:
+        ranking = ranking.where(Chaza.categoria == categoria)
+
+    ranking = ranking.subquery("ranking")
+
+    total = db.execute(select(func.count()).select_from(ranking)).scalar()
+
+    # Mismo orden que IndiceDisponibilidad: en empates, el id mas reciente primero
+    pagina = db.execute(
+        select(ranking.c.chaza_id, ranking.c.coincidencias).order_by(
+            ranking.c.coincidencias.desc(),
+            ranking.c.chaza_id.desc()
+        ).offset(skip).limit(limit)
+    ).all()
+
+    return total, [(fila.chaza_id, fila.coincidencias) for fila in pagina]
 
 
 class ChazaService:
@@ -77,8 +267,10 @@ class ChazaService:
         )
 
         db.add(new_chaza)
+        indexar_chaza(db, new_chaza)
         db.commit()
         db.refresh(new_chaza)
+        _publicar_cambio_chaza(new_chaza)
 
         return ChazaResponse.model_validate(new_chaza)
 
@@ -89,8 +281,12 @@ class ChazaService:
         limit: int = 100,
         categoria: Optional[str] = None,
         activas_solo: bool = True,
-        universidad_id: Optional[int] = None
-    ) -> List[ChazaResponse]:
+        universidad_id: Optional[int] = None,
+        cursor: Optional[str] = None,
+        q: Optional[str] = None,
+        resumen: bool = False,
+        version: Optional[tuple] = None
+    ) -> Union[List[ChazaResponse], List[ChazaSummary]]:
         """
         Obtiene todas las chazas con filtros opcionales.
 
@@ -101,11 +297,37 @@ class ChazaService:
             categoria: Filtrar por categoría (opcional)
             activas_solo: Solo mostrar chazas activas
             universidad_id: Filtrar por universidad (opcional)
+            cursor: Cursor opaco de la página anterior (ignora skip)
+            q: Texto a buscar en titulo, descripcion y ubicacion (ordena por relevancia)
+            resumen: Devolver ChazaSummary (solo columnas de la tarjeta, sin relaciones)
+            version: Version del listado con la que la ruta genero el ETag (ver version_listado)
 
         Returns:
             Lista de chazas
         """
-        query = db.query(Chaza)
+        if q is not None and not palabras_busqueda(q):
+            # Solo espacios o signos: listado normal, sin filtro de texto
+            q = None
+
+        clave = (
+            "lista", universidad_id or None, categoria or None, activas_solo,
+            0 if cursor else skip, limit, cursor,
+            " ".join(palabras_busqueda(q)) if q is not None else None,
+            resumen,
+            # Una lectura que empezo antes de un cambio guarda su resultado bajo la
+            # version vieja: nunca se sirve con el ETag de despues del cambio
+            version
+        )
+        encontrado, chazas = _chazas_cache.obtener(clave)
+        if encontrado:
+            return chazas
+
+        if resumen:
+            query = db.query(Chaza).options(load_only(*_COLUMNAS_RESUMEN))
+            esquema = ChazaSummary
+        else:
+            query = _con_relaciones(db.query(Chaza))
+            esquema = ChazaResponse
 
         # Filtros opcionales
         if activas_solo:
@@ -118,22 +340,54 @@ class ChazaService:
         if universidad_id:
             query = query.filter(Chaza.universidad_id == universidad_id)
 
-        # Ordenar por más reciente
-        query = query.order_by(Chaza.created_at.desc())
+        # Busqueda de texto: ordenar por relevancia y paginar con skip
+        if q is not None:
+            busqueda = consulta_busqueda(db, q)
+            query = query.join(busqueda, busqueda.c.chaza_id == Chaza.id)
+            query = query.order_by(busqueda.c.rango, Chaza.created_at.desc(), Chaza.id.desc())
+            chazas = query.offset(skip).limit(limit).all()
+            resultado = [esquema.model_validate(chaza) for chaza in chazas]
+            _chazas_cache.guardar(clave, resultado)
+            return resultado
+
+        # Paginación por cursor: continuar despues de la ultima chaza vista
+        if cursor:
+            fecha, chaza_id = _decodificar_cursor(cursor)
+            query = query.filter(
+                tuple_(Chaza.created_at, Chaza.id) < tuple_(_parametro_fecha(db, fecha), chaza_id)
+            )
+            skip = 0
+
+        # Ordenar por más reciente (id desempata chazas creadas en el mismo instante)
+        query = query.order_by(Chaza.created_at.desc(), Chaza.id.desc())
 
         # Paginación
         chazas = query.offset(skip).limit(limit).all()
 
-        return [ChazaResponse.model_validate(chaza) for chaza in chazas]
+        resultado = [esquema.model_validate(chaza) for chaza in chazas]
+        _chazas_cache.guardar(clave, resultado)
+        return resultado
+
+    @staticmethod
+    def siguiente_cursor(chazas: List[Union[ChazaResponse, ChazaSummary]], limit: int) -> Optional[str]:
+        """
+        Cursor para pedir la página siguiente a get_all_chazas.
+        Retorna None si la página no se llenó (no hay más resultados).
+        """
+        if len(chazas) < limit:
+            return None
+        ultima = chazas[-1]
+        return codificar_cursor(ultima.created_at, ultima.id)
 
     @staticmethod
-    def get_chaza_by_id(db: Session, chaza_id: int) -> ChazaResponse:
+    def get_chaza_by_id(db: Session, chaza_id: int, version: Optional[tuple] = None) -> ChazaResponse:
         """
         Obtiene una chaza por su ID.
 
         Args:
             db: Sesión de base de datos
             chaza_id: ID de la chaza
+            version: Version con la que la ruta genero el ETag (ver version_chaza); entra en la clave del cache
 
         Returns:
             Chaza encontrada
@@ -141,7 +395,12 @@ class ChazaService:
         Raises:
             HTTPException: Si la chaza no existe
         """
-        chaza = db.query(Chaza).filter(Chaza.id == chaza_id).first()
+        clave = ("id", chaza_id, version)
+        encontrado, respuesta = _chazas_cache.obtener(clave)
+        if encontrado:
+            return respuesta
+
+        chaza = _con_relaciones(db.query(Chaza)).filter(Chaza.id == chaza_id).first()
 
         if not chaza:
             raise HTTPException(
@@ -149,7 +408,51 @@ class ChazaService:
                 detail="Chaza no encontrada"
             )
 
-        return ChazaResponse.model_validate(chaza)
+        respuesta = ChazaResponse.model_validate(chaza)
+        _chazas_cache.guardar(clave, respuesta)
+        return respuesta
+
+    @staticmethod
+    def get_chazas_lote(
+        db: Session,
+        ids: Optional[List[int]] = None,
+        slugs: Optional[List[str]] = None
+    ) -> ChazasLoteResponse:
+        """
+        Obtiene varias chazas por id o por slug con una sola consulta IN
+        (mas la carga en lote de horarios y universidad).
+
+        Args:
+            db: Sesión de base de datos
+            ids: IDs de las chazas
+            slugs: Slugs de las chazas (si no se pasan ids)
+
+        Returns:
+            Chazas en el orden pedido y la lista de las que no existen
+
+        Raises:
+            HTTPException: Si se piden más de MAX_CHAZAS_POR_LOTE chazas
+        """
+        if ids:
+            columna, claves = Chaza.id, list(dict.fromkeys(ids))
+        else:
+            columna, claves = Chaza.slug, list(dict.fromkeys(slugs or []))
+
+        if len(claves) > MAX_CHAZAS_POR_LOTE:
+            raise HTTPException(
+                status_code=status.HTTP_400_BAD_REQUEST,
+                detail=f"Máximo {MAX_CHAZAS_POR_LOTE} chazas por petición"
+            )
+
+        encontradas = {}
+        if claves:
+            for chaza in _con_relaciones(db.query(Chaza)).filter(columna.in_(claves)).all():
+                encontradas[getattr(chaza, columna.key)] = chaza
+
+        return ChazasLoteResponse(
+            chazas=[ChazaResponse.model_validate(encontradas[c]) for c in claves if c in encontradas],
+            no_encontradas=[str(c) for c in claves if c not in encontradas]
+        )
 
     @staticmethod
     def get_chazas_by_owner(db: Session, owner_id: int) -> List[ChazaResponse]:
@@ -163,7 +466,9 @@ class ChazaService:
         Returns:
             Lista de chazas del chazero
         """
-        chazas = db.query(Chaza).filter(Chaza.owner_id == owner_id).order_by(Chaza.created_at.desc()).all()
+        chazas = _con_relaciones(db.query(Chaza)).filter(
+            Chaza.owner_id == owner_id
+        ).order_by(Chaza.created_at.desc()).all()
         return [ChazaResponse.model_validate(chaza) for chaza in chazas]
 
     @staticmethod
@@ -208,8 +513,12 @@ class ChazaService:
         for field, value in update_data.items():
             setattr(chaza, field, value)
 
+        if update_data.keys() & {"titulo", "descripcion", "ubicacion"}:
+            indexar_chaza(db, chaza)
+
         db.commit()
         db.refresh(chaza)
+        _publicar_cambio_chaza(chaza)
 
         return ChazaResponse.model_validate(chaza)
 
@@ -247,17 +556,19 @@ class ChazaService:
         # Soft delete: marcar como inactiva en lugar de eliminar
         chaza.is_active = False
         db.commit()
+        _publicar_cambio_chaza(chaza)
 
         return {"message": "Chaza eliminada correctamente"}
 
     @staticmethod
-    def get_chaza_by_slug(db: Session, slug: str) -> ChazaResponse:
+    def get_chaza_by_slug(db: Session, slug: str, version: Optional[tuple] = None) -> ChazaResponse:
         """
         Obtiene una chaza por su slug (URL amigable).
 
         Args:
             db: Sesion de base de datos
             slug: Slug de la chaza
+            version: Version con la que la ruta genero el ETag (ver version_chaza); entra en la clave del cache
 
         Returns:
             Chaza encontrada
@@ -265,7 +576,12 @@ class ChazaService:
         Raises:
             HTTPException: Si la chaza no existe
         """
-        chaza = db.query(Chaza).filter(Chaza.slug == slug).first()
+        clave = ("slug", slug, version)
+        encontrado, respuesta = _chazas_cache.obtener(clave)
+        if encontrado:
+            return respuesta
+
+        chaza = _con_relaciones(db.query(Chaza)).filter(Chaza.slug == slug).first()
 
         if not chaza:
             raise HTTPException(
@@ -273,7 +589,97 @@ class ChazaService:
                 detail="Chaza no encontrada"
             )
 
-        return ChazaResponse.model_validate(chaza)
+        respuesta = ChazaResponse.model_validate(chaza)
+        _chazas_cache.guardar(clave, respuesta)
+        return respuesta
+
+    @staticmethod
+    def buscar_compatibles(
+        db: Session,
+        horarios: List[str],
+        skip: int = 0,
+        limit: int = 20,
+        universidad_id: Optional[int] = None,
+        categoria: Optional[str] = None
+    ) -> ChazasCompatiblesResponse:
+        """
+        Busca chazas cuyos horarios de trabajo coinciden con los del estudiante.
+        Con universidad (y sin categoria) se puntua contra el indice en memoria;
+        en otro caso el conteo y el ordenamiento se hacen en la BD sobre
+        horarios_trabajo. Solo la pagina pedida se carga y se envia.
+
+        Args:
+            db: Sesion de base de datos
+            horarios: Franjas del estudiante en formato "dia-hora"
+            skip: Numero de chazas a saltar (paginacion)
+            limit: Numero maximo de chazas a devolver
+            universidad_id: Filtrar por universidad (opcional)
+            categoria: Filtrar por categoria (opcional)
+
+        Returns:
+            Total de chazas compatibles y la pagina ordenada por coincidencias
+
+        Raises:
+            HTTPException: Si algun horario no es valido
+        """
+        try:
+            franjas_estudiante = parsear_franjas(horarios)
+        except ValueError as e:
+            raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=str(e))
+
+        if not franjas_estudiante:
+            raise HTTPException(
+                status_code=status.HTTP_400_BAD_REQUEST,
+                detail="Debes seleccionar al menos un horario"
+            )
+
+        mascara_estudiante = mascara_desde_franjas(franjas_estudiante)
+
+        usar_indice = bool(universidad_id and not categoria)
+        while True:
+            if usar_indice:
+                # Caso comun: puntuar contra el indice en memoria de la universidad
+                total, mejores = indice_disponibilidad.puntuar(
+                    db, universidad_id, mascara_estudiante, skip + limit
+                )
+                pagina = mejores[skip:]
+            else:
+                total, pagina = _ranking_compatibles_sql(
+                    db, franjas_estudiante, skip, limit, universidad_id, categoria
+                )
+
+            # Cargar solo las chazas de la pagina, con sus relaciones
+            ids = [chaza_id for chaza_id, _ in pagina]
+            chazas = {
+                c.id: c for c in _con_relaciones(db.query(Chaza)).filter(
+                    Chaza.id.in_(ids), Chaza.is_active.is_(True)
+                ).all()
+            } if ids else {}
+
+            inactivas = [chaza_id for chaza_id in ids if chaza_id not in chazas]
+            if not usar_indice or not inactivas:
+                break
+            # El indice tenia chazas ya desactivadas (evento perdido): quitarlas
+            # y volver a puntuar para completar la pagina
+            for chaza_id in inactivas:
+                indice_disponibilidad.actualizar(universidad_id, chaza_id, False, None)
+
+        resultado = []
+        for chaza_id, coincidencias in pagina:
+            chaza = chazas.get(chaza_id)
+            if chaza is None:
+                continue
+            comunes = franjas_de_mascara(_mascara_chaza(chaza) & mascara_estudiante)
+
+            base = ChazaResponse.model_validate(chaza)
+            resultado.append(ChazaCompatibleResponse(
+                **base.model_dump(),
+                horarios_comunes=[formatear_franja(d, h) for d, h in comunes],
+                cantidad_coincidencias=coincidencias,
+                porcentaje_compatibilidad=round(coincidencias * 100 / len(franjas_estudiante), 1)
+            ))
+
+        return ChazasCompatiblesResponse(total=total, chazas=resultado)
 
     # === METODOS DE HORARIOS DE TRABAJO ===
 
@@ -309,22 +715,36 @@ class ChazaService:
         )
 
         db.add(nuevo_horario)
+        _actualizar_disponibilidad(db, chaza)
         db.commit()
         db.refresh(nuevo_horario)
+        _publicar_cambio_chaza(chaza)
 
         return HorarioTrabajoResponse.model_validate(nuevo_horario)
 
     @staticmethod
-    def obtener_horarios(db: Session, chaza_id: int) -> List[HorarioTrabajoResponse]:
+    def obtener_horarios(
+        db: Session,
+        chaza_id: int,
+        version: Optional[tuple] = None
+    ) -> List[HorarioTrabajoResponse]:
         """
         Obtiene todos los horarios de trabajo de una chaza.
+        version (ver version_horarios) entra en la clave del cache, como en get_chaza_by_id.
         """
+        clave = ("horarios", chaza_id, version)
+        encontrado, respuesta = _chazas_cache.obtener(clave)
+        if encontrado:
+            return respuesta
+
         horarios = db.query(HorarioTrabajo).filter(
             HorarioTrabajo.chaza_id == chaza_id,
             HorarioTrabajo.activo == True
         ).all()
 
-        return [HorarioTrabajoResponse.model_validate(h) for h in horarios]
+        respuesta = [HorarioTrabajoResponse.model_validate(h) for h in horarios]
+        _chazas_cache.guardar(clave, respuesta)
+        return respuesta
 
     @staticmethod
     def eliminar_horario(db: Session, horario_id: int, user_id: int) -> dict:
@@ -348,7 +768,9 @@ class ChazaService:
             )
 
         db.delete(horario)
+        _actualizar_disponibilidad(db, chaza)
         db.commit()
+        _publicar_cambio_chaza(chaza)
 
         return {"message": "Horario eliminado correctamente"}
 
@@ -390,10 +812,133 @@ class ChazaService:
             db.add(nuevo)
             nuevos_horarios.append(nuevo)
 
+        _actualizar_disponibilidad(db, chaza)
         db.commit()
+        _publicar_cambio_chaza(chaza)
 
         # Refresh para obtener IDs
         for h in nuevos_horarios:
             db.refresh(h)
 
-        return [HorarioTrabajoResponse.model_validate(h) for h in nuevos_horarios]
\ No newline at end of file
+        return [HorarioTrabajoResponse.model_validate(h) for h in nuevos_horarios]
+
+    # === VERSIONES PARA PETICIONES CONDICIONALES (ETag) ===
+
+    @staticmethod
+    def version_listado(
+        db: Session,
+        categoria: Optional[str] = None,
+        activas_solo: bool = True,
+        universidad_id: Optional[int] = None
+    ) -> Tuple[int, Optional[datetime]]:
+        """
+        Version del conjunto de chazas de un listado, con una sola consulta agregada.
+        La ultima modificacion incluye chazas inactivas para detectar desactivaciones,
+        y las universidades del filtro porque la vista completa incluye sus datos.
+
+        Returns:
+            (numero de chazas que entran en el filtro, ultima modificacion)
+        """
+        ultima = func.max(func.coalesce(Chaza.updated_at, Chaza.created_at))
+        if activas_solo:
+            cantidad = func.coalesce(func.sum(case((Chaza.is_active == True, 1), else_=0)), 0)
+        else:
+            cantidad = func.count(Chaza.id)
+
+        universidades = select(
+            func.max(func.coalesce(Universidad.updated_at, Universidad.created_at))
+        )
+        if universidad_id:
+            universidades = universidades.where(Universidad.id == universidad_id)
+
+        query = db.query(cantidad, ultima, universidades.scalar_subquery())
+        if categoria:
+            query = query.filter(Chaza.categoria == categoria)
+        if universidad_id:
+            query = query.filter(Chaza.universidad_id == universidad_id)
+
+        total, ultima_chaza, ultima_universidad = query.one()
+        fechas = [fecha for fecha in (ultima_chaza, ultima_universidad) if fecha is not None]
+        return total, max(fechas) if fechas else None
+
+    @staticmethod
+    def version_chaza(
+        db: Session,
+        chaza_id: Optional[int] = None,
+        slug: Optional[str] = None
+    ) -> Optional[Tuple[int, datetime]]:
+        """
+        Version de una chaza (por id o slug) sin cargarla completa.
+        Incluye la universidad porque la respuesta trae sus datos.
+
+        Returns:
+            (id, ultima modificacion) o None si no existe
+        """
+        query = db.query(
+            Chaza.id,
+            func.coalesce(Chaza.updated_at, Chaza.created_at),
+            func.coalesce(Universidad.updated_at, Universidad.created_at)
+        ).outerjoin(Universidad, Universidad.id == Chaza.universidad_id)
+        if chaza_id is not None:
+            query = query.filter(Chaza.id == chaza_id)
+        else:
+            query = query.filter(Chaza.slug == slug)
+        fila = query.first()
+        if fila is None:
+            return None
+        encontrado_id, ultima_chaza, ultima_universidad = fila
+        fechas = [fecha for fecha in (ultima_chaza, ultima_universidad) if fecha is not None]
+        return encontrado_id, max(fechas) if fechas else None
+
+    @staticmethod
+    def version_horarios(db: Session, chaza_id: int) -> Optional[Tuple[int, datetime]]:
+        """
+        Version de los horarios activos de una chaza.
+
+        Returns:
+            (numero de horarios activos, ultima modificacion de la chaza) o None si no existe
+        """
+        return db.query(
+            func.count(HorarioTrabajo.id),
+            func.coalesce(Chaza.updated_at, Chaza.created_at)
+        ).outerjoin(
+            HorarioTrabajo,
+            and_(HorarioTrabajo.chaza_id == Chaza.id, HorarioTrabajo.activo == True)
+        ).filter(Chaza.id == chaza_id).group_by(Chaza.id).first()
+
+    @staticmethod
+    def estadisticas_cache() -> dict:
+        """Contadores del cache de lecturas publicas de chazas."""
+        return _chazas_cache.estadisticas()
+
+    @staticmethod
+    def limpiar_cache() -> None:
+        """Vacia el cache de lecturas publicas de chazas."""
+        _chazas_cache.limpiar()
+
+    @staticmethod
+    def recalcular_disponibilidad(db: Session) -> int:
+        """
+        Recalcula la mascara de disponibilidad de todas las chazas desde
+        horarios_trabajo. Sirve de backfill para filas existentes.
+
+        Returns:
+            Numero de chazas actualizadas
+        """
+        rangos_por_chaza = {}
+        for chaza_id, dia, inicio, fin in db.query(
+            HorarioTrabajo.chaza_id, HorarioTrabajo.dia_semana,
+            HorarioTrabajo.hora_inicio, HorarioTrabajo.hora_fin
+        ).filter(HorarioTrabajo.activo == True):
+            rangos_por_chaza.setdefault(chaza_id, []).append((dia, inicio, fin))
+
+        actualizadas = 0
+        for chaza in db.query(Chaza):
+            chaza.disponibilidad = mascara_a_texto(
+                mascara_desde_rangos(rangos_por_chaza.get(chaza.id, []))
+            )
+            actualizadas += 1
+
+        db.commit()
+        bus_eventos.publicar(ChazasRecalculadas())
+        return actualizadas
@@ -0,0 +1,227 @@
+"""
+Indice en memoria de disponibilidad de chazas por universidad.
+Guarda una matriz densa chazas x 168 franjas para puntuar los horarios de un
+estudiante contra todas las chazas activas con un solo producto matriz-vector.
+
+El indice se construye perezosamente desde la BD la primera vez que se consulta
+una universidad, y ChazaService lo actualiza con el evento ChazaCambiada que
+publica despues de cada commit que cambia horarios o el estado de una chaza
+(en todos los workers, ver app.core.eventos).
+
+El indice de una universidad no se modifica despues de publicarse: cada cambio
+se aplica a una copia que lo reemplaza. Asi las consultas puntuan sin el lock
+y las de distintas universidades (o de la misma) corren en paralelo.
+"""
+from sqlalchemy.orm import Session
+from typing import Dict, List, Optional, Tuple
+import threading
+import numpy as np
+
+from app.models.chaza import Chaza, HorarioTrabajo
+from app.core.horarios import FRANJAS_POR_SEMANA, mascara_desde_texto, mascara_desde_rangos
+
+# Capacidad inicial de la matriz de cada universidad (crece al doble)
+_CAPACIDAD_INICIAL = 64
+
+
+def _vector_de_mascara(mascara: int) -> np.ndarray:
+    """Convierte la mascara de 168 bits en un vector 0/1 de float32."""
+    bits = np.frombuffer(mascara.to_bytes(FRANJAS_POR_SEMANA // 8, "little"), dtype=np.uint8)
+    return np.unpackbits(bits, bitorder="little").astype(np.float32)
+
+
+class _IndiceUniversidad:
+    """Matriz de disponibilidad de las chazas activas de una universidad."""
+
+    def __init__(self):
+        self.ids = np.zeros(_CAPACIDAD_INICIAL, dtype=np.int64)
+        self.matriz = np.zeros((_CAPACIDAD_INICIAL, FRANJAS_POR_SEMANA), dtype=np.float32)
+        self.filas: Dict[int, int] = {}  # chaza_id -> fila en la matriz
+        self.total = 0
+
+    def poner(self, chaza_id: int, mascara: int) -> None:
+        """Agrega o reemplaza la fila de una chaza."""
+        fila = self.filas.get(chaza_id)
+        if fila is None:
+            if self.total == len(self.ids):
+                self._crecer()
+            fila = self.total
+            self.total += 1
+            self.filas[chaza_id] = fila
+            self.ids[fila] = chaza_id
+        self.matriz[fila] = _vector_de_mascara(mascara)
+
+    def quitar(self, chaza_id: int) -> None:
+        """Quita la fila de una chaza moviendo la ultima fila a su lugar."""
+        fila = self.filas.pop(chaza_id, None)
+        if fila is None:
+            return
+        ultima = self.total - 1
+        if fila != ultima:
+            self.ids[fila] = self.ids[ultima]
+            self.matriz[fila] = self.matriz[ultima]
+            self.filas[int(self.ids[fila])] = fila
+        self.total = ultima
+
+    def puntuar(self, vector: np.ndarray, k: int) -> Tuple[int, List[Tuple[int, int]]]:
+        """
+        Cuenta las coincidencias de todas las chazas con el vector del estudiante.
+
+        Returns:
+            Total de chazas con al menos una coincidencia y las k mejores
+            como (chaza_id, coincidencias), de mayor a menor (id mas reciente primero en empates)
+        """
+        if self.total == 0 or k <= 0:
+            return 0, []
+
+        puntajes = self.matriz[:self.total] @ vector
+        ids = self.ids[:self.total]
+
+        positivos = np.flatnonzero(puntajes > 0)
+        total_positivos = len(positivos)
+        if total_positivos == 0:
+            return 0, []
+
+        if total_positivos > k:
+            # Top-k sin ordenar todo el arreglo; el id desempata los iguales
+            clave = puntajes[positivos].astype(np.int64) * (int(ids.max()) + 1) + ids[positivos]
+            positivos = positivos[np.argpartition(-clave, k - 1)[:k]]
+
+        orden = np.lexsort((-ids[positivos], -puntajes[positivos]))
+        mejores = positivos[orden]
+        return total_positivos, [(int(ids[i]), int(puntajes[i])) for i in mejores]
+
+    def copia(self) -> "_IndiceUniversidad":
+        """Copia independiente para aplicar cambios sin afectar a quien puntua."""
+        nuevo = _IndiceUniversidad.__new__(_IndiceUniversidad)
+        nuevo.ids = self.ids.copy()
+        nuevo.matriz = self.matriz.copy()
+        nuevo.filas = dict(self.filas)
+        nuevo.total = self.total
+        return nuevo
+
+    def _crecer(self) -> None:
+        capacidad = len(self.ids) * 2
+        ids = np.zeros(capacidad, dtype=np.int64)
+        matriz = np.zeros((capacidad, FRANJAS_POR_SEMANA), dtype=np.float32)
+        ids[:self.total] = self.ids[:self.total]
+        matriz[:self.total] = self.matriz[:self.total]
+        self.ids, self.matriz = ids, matriz
+
+
+class IndiceDisponibilidad:
+    """Indices de disponibilidad por universidad_id, seguros entre threads."""
+
+    def __init__(self):
+        self._indices: Dict[int, _IndiceUniversidad] = {}
+        # Cambios por universidad: invalida las construcciones que empezaron antes
+        self._versiones: Dict[int, int] = {}
+        self._lock = threading.Lock()
+
+    def puntuar(
+        self,
+        db: Session,
+        universidad_id: int,
+        mascara_estudiante: int,
+        k: int
+    ) -> Tuple[int, List[Tuple[int, int]]]:
+        """
+        Puntua los horarios del estudiante contra las chazas activas de la universidad.
+
+        Returns:
+            Total de chazas compatibles y las k mejores como (chaza_id, coincidencias)
+        """
+        vector = _vector_de_mascara(mascara_estudiante)
+        with self._lock:
+            indice = self._indices.get(universidad_id)
+            version = self._versiones.setdefault(universidad_id, 0)
+
+        if indice is None:
+            # Construir sin el lock: la consulta a la BD no bloquea a las demas universidades
+            nuevo = self._construir(db, universidad_id)
+            with self._lock:
+                indice = self._indices.get(universidad_id)
+                if indice is None:
+                    indice = nuevo
+                    # Si llego un cambio mientras se construia, usarlo solo para esta consulta
+                    if self._versiones.get(universidad_id) == version:
+                        self._indices[universidad_id] = nuevo
+
+        # El indice publicado no cambia: se puntua fuera del lock
+        return indice.puntuar(vector, k)
+
+    def actualizar(
+        self,
+        universidad_id: Optional[int],
+        chaza_id: int,
+        activa: bool,
+        disponibilidad: Optional[str]
+    ) -> None:
+        """
+        Refleja en el indice el estado actual de una chaza.
+        Llamar despues del commit de cualquier cambio de horarios o de is_active.
+        """
+        while True:
+            with self._lock:
+                indice = self._indices.get(universidad_id)
+                if indice is None:
+                    # Aun no se ha consultado: se construira desde la BD
+                    if universidad_id in self._versiones:
+                        self._versiones[universidad_id] += 1
+                    return
+
+            # Copiar y modificar fuera del lock; las consultas en curso usan el anterior
+            nuevo = indice.copia()
+            if activa:
+                nuevo.poner(chaza_id, mascara_desde_texto(disponibilidad))
+            else:
+                nuevo.quitar(chaza_id)
+
+            with self._lock:
+                if self._indices.get(universidad_id) is indice:
+                    self._indices[universidad_id] = nuevo
+                    return
+            # Otro cambio reemplazo el indice mientras tanto: aplicar sobre el nuevo
+
+    def limpiar(self, universidad_id: Optional[int] = None) -> None:
+        """Descarta los indices (todos o el de una universidad) para reconstruirlos."""
+        with self._lock:
+            if universidad_id is None:
+                self._indices.clear()
+                for clave in self._versiones:
+                    self._versiones[clave] += 1
+            else:
+                self._indices.pop(universidad_id, None)
+                if universidad_id in self._versiones:
+                    self._versiones[universidad_id] += 1
+
+    def _construir(self, db: Session, universidad_id: int) -> _IndiceUniversidad:
+        """Indice nuevo desde la BD; no toca self._indices (se llama sin el lock)."""
+        indice = _IndiceUniversidad()
+        filas = db.query(Chaza.id, Chaza.disponibilidad).filter(
+            Chaza.universidad_id == universidad_id,
+            Chaza.is_active == True
+        )
+        sin_mascara = []
+        for chaza_id, disponibilidad in filas:
+            if disponibilidad is None:
+                sin_mascara.append(chaza_id)
+            else:
+                indice.poner(chaza_id, mascara_desde_texto(disponibilidad))
+
+        # Chazas sin backfill de disponibilidad: calcular desde sus horarios
+        if sin_mascara:
+            rangos_por_chaza = {chaza_id: [] for chaza_id in sin_mascara}
+            for chaza_id, dia, inicio, fin in db.query(
+                HorarioTrabajo.chaza_id, HorarioTrabajo.dia_semana,
+                HorarioTrabajo.hora_inicio, HorarioTrabajo.hora_fin
+            ).filter(HorarioTrabajo.chaza_id.in_(sin_mascara), HorarioTrabajo.activo == True):
+                rangos_por_chaza[chaza_id].append((dia, inicio, fin))
+            for chaza_id, rangos in rangos_por_chaza.items():
+                indice.poner(chaza_id, mascara_desde_rangos(rangos))
+
+        return indice
+
+
+# Instancia global usada por ChazaService
+indice_disponibilidad = IndiceDisponibilidad()
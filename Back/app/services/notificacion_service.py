@@ -1,10 +1,117 @@
 from sqlalchemy.orm import Session
-from sqlalchemy import and_
-from typing import List, Optional
+from sqlalchemy import and_, case, delete, event, func, insert, select, tuple_, update
+from sqlalchemy.dialects import postgresql, sqlite
+from collections import Counter
+from typing import List, Optional, Tuple
 from datetime import datetime
 
-from app.models.notificacion import Notificacion, TipoNotificacion
-from app.schemas.notificacion import NotificacionCreate
+from app.models.notificacion import Notificacion, TipoNotificacion, ContadorNotificaciones
+from app.schemas.notificacion import NotificacionCreate, NotificacionResponse
+from app.schemas.eventos import NotificacionesCambiadas
+from app.core.cursor import codificar_cursor, decodificar_cursor
+from app.services.notificaciones_en_vivo import canal_notificaciones
+from app.core.eventos import bus_eventos
+
+# Maximo de notificaciones por pagina
+MAX_NOTIFICACIONES_POR_PAGINA = 100
+
+
+# === CONTADOR DE NO LEIDAS ===
+
+def _select_sin_leer(usuario_id: Optional[int] = None):
+    """
+    (usuario_id, sin_leer) contados desde la tabla notificaciones. Incluye a
+    los usuarios con todas leidas, para que tambien tengan contador.
+    """
+    consulta = select(
+        Notificacion.usuario_id,
+        func.count(case((Notificacion.leida == False, 1)))
+    ).group_by(Notificacion.usuario_id)
+    if usuario_id is not None:
+        consulta = consulta.where(Notificacion.usuario_id == usuario_id)
+    return consulta
+
+
+def _mover_sin_leer(db: Session, usuario_id: int, delta: int) -> None:
+    """
+    Suma `delta` al contador de no leidas del usuario.
+    Se llama despues del flush, en la misma transaccion que el cambio.
+    """
+    if not delta:
+        return
+    valores = {"sin_leer": ContadorNotificaciones.sin_leer + delta}
+    actualizadas = db.execute(
+        update(ContadorNotificaciones).where(ContadorNotificaciones.usuario_id == usuario_id).values(valores)
+    ).rowcount
+    if actualizadas:
+        return
+
+    # Primera vez que se toca el usuario: la fila se calcula desde las notificaciones
+    # (ya incluyen este cambio). Si otra transaccion la crea a la vez, se suma el delta.
+    dialecto = postgresql if db.get_bind().dialect.name == "postgresql" else sqlite
+    insercion = dialecto.insert(ContadorNotificaciones).from_select(
+        ["usuario_id", "sin_leer"], _select_sin_leer(usuario_id)
+    )
+    db.execute(insercion.on_conflict_do_update(
+        index_elements=[ContadorNotificaciones.usuario_id],
+        set_=valores
+    ))
+
+
+# === PUBLICACION EN VIVO (stream SSE) ===
+# Los metodos que crean notificaciones o cambian las no leidas anotan en la
+# sesion a quien hay que avisar. Antes del commit se arma el evento
+# NotificacionesCambiadas (con ids y conteo ya calculados) y el bus lo publica
+# despues del commit; si hay rollback se descarta. Cada worker lo reenvia a
+# las conexiones SSE que tenga abiertas para ese usuario.
+
+def _avisar_al_confirmar(db: Session, usuario_id: int, notificacion: Optional[Notificacion] = None) -> None:
+    pendientes = db.info.setdefault("notificaciones_en_vivo", {"nuevas": [], "usuarios": set()})
+    pendientes["usuarios"].add(usuario_id)
+    if notificacion is not None:
+        pendientes["nuevas"].append(notificacion)
+
+
+@event.listens_for(Session, "before_commit")
+def _preparar_eventos_en_vivo(db: Session) -> None:
+    pendientes = db.info.pop("notificaciones_en_vivo", None)
+    if not pendientes:
+        return
+    db.flush()
+
+    sin_leer = dict.fromkeys(pendientes["usuarios"], 0)
+    sin_leer.update(db.query(ContadorNotificaciones.usuario_id, ContadorNotificaciones.sin_leer).filter(
+        ContadorNotificaciones.usuario_id.in_(sin_leer)
+    ).all())
+
+    con_notificacion = set()
+    for notificacion in pendientes["nuevas"]:
+        bus_eventos.publicar_al_confirmar(db, NotificacionesCambiadas(
+            usuario_id=notificacion.usuario_id,
+            sin_leer=sin_leer[notificacion.usuario_id],
+            notificacion=NotificacionResponse.model_validate(notificacion).model_dump(mode="json")
+        ))
+        con_notificacion.add(notificacion.usuario_id)
+    for usuario_id in sin_leer.keys() - con_notificacion:
+        bus_eventos.publicar_al_confirmar(db, NotificacionesCambiadas(
+            usuario_id=usuario_id, sin_leer=sin_leer[usuario_id]
+        ))
+
+
+@event.listens_for(Session, "after_rollback")
+def _descartar_eventos_en_vivo(db: Session) -> None:
+    db.info.pop("notificaciones_en_vivo", None)
+
+
+@bus_eventos.suscribir(NotificacionesCambiadas)
+def _enviar_al_stream(evento: NotificacionesCambiadas) -> None:
+    if evento.notificacion is not None:
+        canal_notificaciones.publicar(evento.usuario_id, "notificacion", {
+            "notificacion": evento.notificacion,
+            "sin_leer": evento.sin_leer
+        })
+    else:
+        canal_notificaciones.publicar(evento.usuario_id, "sin_leer", {"sin_leer": evento.sin_leer})
 
 
 class NotificacionService:
@@ -18,9 +125,15 @@ class NotificacionService:
         titulo: str,
         mensaje: str,
         chaza_id: Optional[int] = None,
-        postulacion_id: Optional[int] = None  # Parámetro ignorado temporalmente
+        postulacion_id: Optional[int] = None,  # Parámetro ignorado temporalmente
+        confirmar: bool = True
     ) -> Notificacion:
-        """Crea una nueva notificacion"""
+        """
+        Crea una nueva notificacion.
+
+        Con confirmar=False solo se agrega a la sesion: se inserta en la misma
+        transaccion que el cambio que la origina, cuando quien llama hace commit.
+        """
         notificacion = Notificacion(
             usuario_id=usuario_id,
             tipo=tipo,
@@ -30,18 +143,55 @@ class NotificacionService:
             # postulacion_id omitido - columna no existe en DB actual
         )
         db.add(notificacion)
-        db.commit()
-        db.refresh(notificacion)
+        db.flush()
+        _mover_sin_leer(db, usuario_id, 1)
+        _avisar_al_confirmar(db, usuario_id, notificacion)
+        if confirmar:
+            db.commit()
+            db.refresh(notificacion)
         return notificacion
 
+    @staticmethod
+    def crear_notificaciones_lote(db: Session, notificaciones: List[dict]) -> int:
+        """
+        Inserta varias notificaciones con un solo INSERT de varias filas.
+        No hace commit: van en la transaccion de quien llama.
+
+        Args:
+            notificaciones: Diccionarios con usuario_id, tipo, titulo, mensaje y chaza_id
+
+        Returns:
+            Numero de notificaciones insertadas
+        """
+        if not notificaciones:
+            return 0
+        creadas = db.scalars(insert(Notificacion).returning(Notificacion), notificaciones).all()
+        for usuario_id, cantidad in Counter(n.usuario_id for n in creadas).items():
+            _mover_sin_leer(db, usuario_id, cantidad)
+        for notificacion in creadas:
+            _avisar_al_confirmar(db, notificacion.usuario_id, notificacion)
+        return len(creadas)
+
     @staticmethod
     def obtener_notificaciones_usuario(
         db: Session,
         usuario_id: int,
         solo_sin_leer: bool = False,
-        limite: int = 50
+        limite: int = 50,
+        cursor: Optional[str] = None
     ) -> List[Notificacion]:
-        """Obtiene las notificaciones de un usuario"""
+        """
+        Obtiene las notificaciones de un usuario, de la mas reciente a la mas antigua.
+        Pagina por cursor sobre (created_at, id): cada pagina es un recorrido
+        del indice desde el cursor, sin importar que tan atras este.
+
+        Args:
+            limite: Tamano de pagina (max MAX_NOTIFICACIONES_POR_PAGINA)
+            cursor: Cursor de la pagina anterior (ver siguiente_cursor)
+
+        Raises:
+            ValueError: Si el cursor esta mal formado
+        """
         query = db.query(Notificacion).filter(
             Notificacion.usuario_id == usuario_id
         )
@@ -49,11 +199,36 @@ class NotificacionService:
         if solo_sin_leer:
             query = query.filter(Notificacion.leida == False)
 
-        return query.order_by(Notificacion.created_at.desc()).limit(limite).all()
+        if cursor:
+            fecha, notificacion_id = decodificar_cursor(cursor)
+            query = query.filter(tuple_(Notificacion.created_at, Notificacion.id) < (fecha, notificacion_id))
+
+        limite = min(limite, MAX_NOTIFICACIONES_POR_PAGINA)
+        return query.order_by(Notificacion.created_at.desc(), Notificacion.id.desc()).limit(limite).all()
+
+    @staticmethod
+    def siguiente_cursor(notificaciones: List[Notificacion], limite: int) -> Optional[str]:
+        """
+        Cursor para pedir la pagina siguiente a obtener_notificaciones_usuario.
+        Retorna None si la pagina no se lleno (no hay mas resultados).
+        """
+        if len(notificaciones) < min(limite, MAX_NOTIFICACIONES_POR_PAGINA):
+            return None
+        ultima = notificaciones[-1]
+        return codificar_cursor(ultima.created_at, ultima.id)
 
     @staticmethod
     def contar_sin_leer(db: Session, usuario_id: int) -> int:
-        """Cuenta las notificaciones sin leer de un usuario"""
+        """
+        Notificaciones sin leer de un usuario, leidas del contador.
+        Si el usuario aun no tiene contador (sin cambios desde que existe la
+        tabla) se cuentan las filas.
+        """
+        sin_leer = db.query(ContadorNotificaciones.sin_leer).filter(
+            ContadorNotificaciones.usuario_id == usuario_id
+        ).scalar()
+        if sin_leer is not None:
+            return sin_leer
         return db.query(Notificacion).filter(
             and_(
                 Notificacion.usuario_id == usuario_id,
@@ -61,6 +236,57 @@ class NotificacionService:
             )
         ).count()
 
+    @staticmethod
+    def obtener_novedades(
+        db: Session,
+        usuario_id: int,
+        desde_id: int,
+        limite: int = 5
+    ) -> Tuple[int, List[Notificacion]]:
+        """
+        Notificaciones con id mayor a `desde_id` (las mas nuevas primero) y el
+        conteo de no leidas, en una sola consulta: el contador del usuario
+        unido con sus notificaciones nuevas. Sin novedades es una busqueda
+        por clave primaria.
+
+        Returns:
+            (total sin leer, notificaciones nuevas)
+        """
+        filas = db.query(ContadorNotificaciones.sin_leer, Notificacion).select_from(
+            ContadorNotificaciones
+        ).outerjoin(Notificacion, and_(
+            Notificacion.usuario_id == ContadorNotificaciones.usuario_id,
+            Notificacion.id > desde_id
+        )).filter(
+            ContadorNotificaciones.usuario_id == usuario_id
+        ).order_by(Notificacion.id.desc()).limit(limite).all()
+
+        if not filas:
+            # Usuario aun sin contador
+            nuevas = db.query(Notificacion).filter(
+                Notificacion.usuario_id == usuario_id,
+                Notificacion.id > desde_id
+            ).order_by(Notificacion.id.desc()).limit(limite).all()
+            return NotificacionService.contar_sin_leer(db, usuario_id), nuevas
+
+        return filas[0].sin_leer, [notificacion for _, notificacion in filas if notificacion is not None]
+
+    @staticmethod
+    def recalcular_sin_leer(db: Session) -> int:
+        """
+        Reconstruye contadores_notificaciones desde la tabla notificaciones
+        (corrige cualquier desfase).
+
+        Returns:
+            Numero de usuarios con contador
+        """
+        db.query(ContadorNotificaciones).delete(synchronize_session=False)
+        db.execute(ContadorNotificaciones.__table__.insert().from_select(
+            ["usuario_id", "sin_leer"], _select_sin_leer()
+        ))
+        db.commit()
+        return db.query(func.count(ContadorNotificaciones.usuario_id)).scalar()
+
     @staticmethod
     def marcar_como_leida(db: Session, notificacion_id: int, usuario_id: int) -> Optional[Notificacion]:
         """Marca una notificacion como leida"""
@@ -72,8 +298,17 @@ class NotificacionService:
         ).first()
 
         if notificacion:
-            notificacion.leida = True
-            notificacion.read_at = datetime.utcnow()
+            # El filtro por leida evita descontar dos veces si llegan dos peticiones a la vez
+            marcada = db.query(Notificacion).filter(
+                Notificacion.id == notificacion.id,
+                Notificacion.leida == False
+            ).update({
+                "leida": True,
+                "read_at": datetime.utcnow()
+            })
+            if marcada:
+                _mover_sin_leer(db, usuario_id, -marcada)
+                _avisar_al_confirmar(db, usuario_id)
             db.commit()
             db.refresh(notificacion)
 
@@ -91,6 +326,9 @@ class NotificacionService:
             "leida": True,
             "read_at": datetime.utcnow()
         })
+        if resultado:
+            _mover_sin_leer(db, usuario_id, -resultado)
+            _avisar_al_confirmar(db, usuario_id)
         db.commit()
         return resultado
 
@@ -107,21 +345,26 @@ class NotificacionService:
             "leida": True,
             "read_at": datetime.utcnow()
         }, synchronize_session=False)
+        if resultado:
+            _mover_sin_leer(db, usuario_id, -resultado)
+            _avisar_al_confirmar(db, usuario_id)
         db.commit()
         return resultado
 
     @staticmethod
     def eliminar_notificacion(db: Session, notificacion_id: int, usuario_id: int) -> bool:
         """Elimina una notificacion"""
-        notificacion = db.query(Notificacion).filter(
-            and_(
+        eliminada = db.execute(
+            delete(Notificacion).where(
                 Notificacion.id == notificacion_id,
                 Notificacion.usuario_id == usuario_id
-            )
+            ).returning(Notificacion.leida)
         ).first()
 
-        if notificacion:
-            db.delete(notificacion)
+        if eliminada:
+            if eliminada.leida is False:
+                _mover_sin_leer(db, usuario_id, -1)
+                _avisar_al_confirmar(db, usuario_id)
             db.commit()
             return True
         return False
@@ -135,7 +378,8 @@ class NotificacionService:
         estudiante_nombre: str,
         chaza_nombre: str,
         chaza_id: int,
-        postulacion_id: Optional[int] = None  # Opcional temporalmente
+        postulacion_id: Optional[int] = None,  # Opcional temporalmente
+        confirmar: bool = True
     ) -> Notificacion:
         """Notifica al chazero que tiene una nueva postulacion"""
         return NotificacionService.crear_notificacion(
@@ -145,26 +389,51 @@ class NotificacionService:
             titulo="Nueva postulacion recibida",
             mensaje=f"{estudiante_nombre} se ha postulado para trabajar en {chaza_nombre}",
             chaza_id=chaza_id,
-            postulacion_id=postulacion_id
+            postulacion_id=postulacion_id,
+            confirmar=confirmar
         )
 
+    @staticmethod
+    def datos_postulacion_respondida(
+        estudiante_id: int,
+        chaza_nombre: str,
+        chaza_id: int,
+        aceptada: bool
+    ) -> dict:
+        """Campos de la notificacion que recibe el estudiante cuando le responden."""
+        if aceptada:
+            tipo = TipoNotificacion.POSTULACION_ACEPTADA
+            titulo = "Postulacion aceptada"
+            mensaje = f"Tu postulacion para {chaza_nombre} ha sido aceptada. El chazero se pondra en contacto contigo."
+        else:
+            tipo = TipoNotificacion.POSTULACION_RECHAZADA
+            titulo = "Postulacion no seleccionada"
+            mensaje = f"Tu postulacion para {chaza_nombre} no fue seleccionada en esta ocasion. Sigue intentando!"
+        return {
+            "usuario_id": estudiante_id,
+            "tipo": tipo,
+            "titulo": titulo,
+            "mensaje": mensaje,
+            "chaza_id": chaza_id
+        }
+
     @staticmethod
     def notificar_postulacion_aceptada(
         db: Session,
         estudiante_id: int,
         chaza_nombre: str,
         chaza_id: int,
-        postulacion_id: Optional[int] = None  # Opcional temporalmente
+        postulacion_id: Optional[int] = None,  # Opcional temporalmente
+        confirmar: bool = True
     ) -> Notificacion:
         """Notifica al estudiante que su postulacion fue aceptada"""
         return NotificacionService.crear_notificacion(
             db=db,
-            usuario_id=estudiante_id,
-            tipo=TipoNotificacion.POSTULACION_ACEPTADA,
-            titulo="Postulacion aceptada",
-            mensaje=f"Tu postulacion para {chaza_nombre} ha sido aceptada. El chazero se pondra en contacto contigo.",
-            chaza_id=chaza_id,
-            postulacion_id=postulacion_id
+            **NotificacionService.datos_postulacion_respondida(
+                estudiante_id, chaza_nombre, chaza_id, aceptada=True
+            ),
+            postulacion_id=postulacion_id,
+            confirmar=confirmar
         )
 
     @staticmethod
@@ -173,17 +442,17 @@ class NotificacionService:
         estudiante_id: int,
         chaza_nombre: str,
         chaza_id: int,
-        postulacion_id: Optional[int] = None  # Opcional temporalmente
+        postulacion_id: Optional[int] = None,  # Opcional temporalmente
+        confirmar: bool = True
     ) -> Notificacion:
         """Notifica al estudiante que su postulacion fue rechazada"""
         return NotificacionService.crear_notificacion(
             db=db,
-            usuario_id=estudiante_id,
-            tipo=TipoNotificacion.POSTULACION_RECHAZADA,
-            titulo="Postulacion no seleccionada",
-            mensaje=f"Tu postulacion para {chaza_nombre} no fue seleccionada en esta ocasion. Sigue intentando!",
-            chaza_id=chaza_id,
-            postulacion_id=postulacion_id
+            **NotificacionService.datos_postulacion_respondida(
+                estudiante_id, chaza_nombre, chaza_id, aceptada=False
+            ),
+            postulacion_id=postulacion_id,
+            confirmar=confirmar
         )
 
     @staticmethod
@@ -192,7 +461,8 @@ class NotificacionService:
         chazero_id: int,
         estudiante_nombre: str,
         chaza_nombre: str,
-        chaza_id: int
+        chaza_id: int,
+        confirmar: bool = True
     ) -> Notificacion:
         """Notifica al chazero que un estudiante cancelo su postulacion"""
         return NotificacionService.crear_notificacion(
@@ -201,7 +471,8 @@ class NotificacionService:
             tipo=TipoNotificacion.POSTULACION_CANCELADA,
             titulo="Postulacion cancelada",
             mensaje=f"{estudiante_nombre} ha cancelado su postulacion para {chaza_nombre}",
-            chaza_id=chaza_id
+            chaza_id=chaza_id,
+            confirmar=confirmar
         )
 
     @staticmethod
@@ -0,0 +1,168 @@
+"""
+Canal en vivo de notificaciones para el stream Server-Sent Events.
+
+Pub/sub en memoria del proceso: cada worker recibe del bus de eventos los
+NotificacionesCambiadas (publicados despues de cada commit que crea
+notificaciones o cambia las no leidas) y cada conexion SSE abierta en el
+worker recibe los eventos de su usuario en una asyncio.Queue.
+
+Los ultimos eventos de cada usuario conectado (o que se desconecto hace poco)
+se guardan para que un cliente que se reconecta con Last-Event-ID reciba lo
+que se perdio; si ya no estan, se le pide recargar (evento "sincronizar").
+"""
+from collections import deque
+from typing import Dict, List, Optional, Set, Tuple
+import asyncio
+import json
+import threading
+import time
+
+from cachetools import TTLCache
+
+from app.config import settings
+
+# Eventos recientes que se guardan por usuario para reanudar (Last-Event-ID)
+_EVENTOS_GUARDADOS = 100
+# Segundos que se conserva el historial de un usuario despues de cerrar su ultima conexion
+_SEGUNDOS_REANUDAR = 300
+# Usuarios desconectados con historial guardado (los menos recientes se descartan)
+_USUARIOS_GUARDADOS = 10000
+
+
+def formatear_evento(tipo: str, datos: dict, evento_id: Optional[str] = None) -> str:
+    """Texto de un evento en el formato text/event-stream."""
+    lineas = []
+    if evento_id is not None:
+        lineas.append(f"id: {evento_id}")
+    lineas.append(f"event: {tipo}")
+    lineas.append(f"data: {json.dumps(datos, default=str)}")
+    return "\n".join(lineas) + "\n\n"
+
+
+class Suscripcion:
+    """Una conexion SSE abierta: su cola y el event loop que la atiende."""
+
+    def __init__(self, usuario_id: int):
+        self.usuario_id = usuario_id
+        self.cola: asyncio.Queue = asyncio.Queue()
+        self.loop = asyncio.get_running_loop()
+
+
+class CanalNotificaciones:
+    """Suscripciones por usuario y eventos recientes, seguros entre threads."""
+
+    def __init__(self, max_conexiones_por_usuario: int):
+        self.max_conexiones_por_usuario = max_conexiones_por_usuario
+        self._suscripciones: Dict[int, Set[Suscripcion]] = {}
+        # usuario_id -> [deque de (numero, texto), numero del ultimo evento descartado].
+        # Solo hay historial de usuarios conectados; al cerrar la ultima conexion
+        # pasa a _desconectados por _SEGUNDOS_REANUDAR para permitir reanudar.
+        self._recientes: Dict[int, list] = {}
+        self._desconectados = TTLCache(maxsize=_USUARIOS_GUARDADOS, ttl=_SEGUNDOS_REANUDAR)
+        self._secuencia = 0
+        # Los ids de evento de otro proceso (o de antes de reiniciar) no se pueden reanudar
+        self._epoca = format(int(time.time()), "x")
+        self._lock = threading.Lock()
+
+    def suscribir(
+        self,
+        usuario_id: int,
+        ultimo_evento: Optional[str] = None
+    ) -> Tuple[Suscripcion, List[str], bool]:
+        """
+        Abre una suscripcion para el usuario. Se llama desde el event loop.
+
+        Args:
+            ultimo_evento: Valor de Last-Event-ID si el cliente se esta reconectando
+
+        Returns:
+            (suscripcion, eventos perdidos a reenviar, True si el cliente debe
+            recargar porque los eventos perdidos ya no estan guardados)
+
+        Raises:
+            ValueError: Si el usuario ya tiene el maximo de conexiones abiertas
+        """
+        suscripcion = Suscripcion(usuario_id)
+        with self._lock:
+            abiertas = self._suscripciones.setdefault(usuario_id, set())
+            if len(abiertas) >= self.max_conexiones_por_usuario:
+                raise ValueError(
+                    f"Maximo {self.max_conexiones_por_usuario} conexiones de notificaciones por usuario"
+                )
+            abiertas.add(suscripcion)
+            if usuario_id not in self._recientes:
+                historial = self._desconectados.pop(usuario_id, None)
+                if historial is None:
+                    # Los eventos anteriores a esta conexion no se guardaron
+                    historial = [deque(maxlen=_EVENTOS_GUARDADOS), self._secuencia]
+                self._recientes[usuario_id] = historial
+
+            pendientes, sincronizar = [], False
+            if ultimo_evento:
+                pendientes, sincronizar = self._eventos_desde(usuario_id, ultimo_evento)
+        return suscripcion, pendientes, sincronizar
+
+    def cancelar(self, suscripcion: Suscripcion) -> None:
+        with self._lock:
+            abiertas = self._suscripciones.get(suscripcion.usuario_id)
+            if abiertas is None:
+                return
+            abiertas.discard(suscripcion)
+            if not abiertas:
+                del self._suscripciones[suscripcion.usuario_id]
+                historial = self._recientes.pop(suscripcion.usuario_id, None)
+                if historial is not None:
+                    self._desconectados[suscripcion.usuario_id] = historial
+
+    def publicar(self, usuario_id: int, tipo: str, datos: dict) -> None:
+        """
+        Envia un evento a todas las conexiones del usuario y lo guarda para
+        reanudar (si el usuario esta o estuvo conectado hace poco). Se puede
+        llamar desde cualquier thread.
+
+        Los ids de evento son propios de cada worker: si el cliente se reconecta
+        a otro worker, su Last-Event-ID no coincide y se le pide sincronizar.
+        """
+        with self._lock:
+            self._secuencia += 1
+            numero = self._secuencia
+            texto = formatear_evento(tipo, datos, f"{self._epoca}-{numero}")
+            historial = self._recientes.get(usuario_id) or self._desconectados.get(usuario_id)
+            if historial is not None:
+                eventos = historial[0]
+                if len(eventos) == eventos.maxlen:
+                    historial[1] = eventos[0][0]
+                eventos.append((numero, texto))
+            destinos = list(self._suscripciones.get(usuario_id, ()))
+
+        for suscripcion in destinos:
+            try:
+                suscripcion.loop.call_soon_threadsafe(suscripcion.cola.put_nowait, texto)
+            except RuntimeError:
+                # El loop de la conexion ya se cerro
+                self.cancelar(suscripcion)
+
+    def estadisticas(self) -> dict:
+        with self._lock:
+            return {
+                "usuarios_conectados": len(self._suscripciones),
+                "conexiones": sum(len(s) for s in self._suscripciones.values()),
+                "usuarios_con_historial": len(self._recientes) + len(self._desconectados)
+            }
+
+    def _eventos_desde(self, usuario_id: int, ultimo_evento: str) -> Tuple[List[str], bool]:
+        """Eventos guardados posteriores a ultimo_evento (llamar con el lock tomado)."""
+        epoca, _, numero = ultimo_evento.partition("-")
+        if epoca != self._epoca or not numero.isdigit():
+            return [], True
+        numero = int(numero)
+
+        eventos, descartado_hasta = self._recientes[usuario_id]
+        if descartado_hasta > numero:
+            # Algun evento posterior al del cliente ya salio del historial
+            return [], True
+        return [texto for n, texto in eventos if n > numero], False
+
+
+# Instancia global usada por NotificacionService y la ruta /notificaciones/stream
+canal_notificaciones = CanalNotificaciones(settings.SSE_MAX_CONEXIONES_POR_USUARIO)
@@ -1,55 +1,357 @@
 """
 Servicio para manejar solicitudes de trabajo.
 """
-from sqlalchemy.orm import Session
-from sqlalchemy import and_
-from typing import List, Optional
-from datetime import datetime
-
-from app.models.solicitud import Solicitud, EstadoSolicitud
+from sqlalchemy.orm import Session, aliased
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy import and_, case, delete, func, literal, select, true, tuple_, union_all, update
+from sqlalchemy.dialects import postgresql, sqlite
+from collections import Counter
+from typing import List, Optional, Tuple
+from datetime import datetime, timedelta
+
+from app.models.solicitud import (
+    Solicitud, EstadoSolicitud, SolicitudArchivada, ContadorSolicitudes, ESTADOS_ARCHIVABLES
+)
+from app.config import settings
 from app.models.chaza import Chaza
 from app.models.user import User
 from app.services.notificacion_service import NotificacionService
+from app.schemas.eventos import SolicitudCambiada
+from app.core.eventos import bus_eventos
 from app.models.notificacion import TipoNotificacion
+from app.core.cursor import codificar_cursor, decodificar_cursor
+from app.core.horarios import (
+    parsear_franja, parsear_franjas, formatear_franja, mascara_desde_franjas, mascara_a_texto,
+    mascara_desde_texto, mascara_desde_rangos, HORAS_POR_DIA
+)
+from app.services import ajuste_horarios
 
 
 DIAS_SEMANA = ['Lunes', 'Martes', 'Miércoles', 'Jueves', 'Viernes', 'Sábado', 'Domingo']
 
 
+def _conteos_por_estado(chaza_id: int) -> list:
+    """
+    Subconsultas escalares con el total de solicitudes de la chaza por estado.
+    Van en la misma consulta que la pagina para no hacer otro viaje a la BD.
+    """
+    otra = aliased(Solicitud)
+    return [
+        select(func.count(otra.id)).where(
+            otra.chaza_id == chaza_id,
+            otra.estado == estado
+        ).scalar_subquery().label(f"total_{estado.value}")
+        for estado in EstadoSolicitud
+    ]
+
+
+def _es_solicitud_pendiente_duplicada(error: IntegrityError) -> bool:
+    """True si el error viene del indice uq_solicitudes_pendiente_estudiante_chaza."""
+    mensaje = str(error.orig)
+    # PostgreSQL nombra el indice; SQLite nombra las columnas
+    return (
+        "uq_solicitudes_pendiente_estudiante_chaza" in mensaje
+        or "solicitudes.estudiante_id, solicitudes.chaza_id" in mensaje
+    )
+
+
+def _franjas_validas(horarios: Optional[List[str]]) -> List[Tuple[int, int]]:
+    """Franjas (dia, hora) ordenadas de una lista guardada, descartando las invalidas."""
+    franjas = set()
+    for h in horarios or []:
+        try:
+            franjas.add(parsear_franja(h))
+        except ValueError:
+            continue
+    return sorted(franjas)
+
+
+# Columna de ContadorSolicitudes para cada estado (las canceladas no se cuentan)
+_COLUMNA_CONTADOR = {
+    EstadoSolicitud.PENDIENTE: "pendientes",
+    EstadoSolicitud.ACEPTADA: "aceptadas",
+    EstadoSolicitud.RECHAZADA: "rechazadas",
+}
+
+
+def _select_contadores(chaza_id: Optional[int] = None):
+    """
+    SELECT chaza_id, pendientes, aceptadas, rechazadas calculado desde
+    solicitudes y solicitudes_archivadas (las rechazadas archivadas siguen contando).
+    """
+    partes = []
+    for modelo in (Solicitud, SolicitudArchivada):
+        parte = select(modelo.chaza_id, modelo.estado)
+        if chaza_id is not None:
+            parte = parte.where(modelo.chaza_id == chaza_id)
+        partes.append(parte)
+    origen = union_all(*partes).subquery()
+
+    columnas = [
+        func.count(case((origen.c.estado == estado, 1))).label(columna)
+        for estado, columna in _COLUMNA_CONTADOR.items()
+    ]
+    if chaza_id is not None:
+        # Una sola chaza: agregado simple, sin GROUP BY (evita ordenar la union).
+        # El WHERE evita que SQLite lea el ON CONFLICT del INSERT ... SELECT como un JOIN
+        return select(literal(chaza_id).label("chaza_id"), *columnas).select_from(origen).where(true())
+    return select(origen.c.chaza_id, *columnas).group_by(origen.c.chaza_id)
+
+
+def _publicar_cambio_solicitud(
+    db: Session,
+    solicitud_id: int,
+    chaza_id: int,
+    estudiante_id: int,
+    estado: EstadoSolicitud
+) -> None:
+    """Publica SolicitudCambiada cuando quien llama haga commit."""
+    bus_eventos.publicar_al_confirmar(db, SolicitudCambiada(
+        solicitud_id=solicitud_id,
+        chaza_id=chaza_id,
+        estudiante_id=estudiante_id,
+        estado=estado.value
+    ))
+
+
+def _mover_contadores(
+    db: Session,
+    chaza_id: int,
+    desde: Optional[EstadoSolicitud],
+    hacia: Optional[EstadoSolicitud],
+    cantidad: int = 1
+) -> None:
+    """
+    Actualiza los contadores de la chaza cuando `cantidad` solicitudes pasan
+    del estado `desde` al estado `hacia` (None = solicitud nueva).
+    Se llama despues del flush, en la misma transaccion que el cambio.
+    """
+    deltas = Counter()
+    if desde in _COLUMNA_CONTADOR:
+        deltas[_COLUMNA_CONTADOR[desde]] -= cantidad
+    if hacia in _COLUMNA_CONTADOR:
+        deltas[_COLUMNA_CONTADOR[hacia]] += cantidad
+    valores = {
+        columna: getattr(ContadorSolicitudes, columna) + delta
+        for columna, delta in deltas.items() if delta
+    }
+    if not valores:
+        return
+
+    actualizadas = db.execute(
+        update(ContadorSolicitudes).where(ContadorSolicitudes.chaza_id == chaza_id).values(valores)
+    ).rowcount
+    if actualizadas:
+        return
+
+    # Primera vez que se toca la chaza: la fila se calcula desde las solicitudes
+    # (ya incluyen este cambio). Si otra transaccion la crea a la vez, se suma el delta.
+    dialecto = postgresql if db.get_bind().dialect.name == "postgresql" else sqlite
+    consulta = _select_contadores(chaza_id)
+    insercion = dialecto.insert(ContadorSolicitudes).from_select(
+        ["chaza_id", *_COLUMNA_CONTADOR.values()], consulta
+    )
+    db.execute(insercion.on_conflict_do_update(
+        index_elements=[ContadorSolicitudes.chaza_id],
+        set_=valores
+    ))
+
+
 class SolicitudService:
     """Servicio para manejar solicitudes de trabajo en chazas"""
 
+    @staticmethod
+    def formatear_franjas(franjas: List[Tuple[int, int]]) -> str:
+        """
+        Convierte tuplas (dia, hora) ordenadas a texto legible, agrupado por día:
+        "Lunes: 8:00, 9:00 | Martes: 10:00"
+        """
+        por_dia = {}
+        for dia, hora in franjas:
+            por_dia.setdefault(dia, []).append(hora)
+
+        resultado = []
+        for dia in sorted(por_dia.keys()):
+            horas_str = ", ".join([f"{h}:00" for h in sorted(por_dia[dia])])
+            resultado.append(f"{DIAS_SEMANA[dia]}: {horas_str}")
+
+        return " | ".join(resultado) if resultado else "Sin horarios válidos"
+
     @staticmethod
     def formatear_horarios(horarios: List[str]) -> str:
         """
         Convierte lista de horarios ['0-8', '0-9', '1-10'] a texto legible.
-        Agrupa por día para mostrar mejor.
+        Agrupa por día para mostrar mejor. Ignora los horarios inválidos.
         """
         if not horarios:
             return "Sin horarios especificados"
 
-        # Agrupar por día
-        por_dia = {}
-        for h in horarios:
-            try:
-                dia, hora = h.split('-')
-                dia = int(dia)
-                hora = int(hora)
-                if dia not in por_dia:
-                    por_dia[dia] = []
-                por_dia[dia].append(hora)
-            except (ValueError, IndexError):
-                continue
-
-        # Formatear
-        resultado = []
-        for dia in sorted(por_dia.keys()):
-            if 0 <= dia < 7:
-                horas = sorted(por_dia[dia])
-                horas_str = ", ".join([f"{h}:00" for h in horas])
-                resultado.append(f"{DIAS_SEMANA[dia]}: {horas_str}")
+        return SolicitudService.formatear_franjas(_franjas_validas(horarios))
 
-        return " | ".join(resultado) if resultado else "Sin horarios válidos"
+    @staticmethod
+    def normalizar_horarios(solicitud: Solicitud) -> None:
+        """
+        Valida y normaliza los horarios de la solicitud: lista ordenada sin
+        repetidos, mascara semanal y texto formateado. Se hace una vez al crear.
+
+        Raises:
+            ValueError: Si algun horario no es valido
+        """
+        franjas = parsear_franjas(solicitud.horarios_seleccionados or [])
+        if not franjas:
+            raise ValueError("Debes seleccionar al menos un horario")
+
+        solicitud.horarios_seleccionados = [formatear_franja(d, h) for d, h in franjas]
+        solicitud.horarios_mascara = mascara_a_texto(mascara_desde_franjas(franjas))
+        solicitud.horarios_formateados = SolicitudService.formatear_franjas(franjas)
+
+    @staticmethod
+    def renormalizar_solicitudes(db: Session, lote: int = 500) -> int:
+        """
+        Calcula horarios_mascara y horarios_formateados de las solicitudes que
+        aun no los tienen (filas creadas antes de la normalizacion).
+        Los horarios invalidos de filas viejas se descartan en lugar de fallar.
+
+        Returns:
+            Numero de solicitudes actualizadas
+        """
+        actualizadas = 0
+        while True:
+            solicitudes = db.query(Solicitud).filter(
+                Solicitud.horarios_mascara == None
+            ).order_by(Solicitud.id).limit(lote).all()
+            if not solicitudes:
+                break
+
+            for sol in solicitudes:
+                franjas = _franjas_validas(sol.horarios_seleccionados)
+                sol.horarios_mascara = mascara_a_texto(mascara_desde_franjas(franjas))
+                sol.horarios_formateados = (
+                    SolicitudService.formatear_franjas(franjas) if franjas else "Sin horarios especificados"
+                )
+
+            db.commit()
+            actualizadas += len(solicitudes)
+
+        return actualizadas
+
+    @staticmethod
+    def cancelar_pendientes_duplicadas(db: Session) -> int:
+        """
+        Deja solo la solicitud pendiente mas antigua de cada (estudiante, chaza)
+        y cancela las demas. Necesario antes de crear el indice unico parcial
+        en una BD que ya tiene duplicados.
+
+        Returns:
+            Numero de solicitudes canceladas
+        """
+        otra = aliased(Solicitud)
+        primera = select(func.min(otra.id)).where(
+            otra.estudiante_id == Solicitud.estudiante_id,
+            otra.chaza_id == Solicitud.chaza_id,
+            otra.estado == EstadoSolicitud.PENDIENTE
+        ).scalar_subquery()
+
+        canceladas = db.query(Solicitud).filter(
+            Solicitud.estado == EstadoSolicitud.PENDIENTE,
+            Solicitud.id != primera
+        ).update({
+            "estado": EstadoSolicitud.CANCELADA,
+            "updated_at": datetime.utcnow()
+        }, synchronize_session=False)
+        db.commit()
+        if canceladas:
+            SolicitudService.recalcular_contadores(db)
+        return canceladas
+
+    @staticmethod
+    def recalcular_contadores(db: Session) -> int:
+        """
+        Reconstruye contadores_solicitudes desde la tabla solicitudes.
+
+        Returns:
+            Numero de chazas con contadores
+        """
+        db.query(ContadorSolicitudes).delete(synchronize_session=False)
+        db.execute(ContadorSolicitudes.__table__.insert().from_select(
+            ["chaza_id", *_COLUMNA_CONTADOR.values()], _select_contadores()
+        ))
+        db.commit()
+        return db.query(func.count(ContadorSolicitudes.chaza_id)).scalar()
+
+    @staticmethod
+    def archivar_solicitudes(
+        db: Session,
+        dias: Optional[int] = None,
+        lote: Optional[int] = None
+    ) -> int:
+        """
+        Mueve a solicitudes_archivadas las solicitudes rechazadas o canceladas
+        sin cambios hace mas de `dias` dias. Trabaja por lotes de `lote` filas,
+        cada uno en su propia transaccion corta (INSERT ... SELECT + DELETE),
+        para no bloquear la tabla mientras la API sigue atendiendo.
+
+        Returns:
+            Numero de solicitudes archivadas
+        """
+        dias = settings.ARCHIVO_SOLICITUDES_DIAS if dias is None else dias
+        lote = lote or settings.ARCHIVO_SOLICITUDES_LOTE
+        limite_fecha = datetime.utcnow() - timedelta(days=dias)
+        columnas = [c.name for c in Solicitud.__table__.columns if c.name in SolicitudArchivada.__table__.c]
+        # En tablas SQLite creadas sin AUTOINCREMENT el siguiente id es max(id) + 1:
+        # si se archivara la fila con el id maximo, ese id se volveria a usar
+        id_maximo = select(func.max(Solicitud.id)).scalar_subquery()
+
+        archivadas = 0
+        while True:
+            ids = db.execute(
+                select(Solicitud.id).where(
+                    Solicitud.estado.in_(ESTADOS_ARCHIVABLES),
+                    Solicitud.updated_at < limite_fecha,
+                    Solicitud.id < id_maximo
+                ).limit(lote)
+            ).scalars().all()
+            if not ids:
+                break
+
+            db.execute(SolicitudArchivada.__table__.insert().from_select(
+                columnas + ["archivada_at"],
+                select(*[Solicitud.__table__.c[c] for c in columnas], literal(datetime.utcnow())).where(
+                    Solicitud.id.in_(ids)
+                )
+            ))
+            db.execute(delete(Solicitud).where(Solicitud.id.in_(ids)))
+            db.commit()
+            archivadas += len(ids)
+
+        return archivadas
+
+    @staticmethod
+    def obtener_contadores_dueno(db: Session, dueno_id: int) -> List[dict]:
+        """
+        Totales de solicitudes por estado de todas las chazas de un dueño,
+        leidos de contadores_solicitudes en una sola consulta.
+        """
+        filas = db.query(
+            Chaza.id, Chaza.titulo, Chaza.is_active,
+            ContadorSolicitudes.pendientes, ContadorSolicitudes.aceptadas, ContadorSolicitudes.rechazadas
+        ).outerjoin(
+            ContadorSolicitudes, ContadorSolicitudes.chaza_id == Chaza.id
+        ).filter(
+            Chaza.owner_id == dueno_id
+        ).order_by(Chaza.id).all()
+
+        return [
+            {
+                "chaza_id": fila.id,
+                "chaza_nombre": fila.titulo,
+                "is_active": fila.is_active,
+                "pendientes": fila.pendientes or 0,
+                "aceptadas": fila.aceptadas or 0,
+                "rechazadas": fila.rechazadas or 0
+            }
+            for fila in filas
+        ]
 
     @staticmethod
     def crear_solicitud(
@@ -59,10 +361,13 @@ class SolicitudService:
         horarios_seleccionados: List[str],
         mensaje: Optional[str] = None
     ) -> Solicitud:
-        """Crea una nueva solicitud de trabajo"""
+        """
+        Crea una nueva solicitud de trabajo y la notificacion para el dueño.
+        Solo hace flush: quien llama confirma todo con un unico db.commit().
+        """
 
         # Verificar que la chaza existe
-        chaza = db.query(Chaza).filter(Chaza.id == chaza_id).first()
+        chaza = db.get(Chaza, chaza_id)
         if not chaza:
             raise ValueError("La chaza no existe")
 
@@ -70,18 +375,6 @@ class SolicitudService:
         if chaza.owner_id == estudiante_id:
             raise ValueError("No puedes postularte a tu propia chaza")
 
-        # Verificar que no exista una solicitud pendiente del mismo estudiante a la misma chaza
-        solicitud_existente = db.query(Solicitud).filter(
-            and_(
-                Solicitud.estudiante_id == estudiante_id,
-                Solicitud.chaza_id == chaza_id,
-                Solicitud.estado == EstadoSolicitud.PENDIENTE
-            )
-        ).first()
-
-        if solicitud_existente:
-            raise ValueError("Ya tienes una solicitud pendiente para esta chaza")
-
         # Crear la solicitud
         solicitud = Solicitud(
             estudiante_id=estudiante_id,
@@ -90,16 +383,25 @@ class SolicitudService:
             mensaje=mensaje,
             estado=EstadoSolicitud.PENDIENTE
         )
+        SolicitudService.normalizar_horarios(solicitud)
 
+        # El indice unico parcial impide dos solicitudes pendientes a la misma chaza
         db.add(solicitud)
-        db.commit()
-        db.refresh(solicitud)
-
-        # Obtener datos del estudiante para la notificación
-        estudiante = db.query(User).filter(User.id == estudiante_id).first()
+        try:
+            db.flush()
+        except IntegrityError as e:
+            db.rollback()
+            if _es_solicitud_pendiente_duplicada(e):
+                raise ValueError("Ya tienes una solicitud pendiente para esta chaza")
+            raise
+        _mover_contadores(db, chaza_id, None, EstadoSolicitud.PENDIENTE)
+        _publicar_cambio_solicitud(db, solicitud.id, chaza_id, estudiante_id, EstadoSolicitud.PENDIENTE)
+
+        # El estudiante ya esta en la sesion (es el usuario autenticado)
+        estudiante = db.get(User, estudiante_id)
 
         # Crear notificación para el dueño de la chaza
-        horarios_texto = SolicitudService.formatear_horarios(horarios_seleccionados)
+        horarios_texto = solicitud.horarios_formateados
         NotificacionService.crear_notificacion(
             db=db,
             usuario_id=chaza.owner_id,
@@ -107,88 +409,289 @@ class SolicitudService:
             titulo="Nueva solicitud de trabajo",
             mensaje=f"{estudiante.nombre} quiere trabajar en {chaza.titulo}. Horarios: {horarios_texto}",
             chaza_id=chaza_id,
-            postulacion_id=solicitud.id
+            postulacion_id=solicitud.id,
+            confirmar=False
         )
 
         return solicitud
 
+    @staticmethod
+    def _solicitud_a_dict(sol: Solicitud, chaza_nombre: str, **extra) -> dict:
+        """Representacion de una solicitud para las respuestas de la API."""
+        return {
+            "id": sol.id,
+            "estudiante_id": sol.estudiante_id,
+            **extra,
+            "chaza_id": sol.chaza_id,
+            "chaza_nombre": chaza_nombre,
+            "horarios_seleccionados": sol.horarios_seleccionados,
+            "horarios_formateados": (
+                sol.horarios_formateados
+                or SolicitudService.formatear_horarios(sol.horarios_seleccionados)
+            ),
+            "mensaje": sol.mensaje,
+            "estado": sol.estado.value,
+            "created_at": sol.created_at,
+            "updated_at": sol.updated_at,
+            "respuesta": sol.respuesta,
+            "respondido_at": sol.respondido_at
+        }
+
     @staticmethod
     def obtener_solicitudes_chaza(
         db: Session,
         chaza_id: int,
         dueno_id: int,
-        estado: Optional[EstadoSolicitud] = None
-    ) -> List[dict]:
-        """Obtiene las solicitudes recibidas para una chaza (solo el dueño puede verlas)"""
+        estado: Optional[EstadoSolicitud] = None,
+        limite: int = 50,
+        cursor: Optional[str] = None
+    ) -> dict:
+        """
+        Obtiene una pagina de solicitudes recibidas para una chaza (solo el dueño puede verlas).
+
+        Una sola consulta trae la pagina con los datos del estudiante (JOIN)
+        y los totales por estado. Solo si la pagina sale vacia se hace una
+        consulta extra para verificar permisos y obtener los totales.
+
+        Returns:
+            dict con solicitudes, next_cursor (None si no hay mas) y conteos por estado
+        """
+        query = db.query(
+            Solicitud, User.nombre, User.email, Chaza.titulo, *_conteos_por_estado(chaza_id)
+        ).join(
+            Chaza, Chaza.id == Solicitud.chaza_id
+        ).outerjoin(
+            User, User.id == Solicitud.estudiante_id
+        ).filter(
+            Solicitud.chaza_id == chaza_id,
+            Chaza.owner_id == dueno_id
+        )
 
-        # Verificar que el usuario es el dueño
+        if estado:
+            query = query.filter(Solicitud.estado == estado)
+
+        if cursor:
+            fecha, solicitud_id = decodificar_cursor(cursor)
+            query = query.filter(tuple_(Solicitud.created_at, Solicitud.id) < (fecha, solicitud_id))
+
+        # Se pide una fila de mas para saber si hay pagina siguiente
+        filas = query.order_by(
+            Solicitud.created_at.desc(), Solicitud.id.desc()
+        ).limit(limite + 1).all()
+
+        if filas:
+            primera = filas[0]
+            conteos = {e.value: getattr(primera, f"total_{e.value}") for e in EstadoSolicitud}
+        else:
+            # Pagina vacia: verificar que el usuario es el dueño y contar aparte
+            chaza = db.query(Chaza.id).filter(
+                and_(Chaza.id == chaza_id, Chaza.owner_id == dueno_id)
+            ).first()
+
+            if not chaza:
+                raise ValueError("No tienes permiso para ver estas solicitudes")
+
+            conteos = {e.value: 0 for e in EstadoSolicitud}
+            for estado_fila, total in db.query(Solicitud.estado, func.count(Solicitud.id)).filter(
+                Solicitud.chaza_id == chaza_id
+            ).group_by(Solicitud.estado):
+                conteos[estado_fila.value] = total
+
+        hay_mas = len(filas) > limite
+        filas = filas[:limite]
+
+        solicitudes = [
+            SolicitudService._solicitud_a_dict(
+                fila.Solicitud, fila.titulo,
+                estudiante_nombre=fila.nombre or "Desconocido",
+                estudiante_email=fila.email
+            )
+            for fila in filas
+        ]
+
+        next_cursor = None
+        if hay_mas:
+            ultima = filas[-1].Solicitud
+            next_cursor = codificar_cursor(ultima.created_at, ultima.id)
+
+        return {
+            "solicitudes": solicitudes,
+            "next_cursor": next_cursor,
+            "conteos": conteos,
+            "total": sum(conteos.values())
+        }
+
+    @staticmethod
+    def ranking_solicitudes_chaza(
+        db: Session,
+        chaza_id: int,
+        dueno_id: int,
+        orden: str = "ajuste",
+        limite: int = 50
+    ) -> dict:
+        """
+        Solicitudes pendientes de una chaza ordenadas por que tan bien encajan
+        sus horarios con los horarios publicados de la chaza, y una sugerencia
+        de pocas solicitudes que juntas cubren todas las horas posibles.
+        Las metricas se calculan para todas las solicitudes a la vez (ver ajuste_horarios).
+
+        Args:
+            orden: "ajuste" (mejor ajuste primero) o "fecha" (mas antigua primero)
+            limite: Maximo de solicitudes en la lista (la sugerencia usa todas)
+
+        Returns:
+            dict con horas_publicadas, total, solicitudes y cobertura_sugerida
+
+        Raises:
+            ValueError: Si el usuario no es el dueño de la chaza
+        """
         chaza = db.query(Chaza).filter(
             and_(Chaza.id == chaza_id, Chaza.owner_id == dueno_id)
         ).first()
-
         if not chaza:
             raise ValueError("No tienes permiso para ver estas solicitudes")
 
-        query = db.query(Solicitud).filter(Solicitud.chaza_id == chaza_id)
-
-        if estado:
-            query = query.filter(Solicitud.estado == estado)
+        if chaza.disponibilidad is not None:
+            mascara_chaza = mascara_desde_texto(chaza.disponibilidad)
+        else:
+            mascara_chaza = mascara_desde_rangos(
+                (h.dia_semana, h.hora_inicio, h.hora_fin) for h in chaza.horarios if h.activo
+            )
 
-        solicitudes = query.order_by(Solicitud.created_at.desc()).all()
+        # Solo id y mascara de todas las pendientes (sin construir objetos ORM),
+        # de la mas antigua a la mas reciente: en empate gana quien llego antes
+        ids, mascaras = [], []
+        for solicitud_id, mascara in db.query(Solicitud.id, Solicitud.horarios_mascara).filter(
+            Solicitud.chaza_id == chaza_id,
+            Solicitud.estado == EstadoSolicitud.PENDIENTE
+        ).order_by(Solicitud.created_at, Solicitud.id):
+            ids.append(solicitud_id)
+            mascaras.append(mascara)
+
+        # Filas sin normalizar (ver renormalizar_solicitudes): se calcula al vuelo
+        pendientes_de_normalizar = [ids[i] for i, mascara in enumerate(mascaras) if mascara is None]
+        if pendientes_de_normalizar:
+            posicion = {solicitud_id: i for i, solicitud_id in enumerate(ids)}
+            for solicitud_id, horarios in db.query(Solicitud.id, Solicitud.horarios_seleccionados).filter(
+                Solicitud.id.in_(pendientes_de_normalizar)
+            ):
+                mascaras[posicion[solicitud_id]] = mascara_a_texto(
+                    mascara_desde_franjas(_franjas_validas(horarios))
+                )
+
+        vector_chaza = ajuste_horarios.vector_de_mascara(mascara_chaza)
+        matriz = ajuste_horarios.matriz_de_mascaras(mascaras)
+        ajuste = ajuste_horarios.medir_ajuste(matriz, vector_chaza)
+
+        if orden == "ajuste":
+            indices = [int(i) for i in ajuste_horarios.ordenar_por_ajuste(ajuste)[:limite]]
+        else:
+            indices = list(range(min(limite, len(ids))))
+
+        # Las filas completas solo para la pagina que se devuelve
+        filas = {
+            fila.Solicitud.id: fila
+            for fila in db.query(Solicitud, User.nombre, User.email).outerjoin(
+                User, User.id == Solicitud.estudiante_id
+            ).filter(Solicitud.id.in_([ids[i] for i in indices]))
+        } if indices else {}
+
+        solicitudes = []
+        for i in indices:
+            fila = filas[ids[i]]
+            solicitudes.append(SolicitudService._solicitud_a_dict(
+                fila.Solicitud, chaza.titulo,
+                estudiante_nombre=fila.nombre or "Desconocido",
+                estudiante_email=fila.email,
+                ajuste={
+                    "horas_coincidentes": int(ajuste["coincidencias"][i]),
+                    "horas_seleccionadas": int(ajuste["seleccionadas"][i]),
+                    "porcentaje_cobertura": round(float(ajuste["cobertura"][i]) * 100, 1),
+                    "porcentaje_en_horario": round(float(ajuste["precision"][i]) * 100, 1)
+                }
+            ))
+
+        elegidas = ajuste_horarios.cobertura_minima(matriz, vector_chaza)
+        cubiertas = matriz[elegidas].any(axis=0) & vector_chaza
+        sin_cubrir = vector_chaza & ~cubiertas
 
-        # Enriquecer con datos del estudiante
-        resultado = []
-        for sol in solicitudes:
-            estudiante = db.query(User).filter(User.id == sol.estudiante_id).first()
-            resultado.append({
-                "id": sol.id,
-                "estudiante_id": sol.estudiante_id,
-                "estudiante_nombre": estudiante.nombre if estudiante else "Desconocido",
-                "estudiante_email": estudiante.email if estudiante else None,
-                "chaza_id": sol.chaza_id,
-                "chaza_nombre": chaza.titulo,
-                "horarios_seleccionados": sol.horarios_seleccionados,
-                "horarios_formateados": SolicitudService.formatear_horarios(sol.horarios_seleccionados),
-                "mensaje": sol.mensaje,
-                "estado": sol.estado.value,
-                "created_at": sol.created_at,
-                "updated_at": sol.updated_at,
-                "respuesta": sol.respuesta,
-                "respondido_at": sol.respondido_at
-            })
-
-        return resultado
+        return {
+            "chaza_id": chaza_id,
+            "horas_publicadas": int(vector_chaza.sum()),
+            "total": len(ids),
+            "solicitudes": solicitudes,
+            "cobertura_sugerida": {
+                "solicitud_ids": [ids[i] for i in elegidas],
+                "horas_cubiertas": int(cubiertas.sum()),
+                "horas_sin_cubrir": [
+                    formatear_franja(*divmod(int(bit), HORAS_POR_DIA))
+                    for bit in sin_cubrir.nonzero()[0]
+                ]
+            }
+        }
 
     @staticmethod
     def obtener_mis_solicitudes(
         db: Session,
-        estudiante_id: int
-    ) -> List[dict]:
-        """Obtiene las solicitudes enviadas por un estudiante"""
+        estudiante_id: int,
+        limite: int = 50,
+        cursor: Optional[str] = None
+    ) -> dict:
+        """
+        Obtiene una pagina de las solicitudes enviadas por un estudiante, de la mas reciente
+        a la mas antigua. Los datos de la chaza vienen en la misma consulta (JOIN).
 
-        solicitudes = db.query(Solicitud).filter(
-            Solicitud.estudiante_id == estudiante_id
-        ).order_by(Solicitud.created_at.desc()).all()
+        Incluye las solicitudes archivadas (archivada=True): se lee la misma pagina
+        de solicitudes y de solicitudes_archivadas y se mezclan por fecha.
 
-        resultado = []
-        for sol in solicitudes:
-            chaza = db.query(Chaza).filter(Chaza.id == sol.chaza_id).first()
-            resultado.append({
-                "id": sol.id,
-                "estudiante_id": sol.estudiante_id,
-                "chaza_id": sol.chaza_id,
-                "chaza_nombre": chaza.titulo if chaza else "Chaza eliminada",
-                "horarios_seleccionados": sol.horarios_seleccionados,
-                "horarios_formateados": SolicitudService.formatear_horarios(sol.horarios_seleccionados),
-                "mensaje": sol.mensaje,
-                "estado": sol.estado.value,
-                "created_at": sol.created_at,
-                "updated_at": sol.updated_at,
-                "respuesta": sol.respuesta,
-                "respondido_at": sol.respondido_at
-            })
-
-        return resultado
+        Returns:
+            dict con solicitudes y next_cursor (None si no hay mas)
+        """
+        fecha = solicitud_id = None
+        if cursor:
+            fecha, solicitud_id = decodificar_cursor(cursor)
+
+        filas = []
+        for modelo in (Solicitud, SolicitudArchivada):
+            query = db.query(
+                modelo, Chaza.titulo, Chaza.slug, Chaza.imagen_url
+            ).outerjoin(
+                Chaza, Chaza.id == modelo.chaza_id
+            ).filter(
+                modelo.estudiante_id == estudiante_id
+            )
+
+            if cursor:
+                query = query.filter(tuple_(modelo.created_at, modelo.id) < (fecha, solicitud_id))
+
+            # Se pide una fila de mas para saber si hay pagina siguiente
+            filas.extend(
+                (fila[0], fila.titulo, fila.slug, fila.imagen_url, modelo is SolicitudArchivada)
+                for fila in query.order_by(
+                    modelo.created_at.desc(), modelo.id.desc()
+                ).limit(limite + 1)
+            )
+
+        filas.sort(key=lambda fila: (fila[0].created_at, fila[0].id), reverse=True)
+        hay_mas = len(filas) > limite
+        filas = filas[:limite]
+
+        solicitudes = [
+            SolicitudService._solicitud_a_dict(
+                sol, titulo or "Chaza eliminada",
+                chaza_slug=slug,
+                chaza_imagen_url=imagen_url,
+                archivada=archivada
+            )
+            for sol, titulo, slug, imagen_url, archivada in filas
+        ]
+
+        next_cursor = None
+        if hay_mas:
+            ultima = filas[-1][0]
+            next_cursor = codificar_cursor(ultima.created_at, ultima.id)
+
+        return {"solicitudes": solicitudes, "next_cursor": next_cursor}
 
     @staticmethod
     def responder_solicitud(
@@ -198,7 +701,10 @@ class SolicitudService:
         nuevo_estado: EstadoSolicitud,
         respuesta: Optional[str] = None
     ) -> Solicitud:
-        """El dueño de la chaza responde a una solicitud"""
+        """
+        El dueño de la chaza responde a una solicitud.
+        Solo hace flush: quien llama confirma todo con un unico db.commit().
+        """
 
         # Obtener la solicitud
         solicitud = db.query(Solicitud).filter(Solicitud.id == solicitud_id).first()
@@ -222,18 +728,19 @@ class SolicitudService:
         solicitud.respuesta = respuesta
         solicitud.respondido_at = datetime.utcnow()
         solicitud.updated_at = datetime.utcnow()
+        db.flush()
+        _mover_contadores(db, chaza.id, EstadoSolicitud.PENDIENTE, nuevo_estado)
+        _publicar_cambio_solicitud(db, solicitud.id, chaza.id, solicitud.estudiante_id, nuevo_estado)
 
-        db.commit()
-        db.refresh(solicitud)
-
-        # Notificar al estudiante
+        # Notificar al estudiante (misma transaccion)
         if nuevo_estado == EstadoSolicitud.ACEPTADA:
             NotificacionService.notificar_postulacion_aceptada(
                 db=db,
                 estudiante_id=solicitud.estudiante_id,
                 chaza_nombre=chaza.titulo,
                 chaza_id=chaza.id,
-                postulacion_id=solicitud.id
+                postulacion_id=solicitud.id,
+                confirmar=False
             )
         elif nuevo_estado == EstadoSolicitud.RECHAZADA:
             NotificacionService.notificar_postulacion_rechazada(
@@ -241,18 +748,105 @@ class SolicitudService:
                 estudiante_id=solicitud.estudiante_id,
                 chaza_nombre=chaza.titulo,
                 chaza_id=chaza.id,
-                postulacion_id=solicitud.id
+                postulacion_id=solicitud.id,
+                confirmar=False
             )
 
         return solicitud
 
+    @staticmethod
+    def responder_solicitudes_lote(
+        db: Session,
+        solicitud_ids: List[int],
+        dueno_id: int,
+        nuevo_estado: EstadoSolicitud,
+        respuesta: Optional[str] = None
+    ) -> List[dict]:
+        """
+        El dueño responde varias solicitudes de una vez (aceptar/rechazar).
+        Una consulta para verificar permisos, un UPDATE para todas las
+        pendientes y un INSERT de varias filas para las notificaciones.
+        Solo hace flush: quien llama confirma todo con un unico db.commit().
+
+        Returns:
+            Un resultado por id, en el orden recibido:
+            {"solicitud_id", "resultado", "detalle"} con resultado
+            "actualizada", "no_encontrada", "sin_permiso" o "ya_respondida"
+        """
+        ids = list(dict.fromkeys(solicitud_ids))
+
+        filas = db.query(
+            Solicitud.id, Solicitud.estudiante_id, Solicitud.estado,
+            Chaza.id.label("chaza_id"), Chaza.owner_id, Chaza.titulo
+        ).outerjoin(Chaza, Chaza.id == Solicitud.chaza_id).filter(
+            Solicitud.id.in_(ids)
+        ).all()
+        por_id = {fila.id: fila for fila in filas}
+
+        candidatas = [
+            fila.id for fila in filas
+            if fila.owner_id == dueno_id and fila.estado == EstadoSolicitud.PENDIENTE
+        ]
+
+        # El filtro por estado se repite en el UPDATE: si otra peticion respondio
+        # o cancelo la solicitud entre la consulta y aqui, no se pisa
+        actualizadas = set()
+        if candidatas:
+            ahora = datetime.utcnow()
+            actualizadas = set(db.execute(
+                update(Solicitud).where(
+                    Solicitud.id.in_(candidatas),
+                    Solicitud.estado == EstadoSolicitud.PENDIENTE
+                ).values(
+                    estado=nuevo_estado,
+                    respuesta=respuesta,
+                    respondido_at=ahora,
+                    updated_at=ahora
+                ).returning(Solicitud.id).execution_options(synchronize_session=False)
+            ).scalars())
+
+        por_chaza = Counter(por_id[solicitud_id].chaza_id for solicitud_id in actualizadas)
+        for chaza_id, cantidad in por_chaza.items():
+            _mover_contadores(db, chaza_id, EstadoSolicitud.PENDIENTE, nuevo_estado, cantidad)
+        for solicitud_id in actualizadas:
+            fila = por_id[solicitud_id]
+            _publicar_cambio_solicitud(db, solicitud_id, fila.chaza_id, fila.estudiante_id, nuevo_estado)
+
+        NotificacionService.crear_notificaciones_lote(db, [
+            NotificacionService.datos_postulacion_respondida(
+                por_id[solicitud_id].estudiante_id,
+                por_id[solicitud_id].titulo,
+                por_id[solicitud_id].chaza_id,
+                aceptada=nuevo_estado == EstadoSolicitud.ACEPTADA
+            )
+            for solicitud_id in ids if solicitud_id in actualizadas
+        ])
+
+        resultados = []
+        for solicitud_id in ids:
+            fila = por_id.get(solicitud_id)
+            if fila is None:
+                resultado, detalle = "no_encontrada", "Solicitud no encontrada"
+            elif fila.owner_id != dueno_id:
+                resultado, detalle = "sin_permiso", "No tienes permiso para responder a esta solicitud"
+            elif solicitud_id not in actualizadas:
+                resultado, detalle = "ya_respondida", "Esta solicitud ya fue respondida"
+            else:
+                resultado, detalle = "actualizada", None
+            resultados.append({"solicitud_id": solicitud_id, "resultado": resultado, "detalle": detalle})
+
+        return resultados
+
     @staticmethod
     def cancelar_solicitud(
         db: Session,
         solicitud_id: int,
         estudiante_id: int
     ) -> Solicitud:
-        """El estudiante cancela su propia solicitud"""
+        """
+        El estudiante cancela su propia solicitud.
+        Solo hace flush: quien llama confirma todo con un unico db.commit().
+        """
 
         solicitud = db.query(Solicitud).filter(
             and_(
@@ -269,13 +863,15 @@ class SolicitudService:
 
         solicitud.estado = EstadoSolicitud.CANCELADA
         solicitud.updated_at = datetime.utcnow()
+        db.flush()
+        _mover_contadores(db, solicitud.chaza_id, EstadoSolicitud.PENDIENTE, EstadoSolicitud.CANCELADA)
+        _publicar_cambio_solicitud(
+            db, solicitud.id, solicitud.chaza_id, estudiante_id, EstadoSolicitud.CANCELADA
+        )
 
-        db.commit()
-        db.refresh(solicitud)
-
-        # Notificar al chazero
-        chaza = db.query(Chaza).filter(Chaza.id == solicitud.chaza_id).first()
-        estudiante = db.query(User).filter(User.id == estudiante_id).first()
+        # Notificar al chazero (misma transaccion)
+        chaza = db.get(Chaza, solicitud.chaza_id)
+        estudiante = db.get(User, estudiante_id)
 
         if chaza and estudiante:
             NotificacionService.notificar_postulacion_cancelada(
@@ -283,7 +879,8 @@ class SolicitudService:
                 chazero_id=chaza.owner_id,
                 estudiante_nombre=estudiante.nombre,
                 chaza_nombre=chaza.titulo,
-                chaza_id=chaza.id
+                chaza_id=chaza.id,
+                confirmar=False
             )
 
         return solicitud
@@ -294,9 +891,15 @@ class SolicitudService:
         solicitud_id: int,
         usuario_id: int
     ) -> Optional[dict]:
-        """Obtiene una solicitud por ID (solo si el usuario tiene permiso)"""
+        """
+        Obtiene una solicitud por ID (solo si el usuario tiene permiso).
+        Si ya no esta en solicitudes se busca en el archivo.
+        """
 
         solicitud = db.query(Solicitud).filter(Solicitud.id == solicitud_id).first()
+        archivada = solicitud is None
+        if archivada:
+            solicitud = db.get(SolicitudArchivada, solicitud_id)
         if not solicitud:
             return None
 
@@ -308,19 +911,9 @@ class SolicitudService:
 
         estudiante = db.query(User).filter(User.id == solicitud.estudiante_id).first()
 
-        return {
-            "id": solicitud.id,
-            "estudiante_id": solicitud.estudiante_id,
-            "estudiante_nombre": estudiante.nombre if estudiante else "Desconocido",
-            "estudiante_email": estudiante.email if estudiante else None,
-            "chaza_id": solicitud.chaza_id,
-            "chaza_nombre": chaza.titulo if chaza else "Chaza eliminada",
-            "horarios_seleccionados": solicitud.horarios_seleccionados,
-            "horarios_formateados": SolicitudService.formatear_horarios(solicitud.horarios_seleccionados),
-            "mensaje": solicitud.mensaje,
-            "estado": solicitud.estado.value,
-            "created_at": solicitud.created_at,
-            "updated_at": solicitud.updated_at,
-            "respuesta": solicitud.respuesta,
-            "respondido_at": solicitud.respondido_at
-        }
+        return SolicitudService._solicitud_a_dict(
+            solicitud, chaza.titulo if chaza else "Chaza eliminada",
+            estudiante_nombre=estudiante.nombre if estudiante else "Desconocido",
+            estudiante_email=estudiante.email if estudiante else None,
+            archivada=archivada
+        )
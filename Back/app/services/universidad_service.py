@@ -10,12 +10,23 @@ import unicodedata
 from cachetools import TTLCache
 
 from app.models.universidad import Universidad
+from app.services.chaza_service import ChazaService
 from app.schemas.universidad import UniversidadCreate, UniversidadUpdate, UniversidadResponse, UniversidadSimple
+from app.schemas.eventos import EventoDominio, EventosPerdidos, UniversidadCambiada
+from app.core.eventos import bus_eventos
 
 # Cache de universidades: max 10 entradas, expira cada 1 hora (3600 seg)
 _universidades_cache = TTLCache(maxsize=10, ttl=3600)
 
 
+@bus_eventos.suscribir(UniversidadCambiada)
+@bus_eventos.suscribir(EventosPerdidos)
+def _al_cambiar_universidad(evento: EventoDominio) -> None:
+    _universidades_cache.clear()
+    # Las respuestas de chazas incluyen los datos de su universidad
+    ChazaService.limpiar_cache()
+
+
 def generar_slug_universidad(nombre_corto: str) -> str:
     """Genera un slug a partir del nombre corto de la universidad."""
     texto = unicodedata.normalize('NFKD', nombre_corto)
@@ -97,7 +108,7 @@ class UniversidadService:
         db.commit()
         db.refresh(nueva_universidad)
 
-        _universidades_cache.clear()
+        bus_eventos.publicar(UniversidadCambiada(universidad_id=nueva_universidad.id))
         return UniversidadResponse.model_validate(nueva_universidad)
 
     @staticmethod
@@ -119,7 +130,7 @@ class UniversidadService:
         db.commit()
         db.refresh(universidad)
 
-        _universidades_cache.clear()
+        bus_eventos.publicar(UniversidadCambiada(universidad_id=universidad.id))
         return UniversidadResponse.model_validate(universidad)
 
     @staticmethod
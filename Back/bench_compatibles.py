@@ -0,0 +1,85 @@
+"""
+Benchmark de IndiceDisponibilidad.puntuar (busqueda de chazas compatibles).
+
+Construye un indice con mascaras aleatorias (por defecto 50.000 chazas) y mide
+la latencia de puntuar horarios aleatorios de estudiantes contra todo el indice.
+No usa la base de datos.
+
+Uso (desde la carpeta Back):
+    python bench_compatibles.py
+    python bench_compatibles.py --chazas 50000 --consultas 2000 --k 20
+"""
+import argparse
+import random
+import time
+
+import numpy as np
+
+from app.core.horarios import DIAS_POR_SEMANA, mascara_desde_franjas, mascara_desde_rangos
+from app.services.indice_disponibilidad import IndiceDisponibilidad, _IndiceUniversidad
+
+UNIVERSIDAD_ID = 1
+
+
+def mascara_chaza(aleatorio: random.Random) -> int:
+    """Horario tipico de una chaza: algunos dias, un rango de horas por dia."""
+    rangos = []
+    for dia in aleatorio.sample(range(DIAS_POR_SEMANA), aleatorio.randint(1, 6)):
+        inicio = aleatorio.randint(6, 16)
+        rangos.append((dia, inicio, inicio + aleatorio.randint(1, 6)))
+    return mascara_desde_rangos(rangos)
+
+
+def mascara_estudiante(aleatorio: random.Random) -> int:
+    """Entre 1 y 20 franjas sueltas entre semana."""
+    franjas = {(aleatorio.randint(0, 4), aleatorio.randint(6, 21)) for _ in range(aleatorio.randint(1, 20))}
+    return mascara_desde_franjas(franjas)
+
+
+class _IndiceAleatorio(IndiceDisponibilidad):
+    """Construye la universidad con mascaras aleatorias en lugar de leer la BD."""
+
+    def __init__(self, chazas: int, semilla: int):
+        super().__init__()
+        self.chazas = chazas
+        self.semilla = semilla
+
+    def _construir(self, db, universidad_id: int) -> _IndiceUniversidad:
+        aleatorio = random.Random(self.semilla)
+        indice = _IndiceUniversidad()
+        for chaza_id in range(1, self.chazas + 1):
+            indice.poner(chaza_id, mascara_chaza(aleatorio))
+        return indice
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark de IndiceDisponibilidad.puntuar")
+    parser.add_argument("--chazas", type=int, default=50_000)
+    parser.add_argument("--consultas", type=int, default=2_000)
+    parser.add_argument("--k", type=int, default=20, help="skip + limit de la pagina pedida")
+    parser.add_argument("--semilla", type=int, default=42)
+    args = parser.parse_args()
+
+    indice = _IndiceAleatorio(args.chazas, args.semilla)
+    aleatorio = random.Random(args.semilla + 1)
+    estudiantes = [mascara_estudiante(aleatorio) for _ in range(args.consultas)]
+
+    inicio = time.perf_counter()
+    indice.puntuar(None, UNIVERSIDAD_ID, estudiantes[0], args.k)
+    construccion = time.perf_counter() - inicio
+
+    tiempos = []
+    for mascara in estudiantes:
+        inicio = time.perf_counter()
+        indice.puntuar(None, UNIVERSIDAD_ID, mascara, args.k)
+        tiempos.append(time.perf_counter() - inicio)
+
+    ms = np.array(tiempos) * 1000
+    print(f">> {args.chazas} chazas, {args.consultas} consultas, k={args.k}")
+    print(f">> Construccion del indice: {construccion * 1000:.1f} ms")
+    print(f">> puntuar: p50 {np.percentile(ms, 50):.3f} ms | p99 {np.percentile(ms, 99):.3f} ms"
+          f" | max {ms.max():.3f} ms")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,115 @@
+"""
+Benchmark de GET /chazas/ con view=full y view=summary.
+
+Crea una BD SQLite temporal con 100 chazas (universidad y horarios incluidos)
+y mide, para una pagina de 100 chazas en cada vista:
+  - tamaño de la respuesta (y comprimida con gzip)
+  - tiempo de serializar la pagina a JSON
+  - tiempo de la peticion completa (con el cache de chazas vacio)
+
+No toca la BD configurada en .env.
+
+Uso (desde la carpeta Back):
+    python bench_vista_resumen.py
+    python bench_vista_resumen.py --repeticiones 500
+"""
+import os
+import tempfile
+
+# La configuracion se lee al importar app.config: la BD temporal va antes
+_directorio = tempfile.mkdtemp(prefix="chazas-bench-")
+os.environ["DATABASE_URL"] = f"sqlite:///{_directorio}/bench.db"
+os.environ["EVENTOS_TRANSPORTE"] = "memoria"
+
+import argparse
+import gzip
+import time
+from typing import List
+
+import numpy as np
+from fastapi.testclient import TestClient
+from pydantic import TypeAdapter
+
+from app.database.session import SessionLocal, init_db
+from app.main import app
+from app.models import Chaza, HorarioTrabajo, Universidad, User
+from app.schemas.chaza import ChazaResponse, ChazaSummary
+from app.services.chaza_service import ChazaService
+
+CHAZAS = 100
+VISTAS = {"full": List[ChazaResponse], "summary": List[ChazaSummary]}
+
+
+def crear_datos(db) -> None:
+    universidad = Universidad(
+        nombre="Universidad de Pruebas", nombre_corto="UP", slug="up",
+        dominios_correo="up.edu.co", ciudad="Bogota", descripcion="Campus principal"
+    )
+    db.add(universidad)
+    db.flush()
+    for i in range(CHAZAS):
+        dueno = User(
+            nombre=f"Chazero {i}", email=f"chazero{i}@up.edu.co", password_hash="x",
+            tipo_usuario="chazero", universidad_id=universidad.id, is_verified=True
+        )
+        db.add(dueno)
+        db.flush()
+        chaza = Chaza(
+            titulo=f"Chaza {i}", slug=f"chaza-{i}", categoria="comida", precio=8000,
+            descripcion="Comida casera, jugos naturales y almuerzos del dia. " * 4,
+            ubicacion="Frente a la entrada principal", duracion_estimada="6:00 - 20:00",
+            telefono="300 123 4567", imagen_url=f"/api/v1/uploads/imagen/chaza_{i}.jpg",
+            owner_id=dueno.id, universidad_id=universidad.id
+        )
+        db.add(chaza)
+        db.flush()
+        for dia in range(5):
+            db.add(HorarioTrabajo(chaza_id=chaza.id, dia_semana=dia, hora_inicio=7, hora_fin=18))
+    db.commit()
+
+
+def milisegundos(tiempos) -> str:
+    ms = np.array(tiempos) * 1000
+    return f"p50 {np.percentile(ms, 50):.2f} ms | p99 {np.percentile(ms, 99):.2f} ms"
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark de view=full vs view=summary")
+    parser.add_argument("--repeticiones", type=int, default=200)
+    args = parser.parse_args()
+
+    init_db()
+    db = SessionLocal()
+    try:
+        crear_datos(db)
+
+        cliente = TestClient(app)
+        for vista, tipo in VISTAS.items():
+            pagina = ChazaService.get_all_chazas(db, 0, CHAZAS, resumen=(vista == "summary"))
+            adaptador = TypeAdapter(tipo)
+
+            serializacion = []
+            for _ in range(args.repeticiones):
+                inicio = time.perf_counter()
+                adaptador.dump_json(pagina)
+                serializacion.append(time.perf_counter() - inicio)
+
+            peticiones = []
+            for _ in range(args.repeticiones):
+                ChazaService.limpiar_cache()
+                inicio = time.perf_counter()
+                respuesta = cliente.get(f"/api/v1/chazas/?limit={CHAZAS}&view={vista}")
+                peticiones.append(time.perf_counter() - inicio)
+            assert respuesta.status_code == 200 and len(respuesta.json()) == CHAZAS
+
+            cuerpo = respuesta.content
+            print(f">> view={vista}")
+            print(f"   payload:       {len(cuerpo):,} bytes ({len(gzip.compress(cuerpo)):,} con gzip)")
+            print(f"   serializacion: {milisegundos(serializacion)}")
+            print(f"   peticion:      {milisegundos(peticiones)}")
+    finally:
+        db.close()
+
+
+if __name__ == "__main__":
+    main()
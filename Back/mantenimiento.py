@@ -0,0 +1,114 @@
+"""
+Comandos de mantenimiento de la base de datos.
+
+Uso (desde la carpeta Back):
+    python mantenimiento.py recalcular-disponibilidad
+    python mantenimiento.py reindexar-busqueda
+    python mantenimiento.py normalizar-solicitudes
+    python mantenimiento.py depurar-solicitudes-duplicadas
+    python mantenimiento.py recalcular-contadores
+    python mantenimiento.py archivar-solicitudes [--dias 180] [--lote 500]
+    python mantenimiento.py recalcular-notificaciones-sin-leer
+"""
+import argparse
+
+from app.config import settings
+from app.core.eventos import bus_eventos, crear_transporte
+from app.database.session import SessionLocal, init_db, crear_indices_faltantes
+
+
+def recalcular_disponibilidad(db, args):
+    """Backfill de la mascara de disponibilidad de todas las chazas."""
+    from app.services.chaza_service import ChazaService
+
+    total = ChazaService.recalcular_disponibilidad(db)
+    print(f">> Disponibilidad recalculada para {total} chazas")
+
+
+def reindexar_busqueda(db, args):
+    """Reconstruye el indice de texto completo de chazas."""
+    from app.database.busqueda import reindexar_chazas
+
+    total = reindexar_chazas(db)
+    print(f">> Indice de busqueda reconstruido: {total} chazas")
+
+
+def normalizar_solicitudes(db, args):
+    """Calcula mascara y texto de horarios de las solicitudes existentes."""
+    from app.services.solicitud_service import SolicitudService
+
+    total = SolicitudService.renormalizar_solicitudes(db)
+    print(f">> Horarios normalizados en {total} solicitudes")
+
+
+def depurar_solicitudes_duplicadas(db, args):
+    """Cancela solicitudes pendientes repetidas y crea el indice unico parcial."""
+    from app.services.solicitud_service import SolicitudService
+
+    total = SolicitudService.cancelar_pendientes_duplicadas(db)
+    print(f">> Solicitudes pendientes duplicadas canceladas: {total}")
+    crear_indices_faltantes()
+
+
+def recalcular_contadores(db, args):
+    """Reconstruye los contadores de solicitudes por chaza."""
+    from app.services.solicitud_service import SolicitudService
+
+    total = SolicitudService.recalcular_contadores(db)
+    print(f">> Contadores de solicitudes recalculados para {total} chazas")
+
+
+def archivar_solicitudes(db, args):
+    """Mueve al archivo las solicitudes rechazadas/canceladas antiguas."""
+    from app.services.solicitud_service import SolicitudService
+
+    total = SolicitudService.archivar_solicitudes(db, dias=args.dias, lote=args.lote)
+    print(f">> Solicitudes archivadas: {total}")
+
+
+def recalcular_notificaciones_sin_leer(db, args):
+    """Reconstruye los contadores de notificaciones sin leer por usuario."""
+    from app.services.notificacion_service import NotificacionService
+
+    total = NotificacionService.recalcular_sin_leer(db)
+    print(f">> Contadores de notificaciones sin leer recalculados para {total} usuarios")
+
+
+COMANDOS = {
+    "recalcular-disponibilidad": recalcular_disponibilidad,
+    "reindexar-busqueda": reindexar_busqueda,
+    "normalizar-solicitudes": normalizar_solicitudes,
+    "depurar-solicitudes-duplicadas": depurar_solicitudes_duplicadas,
+    "recalcular-contadores": recalcular_contadores,
+    "archivar-solicitudes": archivar_solicitudes,
+    "recalcular-notificaciones-sin-leer": recalcular_notificaciones_sin_leer,
+}
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Mantenimiento de la BD de Chazas")
+    parser.add_argument("comando", choices=sorted(COMANDOS))
+    parser.add_argument("--dias", type=int, default=None,
+                        help="archivar-solicitudes: antiguedad minima en dias (ARCHIVO_SOLICITUDES_DIAS)")
+    parser.add_argument("--lote", type=int, default=None,
+                        help="archivar-solicitudes: filas por transaccion (ARCHIVO_SOLICITUDES_LOTE)")
+    args = parser.parse_args()
+
+    # Asegura que las columnas e indices nuevos existan
+    init_db()
+
+    # Los workers en ejecucion reciben los eventos (p. ej. limpiar caches de chazas)
+    bus_eventos.configurar(crear_transporte(
+        settings.EVENTOS_TRANSPORTE, settings.DATABASE_URL, settings.REDIS_URL
+    ))
+
+    db = SessionLocal()
+    try:
+        COMANDOS[args.comando](db, args)
+    finally:
+        db.close()
+        bus_eventos.detener()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,116 @@
+"""
+Configuracion de pytest.
+
+Las pruebas usan una BD SQLite temporal: las variables de entorno se definen
+antes de importar la app porque app.config lee la configuracion al importarse.
+Cada prueba empieza con las tablas vacias y los caches en memoria limpios.
+
+Uso (desde la carpeta Back):
+    python -m pytest
+"""
+import os
+import tempfile
+
+_directorio = tempfile.mkdtemp(prefix="chazas-tests-")
+os.environ["DATABASE_URL"] = f"sqlite:///{_directorio}/chazas_test.db"
+os.environ["EVENTOS_TRANSPORTE"] = "memoria"
+os.environ.setdefault("SECRET_KEY", "clave-de-pruebas")
+
+import pytest
+from sqlalchemy import event, text
+
+from app.database.session import Base, SessionLocal, engine, init_db
+from app.models import Chaza, HorarioTrabajo, Universidad, User
+from app.core.security import create_access_token
+
+init_db()
+
+
+@pytest.fixture
+def db():
+    """Sesion sobre la BD de pruebas, con todas las tablas vacias."""
+    from app.services.chaza_service import ChazaService
+    from app.services.indice_disponibilidad import indice_disponibilidad
+    from app.services import universidad_service
+
+    with engine.begin() as conexion:
+        for tabla in reversed(Base.metadata.sorted_tables):
+            conexion.execute(tabla.delete())
+        conexion.execute(text("DELETE FROM chazas_fts"))
+    ChazaService.limpiar_cache()
+    indice_disponibilidad.limpiar()
+    universidad_service._universidades_cache.clear()
+
+    sesion = SessionLocal()
+    try:
+        yield sesion
+    finally:
+        sesion.close()
+
+
+@pytest.fixture
+def client():
+    from fastapi.testclient import TestClient
+    from app.main import app
+
+    return TestClient(app)
+
+
+@pytest.fixture
+def consultas():
+    """
+    Lista que recibe (sentencia, parametros) de cada consulta ejecutada
+    mientras dura la prueba. Se puede vaciar con consultas.clear().
+    """
+    capturadas = []
+
+    def capturar(conn, cursor, sentencia, parametros, contexto, executemany):
+        capturadas.append((sentencia, parametros))
+
+    event.listen(engine, "before_cursor_execute", capturar)
+    yield capturadas
+    event.remove(engine, "before_cursor_execute", capturar)
+
+
+def encabezados(usuario: User) -> dict:
+    """Header Authorization con un JWT valido para el usuario."""
+    return {"Authorization": "Bearer " + create_access_token({"sub": usuario.email})}
+
+
+def crear_universidad(db) -> Universidad:
+    universidad = Universidad(
+        nombre="Universidad de Pruebas", nombre_corto="UP", slug="up",
+        dominios_correo="up.edu.co", ciudad="Bogota"
+    )
+    db.add(universidad)
+    db.flush()
+    return universidad
+
+
+def crear_usuario(db, universidad: Universidad, nombre: str, tipo_usuario: str = "chazero") -> User:
+    usuario = User(
+        nombre=nombre, email=f"{nombre}@up.edu.co", password_hash="x",
+        tipo_usuario=tipo_usuario, universidad_id=universidad.id, is_verified=True
+    )
+    db.add(usuario)
+    db.flush()
+    return usuario
+
+
+def crear_chazas(db, universidad: Universidad, cantidad: int, horarios_por_chaza: int = 2) -> list:
+    """Crea `cantidad` chazas, cada una con su dueño y sus horarios."""
+    chazas = []
+    for i in range(cantidad):
+        dueno = crear_usuario(db, universidad, f"chazero{i}")
+        chaza = Chaza(
+            titulo=f"Chaza {i}", slug=f"chaza-{i}", descripcion="Atencion en la chaza de comidas",
+            categoria="comida", ubicacion="Plaza central", owner_id=dueno.id,
+            universidad_id=universidad.id
+        )
+        db.add(chaza)
+        db.flush()
+        for dia in range(horarios_por_chaza):
+            db.add(HorarioTrabajo(chaza_id=chaza.id, dia_semana=dia, hora_inicio=8, hora_fin=10 + i % 5))
+        chazas.append(chaza)
+    db.commit()
+    return chazas
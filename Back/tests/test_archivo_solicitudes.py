@@ -0,0 +1,41 @@
+"""
+Archivo de solicitudes (SolicitudService.archivar_solicitudes).
+
+Las solicitudes archivadas conservan su id: una solicitud nueva nunca debe
+recibir el id de una archivada.
+"""
+from datetime import datetime, timedelta
+
+from sqlalchemy import text
+
+from app.models import Solicitud, SolicitudArchivada, EstadoSolicitud
+from app.services.solicitud_service import SolicitudService
+from tests.conftest import crear_chazas, crear_universidad, crear_usuario
+
+
+def test_tabla_con_autoincrement(db):
+    sql = db.execute(text("SELECT sql FROM sqlite_master WHERE name = 'solicitudes'")).scalar()
+    assert "AUTOINCREMENT" in sql
+
+
+def test_ids_archivados_no_se_reutilizan(db):
+    universidad = crear_universidad(db)
+    chaza = crear_chazas(db, universidad, 1)[0]
+    estudiantes = [crear_usuario(db, universidad, f"estudiante{i}", "estudiante") for i in range(6)]
+    antigua = datetime.utcnow() - timedelta(days=400)
+    db.execute(Solicitud.__table__.insert(), [
+        dict(estudiante_id=e.id, chaza_id=chaza.id, horarios_seleccionados=["0-8"],
+             estado=EstadoSolicitud.RECHAZADA, created_at=antigua, updated_at=antigua)
+        for e in estudiantes[:5]
+    ])
+    db.commit()
+    ids = [fila.id for fila in db.query(Solicitud.id).order_by(Solicitud.id)]
+
+    # La de id maximo se queda en solicitudes (tablas creadas sin AUTOINCREMENT)
+    assert SolicitudService.archivar_solicitudes(db, dias=180, lote=2) == 4
+    assert [fila.id for fila in db.query(Solicitud.id)] == ids[-1:]
+
+    nueva = SolicitudService.crear_solicitud(db, estudiantes[5].id, chaza.id, ["0-8"])
+    db.commit()
+    assert nueva.id > max(ids)
+    assert db.get(SolicitudArchivada, nueva.id) is None
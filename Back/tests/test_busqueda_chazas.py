@@ -0,0 +1,24 @@
+"""
+Busqueda de texto del listado de chazas (?q=).
+
+Una busqueda sin palabras (solo espacios o signos) no filtra: responde lo
+mismo que el listado sin q.
+"""
+import pytest
+
+from tests.conftest import crear_chazas, crear_universidad
+
+
+@pytest.fixture
+def chazas(db):
+    return crear_chazas(db, crear_universidad(db), 5)
+
+
+@pytest.mark.parametrize("q", ["", "   ", "?!", " - ¿? ", "%"])
+def test_busqueda_sin_palabras_no_filtra(client, chazas, q):
+    sin_q = client.get("/api/v1/chazas/", params={"limit": 3})
+    respuesta = client.get("/api/v1/chazas/", params={"q": q, "limit": 3})
+    assert respuesta.status_code == 200
+    assert respuesta.json() == sin_q.json()
+    assert respuesta.headers.get("X-Next-Cursor") == sin_q.headers.get("X-Next-Cursor")
+    assert len(respuesta.json()) == 3
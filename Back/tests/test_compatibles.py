@@ -0,0 +1,94 @@
+"""
+Busqueda de chazas compatibles.
+
+Con universidad se puntua contra el indice en memoria y con categoria el
+ranking se hace en la BD: las dos rutas deben devolver el mismo orden,
+incluidos los empates (id mas reciente primero).
+"""
+from datetime import datetime, timedelta
+
+from app.core.horarios import mascara_desde_franjas
+from app.services.chaza_service import ChazaService
+from app.services.indice_disponibilidad import IndiceDisponibilidad
+from tests.conftest import crear_chazas, crear_universidad
+
+# Lunes 8:00-12:00: todas las chazas de crear_chazas abren de 8 a 10 como minimo
+FRANJAS = ["0-8", "0-9", "0-10", "0-11"]
+
+
+def _ids(respuesta):
+    return [(chaza.id, chaza.cantidad_coincidencias) for chaza in respuesta.chazas]
+
+
+def test_indice_y_sql_desempatan_igual(db):
+    universidad = crear_universidad(db)
+    chazas = crear_chazas(db, universidad, 30)
+    # Fechas en orden inverso a los ids: un desempate por fecha daria otro orden
+    for i, chaza in enumerate(chazas):
+        chaza.created_at = datetime(2026, 1, 1) - timedelta(hours=i)
+    db.commit()
+
+    for skip, limit in [(0, 30), (0, 7), (7, 7), (25, 10)]:
+        indice = ChazaService.buscar_compatibles(db, FRANJAS, skip, limit, universidad.id, None)
+        sql = ChazaService.buscar_compatibles(db, FRANJAS, skip, limit, universidad.id, "comida")
+        assert indice.total == sql.total == 30
+        assert _ids(indice) == _ids(sql)
+
+    todas = _ids(ChazaService.buscar_compatibles(db, FRANJAS, 0, 30, universidad.id, None))
+    assert todas == sorted(todas, key=lambda fila: (-fila[1], -fila[0]))
+
+
+def test_cambio_durante_la_construccion_no_queda_en_cache(db):
+    universidad = crear_universidad(db)
+    chazas = crear_chazas(db, universidad, 3)
+
+    class IndiceConCambio(IndiceDisponibilidad):
+        cambios = [chazas[0].id]
+
+        def _construir(self, db, universidad_id):
+            construido = super()._construir(db, universidad_id)
+            # Otra peticion desactiva una chaza mientras se leia la BD (solo la primera vez)
+            for chaza_id in self.cambios:
+                self.actualizar(universidad_id, chaza_id, False, None)
+            self.cambios = []
+            return construido
+
+    indice = IndiceConCambio()
+    estudiante = mascara_desde_franjas([(0, 8)])
+    # La consulta usa lo construido, pero no lo guarda: la siguiente reconstruye
+    assert indice.puntuar(db, universidad.id, estudiante, 10)[0] == 3
+    assert universidad.id not in indice._indices
+    assert indice.puntuar(db, universidad.id, estudiante, 10)[0] == 3
+    assert universidad.id in indice._indices
+
+
+def test_indice_desactualizado_no_devuelve_chazas_inactivas(db):
+    universidad = crear_universidad(db)
+    chazas = crear_chazas(db, universidad, 10)
+    primera = ChazaService.buscar_compatibles(db, FRANJAS, 0, 5, universidad.id, None)
+
+    # Desactivadas sin evento (p. ej. perdido durante una reconexion del bus)
+    desactivadas = {chaza.id for chaza, _ in zip(primera.chazas, range(2))}
+    for chaza in chazas:
+        if chaza.id in desactivadas:
+            chaza.is_active = False
+    db.commit()
+
+    respuesta = ChazaService.buscar_compatibles(db, FRANJAS, 0, 5, universidad.id, None)
+    ids = [chaza.id for chaza in respuesta.chazas]
+    assert len(ids) == 5 and not desactivadas & set(ids)
+    assert respuesta.total == 8
+
+
+def test_cambios_no_modifican_el_indice_publicado(db):
+    universidad = crear_universidad(db)
+    chazas = crear_chazas(db, universidad, 3)
+    indice = IndiceDisponibilidad()
+    estudiante = mascara_desde_franjas([(0, 8)])
+    indice.puntuar(db, universidad.id, estudiante, 10)
+    publicado = indice._indices[universidad.id]
+
+    indice.actualizar(universidad.id, chazas[0].id, False, None)
+    # Quien estaba puntuando con el indice anterior lo sigue viendo completo
+    assert publicado.total == 3
+    assert indice.puntuar(db, universidad.id, estudiante, 10)[0] == 2
@@ -0,0 +1,62 @@
+"""
+Numero de consultas de las lecturas de chazas.
+
+Las respuestas incluyen la universidad y los horarios de cada chaza; se
+cargan con JOIN / SELECT ... IN (ver _con_relaciones en ChazaService). Si
+vuelve la carga perezosa, el numero de consultas crece con las chazas de la
+pagina y estas pruebas fallan.
+"""
+import pytest
+
+from app.models import User
+from tests.conftest import crear_chazas, crear_universidad, encabezados
+
+# Consultas de la BD por peticion: version (ETag) + chazas + horarios
+MAX_CONSULTAS = 3
+# Consulta extra del usuario autenticado (JWT)
+MAX_CONSULTAS_AUTENTICADO = MAX_CONSULTAS + 1
+
+
+@pytest.fixture
+def chazas(db):
+    universidad = crear_universidad(db)
+    chazas = crear_chazas(db, universidad, 100, horarios_por_chaza=3)
+    # Un dueño con varias chazas para la consulta por dueño
+    for chaza in chazas[1:10]:
+        chaza.owner_id = chazas[0].owner_id
+    db.commit()
+    return chazas
+
+
+def _consultas_de(consultas, peticion):
+    consultas.clear()
+    respuesta = peticion()
+    assert respuesta.status_code == 200, respuesta.text
+    return respuesta, len(consultas)
+
+
+def test_listado_completo(client, chazas, consultas):
+    respuesta, total = _consultas_de(consultas, lambda: client.get("/api/v1/chazas/?limit=100"))
+    assert len(respuesta.json()) == 100
+    assert all(len(chaza["horarios"]) == 3 and chaza["universidad"] for chaza in respuesta.json())
+    assert total <= MAX_CONSULTAS
+
+
+def test_detalle_por_slug_y_por_id(client, chazas, consultas):
+    slug, chaza_id = chazas[50].slug, chazas[51].id
+    respuesta, total = _consultas_de(consultas, lambda: client.get(f"/api/v1/chazas/slug/{slug}"))
+    assert len(respuesta.json()["horarios"]) == 3
+    assert total <= MAX_CONSULTAS
+    respuesta, total = _consultas_de(consultas, lambda: client.get(f"/api/v1/chazas/{chaza_id}"))
+    assert respuesta.json()["universidad"]
+    assert total <= MAX_CONSULTAS
+
+
+def test_chazas_del_dueno(client, db, chazas, consultas):
+    dueno = db.get(User, chazas[0].owner_id)
+    db.expunge_all()
+    respuesta, total = _consultas_de(
+        consultas, lambda: client.get("/api/v1/chazas/mis-chazas", headers=encabezados(dueno))
+    )
+    assert len(respuesta.json()) == 10
+    assert total <= MAX_CONSULTAS_AUTENTICADO
@@ -0,0 +1,145 @@
+"""
+Bus de eventos de dominio (app.core.eventos).
+
+Dos BusEventos que comparten un RedisLocal se comportan como dos workers
+conectados al mismo Redis.
+"""
+import queue
+
+import pytest
+from sqlalchemy import text
+
+from app.core import transportes_eventos
+from app.core.eventos import BusEventos, bus_eventos
+from app.core.horarios import mascara_desde_franjas
+from app.core.transportes_eventos import RedisLocal, TransporteRedis, _TransporteConThread
+from app.schemas.eventos import ChazaCambiada, EventosPerdidos, UniversidadCambiada
+from app.services.chaza_service import _chazas_cache
+from app.services.indice_disponibilidad import indice_disponibilidad
+from tests.conftest import crear_chazas, crear_universidad
+
+# Segundos maximos de espera por un evento que viaja por el transporte
+ESPERA = 5.0
+
+
+def _evento(chaza_id: int) -> ChazaCambiada:
+    return ChazaCambiada(chaza_id=chaza_id, universidad_id=1, slug=f"chaza-{chaza_id}", is_active=True)
+
+
+@pytest.fixture
+def workers():
+    """Dos buses con su cola de eventos recibidos, conectados al mismo RedisLocal."""
+    servidor = RedisLocal()
+    buses = []
+    for _ in range(2):
+        bus, recibidos = BusEventos(), queue.Queue()
+        bus.suscribir(ChazaCambiada)(recibidos.put)
+        bus.suscribir(UniversidadCambiada)(recibidos.put)
+        bus.configurar(TransporteRedis(servidor))
+        buses.append((bus, recibidos))
+    yield buses
+    for bus, _ in buses:
+        bus.detener()
+
+
+def test_evento_llega_al_otro_worker(workers):
+    (bus_a, recibidos_a), (bus_b, recibidos_b) = workers
+
+    bus_a.publicar(_evento(7))
+
+    # Entrega local sincrona en quien publica
+    assert recibidos_a.get_nowait() == _evento(7)
+    # Y por el transporte en el otro worker
+    assert recibidos_b.get(timeout=ESPERA) == _evento(7)
+
+
+def test_eco_del_propio_origen_se_ignora(workers):
+    (bus_a, recibidos_a), (bus_b, recibidos_b) = workers
+
+    bus_a.publicar(_evento(7))
+    assert recibidos_a.get_nowait() == _evento(7)
+
+    # El eco del evento de A llega a A antes que este evento de B (misma cola, en orden)
+    bus_b.publicar(UniversidadCambiada(universidad_id=1))
+    assert recibidos_a.get(timeout=ESPERA) == UniversidadCambiada(universidad_id=1)
+    assert recibidos_a.empty()
+
+
+def test_mensaje_invalido_no_detiene_el_transporte(workers):
+    (bus_a, _), (bus_b, recibidos_b) = workers
+
+    bus_a._transporte.enviar("no es json")
+    bus_a.publicar(_evento(8))
+    assert recibidos_b.get(timeout=ESPERA) == _evento(8)
+
+
+def test_reconexion_entrega_eventos_perdidos(monkeypatch):
+    monkeypatch.setattr(transportes_eventos, "_ESPERA_RECONEXION", 0.01)
+    bus, recibidos = BusEventos(), queue.Queue()
+    bus.suscribir(EventosPerdidos)(recibidos.put)
+    transporte = TransporteRedis(RedisLocal())
+    bus.configurar(transporte)
+    try:
+        # La conexion se cae una vez; la siguiente lectura ya funciona
+        get_message, fallas = transporte._pubsub.get_message, [ConnectionError("caida")]
+
+        def leer(*args, **kwargs):
+            if fallas:
+                raise fallas.pop()
+            return get_message(*args, **kwargs)
+
+        transporte._pubsub.get_message = leer
+        assert recibidos.get(timeout=ESPERA) == EventosPerdidos()
+        assert recibidos.empty()
+    finally:
+        bus.detener()
+
+
+def test_eventos_perdidos_descartan_indice_y_caches(db, client):
+    universidad = crear_universidad(db)
+    crear_chazas(db, universidad, 2)
+    indice_disponibilidad.puntuar(db, universidad.id, mascara_desde_franjas([(0, 8)]), 10)
+    assert client.get("/api/v1/chazas/").status_code == 200
+    assert indice_disponibilidad._indices and len(_chazas_cache._cache)
+
+    bus_eventos._entregar(EventosPerdidos())
+    assert not indice_disponibilidad._indices
+    assert not len(_chazas_cache._cache)
+
+
+@pytest.fixture
+def publicados(monkeypatch):
+    """Eventos que publicarian los hooks de la sesion sobre el bus global."""
+    lista = []
+    monkeypatch.setattr(bus_eventos, "publicar", lista.append)
+    return lista
+
+
+def test_eventos_de_la_sesion_se_publican_al_confirmar(db, publicados):
+    db.execute(text("SELECT 1"))
+    bus_eventos.publicar_al_confirmar(db, _evento(1))
+    bus_eventos.publicar_al_confirmar(db, _evento(2))
+    assert publicados == []
+
+    db.commit()
+    assert publicados == [_evento(1), _evento(2)]
+    assert "eventos_dominio" not in db.info
+
+
+def test_eventos_de_la_sesion_se_descartan_con_rollback(db, publicados):
+    db.execute(text("SELECT 1"))
+    bus_eventos.publicar_al_confirmar(db, _evento(1))
+    db.rollback()
+
+    db.execute(text("SELECT 1"))
+    db.commit()
+    assert publicados == []
+
+
+def test_transporte_sin_escuchar_no_se_puede_crear():
+    class TransporteIncompleto(_TransporteConThread):
+        def enviar(self, mensaje: str) -> None:
+            pass
+
+    with pytest.raises(TypeError):
+        TransporteIncompleto()
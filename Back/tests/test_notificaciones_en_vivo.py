@@ -0,0 +1,78 @@
+"""
+Historial para reanudar el stream de notificaciones (Last-Event-ID).
+
+Solo se guardan eventos de usuarios con una conexion abierta o que la
+cerraron hace menos de _SEGUNDOS_REANUDAR.
+"""
+import asyncio
+
+import pytest
+from cachetools import TTLCache
+
+from app.services import notificaciones_en_vivo
+from app.services.notificaciones_en_vivo import CanalNotificaciones
+
+
+@pytest.fixture
+def reloj():
+    return [0.0]
+
+
+@pytest.fixture
+def canal(reloj):
+    canal = CanalNotificaciones(max_conexiones_por_usuario=2)
+    canal._desconectados = TTLCache(
+        maxsize=10, ttl=notificaciones_en_vivo._SEGUNDOS_REANUDAR, timer=lambda: reloj[0]
+    )
+    # suscribir() toma el event loop en ejecucion, como en la ruta; debe seguir abierto
+    canal.loop = asyncio.new_event_loop()
+    yield canal
+    canal.loop.close()
+
+
+def _conectar(canal, usuario_id, ultimo_evento=None):
+    async def suscribir():
+        return canal.suscribir(usuario_id, ultimo_evento)
+    return canal.loop.run_until_complete(suscribir())
+
+
+def _id_evento(texto: str) -> str:
+    return texto.split("\n", 1)[0].removeprefix("id: ")
+
+
+def test_sin_conexion_no_se_guarda_historial(canal):
+    for usuario_id in range(100):
+        canal.publicar(usuario_id, "sin_leer", {"sin_leer": 1})
+    assert canal.estadisticas()["usuarios_con_historial"] == 0
+
+
+def test_reanudar_despues_de_desconectarse(canal):
+    suscripcion, _, _ = _conectar(canal, 1)
+    canal.publicar(1, "sin_leer", {"sin_leer": 1})
+    ultimo = _id_evento(canal._recientes[1][0][-1][1])
+    canal.cancelar(suscripcion)
+
+    # Eventos mientras el cliente esta desconectado
+    canal.publicar(1, "sin_leer", {"sin_leer": 2})
+    canal.publicar(1, "sin_leer", {"sin_leer": 3})
+
+    _, perdidos, sincronizar = _conectar(canal, 1, ultimo)
+    assert not sincronizar
+    assert len(perdidos) == 2
+    assert '{"sin_leer": 2}' in perdidos[0] and '{"sin_leer": 3}' in perdidos[1]
+
+
+def test_historial_vencido_pide_sincronizar(canal, reloj):
+    suscripcion, _, _ = _conectar(canal, 1)
+    canal.publicar(1, "sin_leer", {"sin_leer": 1})
+    ultimo = _id_evento(canal._recientes[1][0][-1][1])
+    canal.cancelar(suscripcion)
+
+    reloj[0] += notificaciones_en_vivo._SEGUNDOS_REANUDAR + 1
+    canal.publicar(1, "sin_leer", {"sin_leer": 2})
+    assert canal.estadisticas()["usuarios_con_historial"] == 0
+
+    # El evento 2 no se guardo: no se puede reanudar
+    _, perdidos, sincronizar = _conectar(canal, 1, ultimo)
+    assert sincronizar and perdidos == []
+
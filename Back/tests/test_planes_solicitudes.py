@@ -0,0 +1,129 @@
+"""
+Planes de ejecucion de las consultas de SolicitudService.
+
+Cada consulta que ejecutan la bandeja de la chaza, "mis solicitudes" y los
+contadores se vuelve a pasar por EXPLAIN QUERY PLAN: ninguna debe recorrer
+completas las tablas de solicitudes ni ordenar en un B-tree temporal
+(ver los indices compuestos de app.models.solicitud).
+"""
+from datetime import datetime, timedelta
+
+import pytest
+
+from app.database.session import engine
+from app.models import Solicitud, SolicitudArchivada, EstadoSolicitud, ContadorSolicitudes
+from app.services.solicitud_service import SolicitudService
+from tests.conftest import crear_chazas, crear_universidad, crear_usuario
+
+ESTADOS = list(EstadoSolicitud)
+
+
+@pytest.fixture
+def escenario(db):
+    """3 chazas con 40 estudiantes cada una, en todos los estados, y un archivo."""
+    universidad = crear_universidad(db)
+    chazas = crear_chazas(db, universidad, 3)
+    estudiantes = [crear_usuario(db, universidad, f"estudiante{i}", "estudiante") for i in range(40)]
+
+    inicio = datetime(2026, 1, 1)
+    filas, archivadas = [], []
+    for i, estudiante in enumerate(estudiantes):
+        for j, chaza in enumerate(chazas):
+            filas.append(dict(
+                estudiante_id=estudiante.id, chaza_id=chaza.id, horarios_seleccionados=["0-8"],
+                estado=ESTADOS[(i + j) % len(ESTADOS)],
+                created_at=inicio + timedelta(minutes=i), updated_at=inicio + timedelta(minutes=i)
+            ))
+        archivadas.append(dict(
+            id=100000 + i, estudiante_id=estudiante.id, chaza_id=chazas[0].id,
+            horarios_seleccionados=["1-9"], estado=EstadoSolicitud.CANCELADA,
+            created_at=inicio - timedelta(days=1, minutes=i), archivada_at=inicio
+        ))
+    db.execute(Solicitud.__table__.insert(), filas)
+    db.execute(SolicitudArchivada.__table__.insert(), archivadas)
+    db.commit()
+    SolicitudService.recalcular_contadores(db)
+    return chazas, estudiantes
+
+
+def _planes(consultas):
+    """(sentencia, plan) de cada consulta capturada que toca solicitudes."""
+    resultado = []
+    conexion = engine.raw_connection()
+    try:
+        cursor = conexion.cursor()
+        for sentencia, parametros in consultas:
+            if "solicitudes" not in sentencia or sentencia.lstrip().upper().startswith("INSERT INTO SOLICITUDES ("):
+                continue
+            cursor.execute("EXPLAIN QUERY PLAN " + sentencia, parametros)
+            resultado.append((sentencia, [fila[3] for fila in cursor.fetchall()]))
+    finally:
+        conexion.close()
+    return resultado
+
+
+def _verificar_planes(consultas):
+    planes = _planes(consultas)
+    assert planes, "No se capturo ninguna consulta"
+    for sentencia, plan in planes:
+        for paso in plan:
+            assert "SCAN solicitudes" not in paso, f"Recorrido completo:\n{sentencia}\n{plan}"
+            assert "USE TEMP B-TREE" not in paso, f"Ordenamiento temporal:\n{sentencia}\n{plan}"
+
+
+def _recorrer_paginas(obtener):
+    cursor, paginas = None, 0
+    while True:
+        pagina = obtener(cursor)
+        paginas += 1
+        cursor = pagina["next_cursor"]
+        if not cursor:
+            return paginas
+
+
+@pytest.mark.parametrize("estado", [None, EstadoSolicitud.PENDIENTE])
+def test_bandeja_de_la_chaza_usa_indices(db, escenario, consultas, estado):
+    chazas, _ = escenario
+    consultas.clear()
+    paginas = _recorrer_paginas(
+        lambda cursor: SolicitudService.obtener_solicitudes_chaza(
+            db, chazas[0].id, chazas[0].owner_id, estado=estado, limite=7, cursor=cursor
+        )
+    )
+    assert paginas > 1
+    _verificar_planes(consultas)
+
+
+def test_mis_solicitudes_usa_indices(db, escenario, consultas):
+    _, estudiantes = escenario
+    consultas.clear()
+    paginas = _recorrer_paginas(
+        lambda cursor: SolicitudService.obtener_mis_solicitudes(
+            db, estudiantes[0].id, limite=2, cursor=cursor
+        )
+    )
+    assert paginas > 1
+    _verificar_planes(consultas)
+
+
+def test_contadores_usan_indices(db, escenario, consultas):
+    chazas, estudiantes = escenario
+    nuevo = crear_usuario(db, estudiantes[0].universidad, "nuevo", "estudiante")
+    # Sin fila de contador: la primera solicitud la calcula desde las tablas
+    db.query(ContadorSolicitudes).filter(ContadorSolicitudes.chaza_id == chazas[1].id).delete()
+    db.commit()
+
+    consultas.clear()
+    solicitud = SolicitudService.crear_solicitud(db, nuevo.id, chazas[1].id, ["0-8"])
+    db.commit()
+    SolicitudService.responder_solicitud(db, solicitud.id, chazas[1].owner_id, EstadoSolicitud.ACEPTADA)
+    db.commit()
+    SolicitudService.obtener_contadores_dueno(db, chazas[1].owner_id)
+    _verificar_planes(consultas)
+
+
+def test_archivo_usa_indices(db, escenario, consultas):
+    consultas.clear()
+    archivadas = SolicitudService.archivar_solicitudes(db, dias=0, lote=10)
+    assert archivadas > 10
+    _verificar_planes(consultas)
@@ -0,0 +1,59 @@
+"""
+ETag / Last-Modified de las lecturas publicas de chazas.
+
+La version de una respuesta debe cambiar con todo lo que la respuesta
+incluye: si no, el cliente recibe 304 y se queda con datos viejos.
+"""
+from datetime import datetime
+
+import pytest
+
+from app.schemas.chaza import ChazaUpdate
+from app.schemas.universidad import UniversidadUpdate
+from app.services.chaza_service import ChazaService, _chazas_cache
+from app.services.universidad_service import UniversidadService
+from tests.conftest import crear_chazas, crear_universidad
+
+
+@pytest.fixture
+def chaza(db):
+    universidad = crear_universidad(db)
+    chaza = crear_chazas(db, universidad, 1)[0]
+    # Fechas en el pasado: CURRENT_TIMESTAMP de SQLite tiene resolucion de segundos
+    for fila in (universidad, chaza):
+        fila.created_at = fila.updated_at = datetime(2026, 1, 1)
+    db.commit()
+    return chaza
+
+
+@pytest.mark.parametrize("ruta", ["/api/v1/chazas/{id}", "/api/v1/chazas/slug/{slug}"])
+def test_detalle_cambia_con_la_universidad(client, db, chaza, ruta):
+    url = ruta.format(id=chaza.id, slug=chaza.slug)
+    primera = client.get(url)
+    assert primera.status_code == 200
+    etag = primera.headers["ETag"]
+    assert client.get(url, headers={"If-None-Match": etag}).status_code == 304
+
+    UniversidadService.update(db, chaza.universidad_id, UniversidadUpdate(nombre="Universidad de Medellin"))
+
+    segunda = client.get(url, headers={"If-None-Match": etag})
+    assert segunda.status_code == 200
+    assert segunda.headers["ETag"] != etag
+    assert segunda.json()["universidad"]["nombre"] == "Universidad de Medellin"
+
+
+def test_lectura_vieja_no_se_sirve_con_la_version_nueva(client, db, chaza):
+    """Lector que cargo la chaza antes de un cambio y la guarda en el cache despues."""
+    url = f"/api/v1/chazas/{chaza.id}"
+    version_vieja = ChazaService.version_chaza(db, chaza_id=chaza.id)
+    respuesta_vieja = ChazaService.get_chaza_by_id(db, chaza.id, version_vieja)
+    ChazaService.limpiar_cache()
+
+    # El cambio se confirma e invalida el cache...
+    ChazaService.update_chaza(db, chaza.id, ChazaUpdate(titulo="Chaza renovada"), chaza.owner_id)
+    # ...y despues el lector guarda lo que habia leido
+    _chazas_cache.guardar(("id", chaza.id, version_vieja), respuesta_vieja)
+
+    respuesta = client.get(url)
+    assert respuesta.json()["titulo"] == "Chaza renovada"
+    assert client.get(url, headers={"If-None-Match": respuesta.headers["ETag"]}).status_code == 304
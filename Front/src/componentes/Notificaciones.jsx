@@ -11,14 +11,34 @@ function Notificaciones() {
   const [menuAbierto, setMenuAbierto] = useState(false);
   const [loading, setLoading] = useState(false);
   const menuRef = useRef(null);
+  // Id de la notificacion mas nueva recibida (para pedir solo las nuevas)
+  const ultimoIdRef = useRef(0);
 
-  // Cargar notificaciones al montar y periodicamente
+  // Cargar notificaciones al montar y escuchar las nuevas por el stream en vivo
   useEffect(() => {
     if (isAuthenticated && token) {
       cargarNotificaciones();
-      // Actualizar cada 30 segundos
-      const interval = setInterval(cargarConteo, 30000);
-      return () => clearInterval(interval);
+
+      // Sin soporte de EventSource: volver al polling (solo novedades) cada 30 segundos
+      if (typeof EventSource === 'undefined') {
+        const interval = setInterval(cargarNovedades, 30000);
+        return () => clearInterval(interval);
+      }
+
+      // EventSource se reconecta solo y reanuda con Last-Event-ID
+      const stream = notificacionesApi.abrirStream(token);
+      stream.addEventListener('sin_leer', (e) => {
+        setSinLeer(JSON.parse(e.data).sin_leer);
+      });
+      stream.addEventListener('notificacion', (e) => {
+        const data = JSON.parse(e.data);
+        agregarNuevas([data.notificacion]);
+        setSinLeer(data.sin_leer);
+      });
+      stream.addEventListener('sincronizar', () => {
+        cargarNotificaciones();
+      });
+      return () => stream.close();
     }
   }, [isAuthenticated, token]);
 
@@ -38,6 +58,7 @@ function Notificaciones() {
     try {
       setLoading(true);
       const resumen = await notificacionesApi.getResumen(token);
+      ultimoIdRef.current = Math.max(0, ...resumen.notificaciones_recientes.map(n => n.id));
       setNotificaciones(resumen.notificaciones_recientes);
       setSinLeer(resumen.total_sin_leer);
     } catch (error) {
@@ -47,12 +68,23 @@ function Notificaciones() {
     }
   };
 
-  const cargarConteo = async () => {
+  // Agrega al inicio las notificaciones nuevas (sin repetir) y deja las 5 mas recientes
+  const agregarNuevas = (nuevas) => {
+    if (nuevas.length === 0) return;
+    ultimoIdRef.current = Math.max(ultimoIdRef.current, ...nuevas.map(n => n.id));
+    setNotificaciones(prev =>
+      [...nuevas, ...prev.filter(n => !nuevas.some(nueva => nueva.id === n.id))].slice(0, 5)
+    );
+  };
+
+  // Polling delta: el navegador revalida con ETag y el servidor responde 304 si no hay cambios
+  const cargarNovedades = async () => {
     try {
-      const data = await notificacionesApi.getCountSinLeer(token);
-      setSinLeer(data.count);
+      const resumen = await notificacionesApi.getResumen(token, ultimoIdRef.current);
+      agregarNuevas(resumen.notificaciones_recientes);
+      setSinLeer(resumen.total_sin_leer);
     } catch (error) {
-      console.error('Error cargando conteo:', error);
+      console.error('Error cargando novedades:', error);
     }
   };
 
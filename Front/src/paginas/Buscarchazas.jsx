@@ -55,8 +55,8 @@ function BuscarChazas() {
     }
   };
 
-  // Aplicar filtro de horarios
-  const aplicarFiltroHorario = (horariosSeleccionados) => {
+  // Aplicar filtro de horarios (el servidor calcula y ordena las coincidencias)
+  const aplicarFiltroHorario = async (horariosSeleccionados) => {
     setHorariosUsuario(horariosSeleccionados);
     setFiltroAplicado(true);
 
@@ -67,24 +67,29 @@ function BuscarChazas() {
       return;
     }
 
-    // Filtrar chazas que tengan al menos UNA coincidencia con los horarios del usuario
-    const chazasConCoincidencias = chazas.map(chaza => {
-      // Calcular coincidencias
-      const horariosComunes = chaza.horariosDisponibles.filter(hora => 
-        horariosSeleccionados.includes(hora)
-      );
+    try {
+      setLoading(true);
+      setError(null);
 
-      return {
+      const data = await chazasApi.buscarCompatibles(horariosSeleccionados, universidad?.id);
+
+      const chazasConCoincidencias = data.chazas.map(chaza => ({
         ...chaza,
-        horariosComunes,
-        cantidadCoincidencias: horariosComunes.length,
-        porcentajeCompatibilidad: (horariosComunes.length / horariosSeleccionados.length) * 100
-      };
-    })
-    .filter(chaza => chaza.cantidadCoincidencias > 0) // Solo chazas con al menos 1 coincidencia
-    .sort((a, b) => b.cantidadCoincidencias - a.cantidadCoincidencias); // Ordenar por más coincidencias
-
-    setChazasFiltradas(chazasConCoincidencias);
+        nombre: chaza.titulo,
+        horariosDisponibles: chaza.horarios_trabajo || [],
+        horariosComunes: chaza.horarios_comunes,
+        cantidadCoincidencias: chaza.cantidad_coincidencias,
+        porcentajeCompatibilidad: chaza.porcentaje_compatibilidad
+      }));
+
+      setChazasFiltradas(chazasConCoincidencias);
+    } catch (err) {
+      console.error('Error buscando chazas compatibles:', err);
+      setError('Error al buscar chazas compatibles');
+      setChazasFiltradas([]);
+    } finally {
+      setLoading(false);
+    }
   };
 
   // Limpiar filtro
@@ -27,7 +27,7 @@ function Dashboard() {
       try {
         setLoadingSolicitudes(true);
         const data = await solicitudesApi.getMisSolicitudes(token);
-        setMisSolicitudes(data);
+        setMisSolicitudes(data.solicitudes);
       } catch (error) {
         console.error('Error cargando solicitudes:', error);
       } finally {
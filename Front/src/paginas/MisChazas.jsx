@@ -25,7 +25,7 @@ function MisChazas() {
     try {
       setLoadingSolicitudes(true);
       const data = await solicitudesApi.getSolicitudesChaza(chazaId, token, estado);
-      setSolicitudes(data);
+      setSolicitudes(data.solicitudes);
     } catch (err) {
       console.error('Error cargando solicitudes:', err);
     } finally {
@@ -262,6 +262,13 @@ export const chazasApi = {
     getByUniversidad: async (universidadId) => {
         return api.get(`/chazas?universidad_id=${universidadId}`);
     },
+
+    // Buscar chazas compatibles con los horarios del estudiante (ordenadas en el servidor)
+    buscarCompatibles: async (horarios, universidadId, limit = 100) => {
+        const params = new URLSearchParams({ horarios: horarios.join(','), limit });
+        if (universidadId) params.append('universidad_id', universidadId);
+        return api.get(`/chazas/compatibles?${params.toString()}`);
+    },
 };
 
 // Funciones para universidades
@@ -290,8 +297,10 @@ export const notificacionesApi = {
     },
 
     // Obtener resumen de notificaciones (para el header)
-    getResumen: async (token) => {
-        return api.get('/notificaciones/resumen', token);
+    // Con `desde` (id de la mas nueva que ya se tiene) solo trae las nuevas y el conteo
+    getResumen: async (token, desde = null) => {
+        const query = desde !== null ? `?since=${desde}` : '';
+        return api.get(`/notificaciones/resumen${query}`, token);
     },
 
     // Obtener conteo de sin leer
@@ -299,6 +308,12 @@ export const notificacionesApi = {
         return api.get('/notificaciones/sin-leer/count', token);
     },
 
+    // Abrir el stream en vivo (Server-Sent Events) de notificaciones
+    // EventSource no permite headers, por eso el token va en la URL
+    abrirStream: (token) => {
+        return new EventSource(`${API_URL}/notificaciones/stream?token=${encodeURIComponent(token)}`);
+    },
+
     // Marcar una notificacion como leida
     marcarLeida: async (notificacionId, token) => {
         return api.put(`/notificaciones/${notificacionId}/leer`, {}, token);